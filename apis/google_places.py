@@ -2,6 +2,8 @@ import os
 
 from dotenv import load_dotenv
 
+from utils.cache import TTLCache
+from utils.deadline import Deadline
 from utils.http import safe_get, safe_post
 
 load_dotenv()
@@ -9,12 +11,23 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 
 BASE_URL = "https://places.googleapis.com/v1/places"
 
+# 장소 id/설명/사진 URL 보관 시간 (찾지 못한 결과는 보관하지 않음)
+GOOGLE_TTL_SECONDS = float(os.getenv("GOOGLE_TTL_SECONDS", str(24 * 3600)))
 
-def search_place_id(query: str) -> str | None:
+_google = TTLCache("google_places", GOOGLE_TTL_SECONDS, max_entries=4096)
+
+
+def search_place_id(query: str, deadline: Deadline | None = None) -> str | None:
     """
     장소 이름으로 Google Places place_id 검색.
     예: "석촌호수", "남산타워", "롯데월드"
     """
+    return _google.get_or_load(
+        ("place_id", query), lambda: _search_place_id(query, deadline)
+    )
+
+
+def _search_place_id(query: str, deadline: Deadline | None = None) -> str | None:
     url = f"{BASE_URL}:searchText"
 
     headers = {
@@ -28,7 +41,7 @@ def search_place_id(query: str) -> str | None:
     }
 
     # safe_post는 dict 또는 None을 반환함
-    data = safe_post(url, headers=headers, json_body=body)
+    data = safe_post(url, headers=headers, json_body=body, deadline=deadline)
 
     if not data:
         print(f"TextSearch API 오류 또는 응답 없음: query={query}")
@@ -43,7 +56,9 @@ def search_place_id(query: str) -> str | None:
     return places[0]["id"]
 
 
-def get_place_description(place_id: str) -> dict | None:
+def get_place_description(
+    place_id: str, deadline: Deadline | None = None
+) -> dict | None:
     """
     Google Places에서 장소 요약/설명(editorialSummary)만 가져옴.
     필요하면 리뷰(text)도 함께 담아 반환.
@@ -54,6 +69,14 @@ def get_place_description(place_id: str) -> dict | None:
         "reviews": ["리뷰1", "리뷰2", ...]  # optional
     }
     """
+    return _google.get_or_load(
+        ("description", place_id), lambda: _get_place_description(place_id, deadline)
+    )
+
+
+def _get_place_description(
+    place_id: str, deadline: Deadline | None = None
+) -> dict | None:
     url = f"{BASE_URL}/{place_id}"
 
     field_mask = ",".join(
@@ -68,7 +91,7 @@ def get_place_description(place_id: str) -> dict | None:
         "X-Goog-FieldMask": field_mask,
     }
 
-    data = safe_get(url, headers=headers)
+    data = safe_get(url, headers=headers, deadline=deadline)
     if not data:
         print(f"Place description 응답 없음: place_id={place_id}")
         return None
@@ -92,11 +115,13 @@ def get_place_description(place_id: str) -> dict | None:
     }
 
 
-def get_place_photos(place_id: str, max_photos: int = 3) -> list[str]:
+def get_place_photos(
+    place_id: str, max_photos: int = 3, deadline: Deadline | None = None
+) -> list[str]:
     url = f"{BASE_URL}/{place_id}"
     headers = {"X-Goog-Api-Key": GOOGLE_API_KEY, "X-Goog-FieldMask": "photos"}
 
-    data = safe_get(url, headers=headers)
+    data = safe_get(url, headers=headers, deadline=deadline)
     if not data or "photos" not in data:
         return []
 
@@ -105,7 +130,9 @@ def get_place_photos(place_id: str, max_photos: int = 3) -> list[str]:
     return resource_names
 
 
-def get_photo_url(photo_resource_name: str, max_size: int = 800) -> str | None:
+def get_photo_url(
+    photo_resource_name: str, max_size: int = 800, deadline: Deadline | None = None
+) -> str | None:
     """
     Google Places photo 리소스 이름으로부터 실제 이미지 URL(photoUri)을 가져온다.
     """
@@ -121,7 +148,7 @@ def get_photo_url(photo_resource_name: str, max_size: int = 800) -> str | None:
         "skipHttpRedirect": "true",  # ← 이게 핵심
     }
 
-    data = safe_get(url, headers=headers, params=params)
+    data = safe_get(url, headers=headers, params=params, deadline=deadline)
     if not data:
         return None
 
@@ -129,12 +156,27 @@ def get_photo_url(photo_resource_name: str, max_size: int = 800) -> str | None:
     return data.get("photoUri")
 
 
-def get_photo_urls(place_id: str, max_photos: int = 5) -> list[str]:
-    resource_names = get_place_photos(place_id, max_photos)
+def get_photo_urls(
+    place_id: str, max_photos: int = 5, deadline: Deadline | None = None
+) -> list[str]:
+    """
+    사진 URL 목록 (하나도 못 가져왔으면 보관하지 않는다)
+    """
+    urls = _google.get_or_load(
+        ("photos", place_id, max_photos),
+        lambda: _get_photo_urls(place_id, max_photos, deadline) or None,
+    )
+    return list(urls or [])
+
+
+def _get_photo_urls(
+    place_id: str, max_photos: int = 5, deadline: Deadline | None = None
+) -> list[str]:
+    resource_names = get_place_photos(place_id, max_photos, deadline)
     urls = []
 
     for name in resource_names:
-        url = get_photo_url(name)
+        url = get_photo_url(name, deadline=deadline)
         if url:
             urls.append(url)
 
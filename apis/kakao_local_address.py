@@ -2,14 +2,23 @@ import os
 
 from dotenv import load_dotenv
 
+from utils.cache import TTLCache
+from utils.deadline import Deadline
 from utils.http import safe_get
 
 load_dotenv()
 
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 
+# 주소/키워드 -> 좌표는 거의 바뀌지 않으므로 오래 보관한다 (찾지 못한 결과는 보관하지 않음)
+GEOCODE_TTL_SECONDS = float(os.getenv("GEOCODE_TTL_SECONDS", str(30 * 24 * 3600)))
 
-def get_coords_by_address(address) -> tuple[float | None, float | None]:
+_coords = TTLCache("geocode", GEOCODE_TTL_SECONDS, max_entries=4096)
+
+
+def get_coords_by_address(
+    address, deadline: Deadline | None = None
+) -> tuple[float | None, float | None]:
     """
     정확한 주소로부터 위도와 경도를 가져옵니다.
     """
@@ -17,9 +26,9 @@ def get_coords_by_address(address) -> tuple[float | None, float | None]:
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
     params = {"query": address}
 
-    res = safe_get(url, headers=headers, params=params)
+    res = safe_get(url, headers=headers, params=params, deadline=deadline)
 
-    if res["documents"]:
+    if res and res.get("documents"):
         lat = res["documents"][0]["y"]
         lon = res["documents"][0]["x"]
         return float(lat), float(lon)
@@ -27,7 +36,9 @@ def get_coords_by_address(address) -> tuple[float | None, float | None]:
         return None, None
 
 
-def get_coords_by_keyword(keyword) -> tuple[float | None, float | None]:
+def get_coords_by_keyword(
+    keyword, deadline: Deadline | None = None
+) -> tuple[float | None, float | None]:
     """
     키워드(예: 서울대입구)로부터 위도와 경도를 가져옵니다.
     """
@@ -35,9 +46,9 @@ def get_coords_by_keyword(keyword) -> tuple[float | None, float | None]:
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
     params = {"query": keyword, "size": 1}  # 결과 하나만 가져오기
 
-    res = safe_get(url, headers=headers, params=params)
+    res = safe_get(url, headers=headers, params=params, deadline=deadline)
 
-    if res["documents"]:
+    if res and res.get("documents"):
         lat = res["documents"][0]["y"]
         lon = res["documents"][0]["x"]
         return float(lat), float(lon)
@@ -45,13 +56,18 @@ def get_coords_by_keyword(keyword) -> tuple[float | None, float | None]:
         return None, None
 
 
-def get_coords(query) -> tuple[float | None, float | None]:
+def get_coords(
+    query, deadline: Deadline | None = None
+) -> tuple[float | None, float | None]:
     """
     주소 또는 키워드로부터 위도와 경도를 가져옵니다.
     """
-    lat, lon = get_coords_by_address(query)  # 먼저 주소로 시도
-    if lat is not None and lon is not None:
-        return lat, lon
 
-    lat, lon = get_coords_by_keyword(query)  # 키워드로 시도
-    return lat, lon
+    def load() -> tuple[float, float] | None:
+        lat, lon = get_coords_by_address(query, deadline)  # 먼저 주소로 시도
+        if lat is None or lon is None:
+            lat, lon = get_coords_by_keyword(query, deadline)  # 키워드로 시도
+        return None if lat is None or lon is None else (lat, lon)
+
+    coords = _coords.get_or_load(query.strip(), load)
+    return coords if coords is not None else (None, None)
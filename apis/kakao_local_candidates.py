@@ -1,13 +1,18 @@
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from domain.batch import CandidateBatch
 from domain.enums import PlaceCategory
-from domain.models import PlaceInfo
-from utils.distance_helper import make_ring_centers
+from utils.cache import TTLCache
+from utils.deadline import Deadline
+from utils.distance_helper import haversine_m, make_ring_centers
 from utils.http import safe_get
+from utils.tracing import bind_context
 
 load_dotenv()
 
@@ -17,16 +22,35 @@ MAX_KAKAO_RADIUS_M = 20_000.0
 MAX_PAGES = 3
 PAGE_SIZE = 15
 
+# 검색 센터는 출발지 좌표로 정해지므로 같은 출발지의 검색 페이지는 그대로 다시 쓸 수 있다
+POI_TTL_SECONDS = float(os.getenv("POI_TTL_SECONDS", str(24 * 3600)))
 
-def get_travel_candidates_by_keyword_in_radius(
+_pages = TTLCache("kakao_pages", POI_TTL_SECONDS, max_entries=8192)
+
+
+def _search_page(
+    url: str, headers: dict, params: dict, deadline: Optional[Deadline]
+) -> Optional[dict]:
+    """
+    검색 페이지 하나 (POI_TTL_SECONDS 동안 보관)
+    """
+    key = (url, tuple(sorted(params.items())))
+    return _pages.get_or_load(
+        key, lambda: safe_get(url, headers=headers, params=params, deadline=deadline)
+    )
+
+
+def iter_travel_candidates_by_keyword_in_radius(
     lat: float,
     lon: float,
     radius_m: float,
     keyword: str,
-) -> List[PlaceInfo]:
+    deadline: Optional[Deadline] = None,
+) -> Iterator[CandidateBatch]:
     """
     주어진 위도/경도 주변에서 특정 키워드로 여행지 후보를 검색합니다.
     예: keyword="박물관", "전시회", "역사 유적" 등
+    카카오 응답 페이지 하나마다 배치 하나를 내줍니다 (다음 페이지는 순회할 때 요청).
     """
     url = "https://dapi.kakao.com/v2/local/search/keyword"
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
@@ -34,8 +58,6 @@ def get_travel_candidates_by_keyword_in_radius(
     MAX_PAGES = 5
     PAGE_SIZE = 15
 
-    all_places: List[PlaceInfo] = []
-
     for page in range(1, MAX_PAGES + 1):
         params = {
             "query": keyword,
@@ -46,7 +68,7 @@ def get_travel_candidates_by_keyword_in_radius(
             "page": page,
         }
 
-        res = safe_get(url, headers=headers, params=params)
+        res = _search_page(url, headers, params, deadline)
         if res is None:
             break
 
@@ -54,38 +76,44 @@ def get_travel_candidates_by_keyword_in_radius(
         if not documents:
             break
 
-        for doc in documents:
-            place_info = PlaceInfo(
-                id=doc["id"],
-                place_name=doc["place_name"],
-                road_address_name=doc["road_address_name"],
-                dest_lat=float(doc["y"]),
-                dest_lon=float(doc["x"]),
-            )
-            all_places.append(place_info)
+        yield CandidateBatch.from_documents(documents)
 
         if res.get("meta", {}).get("is_end", True):
             break
 
-    return all_places
+
+def get_travel_candidates_by_keyword_in_radius(
+    lat: float,
+    lon: float,
+    radius_m: float,
+    keyword: str,
+    deadline: Optional[Deadline] = None,
+) -> CandidateBatch:
+    return CandidateBatch.concat(
+        list(
+            iter_travel_candidates_by_keyword_in_radius(
+                lat, lon, radius_m, keyword, deadline
+            )
+        )
+    )
 
 
-def get_travel_candidates_by_category_in_radius(
+def iter_travel_candidates_by_category_in_radius(
     lat: float,
     lon: float,
     radius_m: float,
     category_group_codes: List[PlaceCategory],
-) -> List[PlaceInfo]:
+    deadline: Optional[Deadline] = None,
+) -> Iterator[CandidateBatch]:
     """
     주어진 위도/경도 주변의 여행지 후보를, 카테고리 기준으로 가져옵니다.
     카테고리는 관광명소 또는 문화시설로 제한됩니다.
+    카카오 응답 페이지 하나마다 배치 하나를 내줍니다 (다음 페이지는 순회할 때 요청).
     """
     url = "https://dapi.kakao.com/v2/local/search/category"
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
     radius_m = min(radius_m, MAX_KAKAO_RADIUS_M)  # 카카오 API의 최대 반경은 20km
 
-    all_places: List[PlaceInfo] = []
-
     # 여러 카테고리를 순회하며 병합
     for category in category_group_codes:
         category_code = category.value  # "AT4" 또는 "CT1"
@@ -100,7 +128,7 @@ def get_travel_candidates_by_category_in_radius(
                 "page": page,
             }
 
-            res = safe_get(url, headers=headers, params=params)
+            res = _search_page(url, headers, params, deadline)
             if res is None:
                 break
 
@@ -108,104 +136,221 @@ def get_travel_candidates_by_category_in_radius(
             if not documents:
                 break
 
-            for doc in documents:
-                place_info = PlaceInfo(
-                    id=doc["id"],
-                    place_name=doc["place_name"],
-                    road_address_name=doc["road_address_name"],
-                    dest_lat=float(doc["y"]),
-                    dest_lon=float(doc["x"]),
-                )
-                all_places.append(place_info)
+            yield CandidateBatch.from_documents(documents)
 
             if res.get("meta", {}).get("is_end", True):
                 break
 
-    return all_places
+
+def get_travel_candidates_by_category_in_radius(
+    lat: float,
+    lon: float,
+    radius_m: float,
+    category_group_codes: List[PlaceCategory],
+    deadline: Optional[Deadline] = None,
+) -> CandidateBatch:
+    return CandidateBatch.concat(
+        list(
+            iter_travel_candidates_by_category_in_radius(
+                lat, lon, radius_m, category_group_codes, deadline
+            )
+        )
+    )
 
 
-def get_travel_candidates_for_short_travel(
+def iter_travel_candidates_for_short_travel(
     origin_lat: float,
     origin_lon: float,
     radius_m: float,
     category_group_codes: List[PlaceCategory],
     keyword: Optional[str] = None,
-) -> List[PlaceInfo]:
+    deadline: Optional[Deadline] = None,
+) -> Iterator[CandidateBatch]:
     """
     키워드가 주어졌다면 키워드 기반으로,
     그렇지 않다면 카테고리 기반으로 여행지 후보를 검색합니다.
     """
     if keyword and keyword.strip():
         # 키워드가 명확히 존재할 때 → 키워드 기반 검색
-        return get_travel_candidates_by_keyword_in_radius(
+        return iter_travel_candidates_by_keyword_in_radius(
             lat=origin_lat,
             lon=origin_lon,
             radius_m=radius_m,
             keyword=keyword.strip(),
+            deadline=deadline,
         )
     else:
         # 키워드가 없거나 비어있을 때 → 카테고리 기반 검색
-        return get_travel_candidates_by_category_in_radius(
+        return iter_travel_candidates_by_category_in_radius(
             lat=origin_lat,
             lon=origin_lon,
             radius_m=radius_m,
             category_group_codes=category_group_codes,
+            deadline=deadline,
         )
 
 
-def get_travel_candidates_for_long_travel(
+def get_travel_candidates_for_short_travel(
     origin_lat: float,
     origin_lon: float,
     radius_m: float,
     category_group_codes: List[PlaceCategory],
     keyword: Optional[str] = None,
-) -> List[PlaceInfo]:
+    deadline: Optional[Deadline] = None,
+) -> CandidateBatch:
+    return CandidateBatch.concat(
+        list(
+            iter_travel_candidates_for_short_travel(
+                origin_lat,
+                origin_lon,
+                radius_m,
+                category_group_codes,
+                keyword,
+                deadline,
+            )
+        )
+    )
+
+
+def _search_centers(
+    origin_lat: float,
+    origin_lon: float,
+    radius_m: float,
+    inner_radius_m: float = 0.0,
+    keep_center: Optional[Callable[[float, float, float], bool]] = None,
+) -> List[Tuple[float, float]]:
     """
-    긴 여행 시간용:
-    - 원점 1개 + 주변 6개 센터(총 7개 지점)에서 병렬로 장소를 찾아온다.
+    검색 지점.
+    - 짧은 여행: 출발지 1개
+    - 긴 여행: 원점 1개 + 주변 6개 센터(총 7개 지점).
+      검색 원 전체가 inner_radius_m(이미 검색한 반경) 안에 들어가는 센터는 건너뛴다.
+    - keep_center(lat, lon, 검색 반경 m)가 False인 센터(도달 가능 영역과 겹치지 않는
+      센터)도 건너뛴다.
     """
-    centers = make_ring_centers(
-        origin_lat=origin_lat,
-        origin_lon=origin_lon,
-        radius_m=radius_m,
-    )
+    if radius_m <= MAX_KAKAO_RADIUS_M:
+        return [(origin_lat, origin_lon)]
+    return [
+        (lat, lon)
+        for lat, lon in make_ring_centers(
+            origin_lat=origin_lat,
+            origin_lon=origin_lon,
+            radius_m=radius_m,
+        )
+        if haversine_m(origin_lat, origin_lon, lat, lon) + MAX_KAKAO_RADIUS_M
+        > inner_radius_m
+        and (keep_center is None or keep_center(lat, lon, MAX_KAKAO_RADIUS_M))
+    ]
+
 
-    all_places: List[PlaceInfo] = []
+_DONE = object()  # 검색 지점 하나의 페이지를 모두 보냈다는 표시
 
-    max_workers = min(7, len(centers))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_center = {
+
+class CandidateStream:
+    """
+    여행지 후보 검색 결과를 카카오 페이지 단위로 흘려보내는 스트림.
+
+    만드는 즉시 검색 지점(_search_centers)마다 백그라운드 스레드에서 페이지를 가져오기
+    시작한다. 순회하면 그때까지 도착한 페이지를 모아 배치 하나로 내주므로
+    (소비자가 느릴수록 배치가 커진다), 첫 페이지를 필터링/조회하는 동안
+    나머지 페이지와 고리 센터 검색이 계속 진행된다.
+    - id 기준 중복 제거는 도착하는 대로 한다 (exclude_ids도 이미 본 것으로 취급)
+    - inner_radius_m를 주면 그 반경 밖(바깥 고리)의 후보만 내준다
+    - keep_center로 검색할 필요가 없는 고리 센터를 뺄 수 있다 (_search_centers)
+    - close()를 부르면 각 스레드는 진행 중인 페이지까지만 가져오고 멈춘다
+    """
+
+    def __init__(
+        self,
+        origin_lat: float,
+        origin_lon: float,
+        radius_m: float,
+        category_group_codes: List[PlaceCategory],
+        keyword: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        inner_radius_m: float = 0.0,
+        exclude_ids: Iterable[str] = (),
+        keep_center: Optional[Callable[[float, float, float], bool]] = None,
+    ):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.inner_radius_m = inner_radius_m
+        self._seen = set(exclude_ids)
+        self._queue: queue.Queue = queue.Queue()
+        self._closed = threading.Event()
+
+        centers = _search_centers(
+            origin_lat, origin_lon, radius_m, inner_radius_m, keep_center
+        )
+        self._pending = len(centers)
+        if not centers:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(7, len(centers)))
+        for lat, lon in centers:
             executor.submit(
-                get_travel_candidates_for_short_travel,
+                bind_context(self._produce),
                 lat,
                 lon,
-                MAX_KAKAO_RADIUS_M,  # 각 센터별 반경은 최대 20km로 고정
+                min(radius_m, MAX_KAKAO_RADIUS_M),  # 각 센터별 반경은 최대 20km
                 category_group_codes,
                 keyword,
-            ): (lat, lon)
-            for (lat, lon) in centers
-        }
-
-        for future in as_completed(future_to_center):
-            try:
-                places = future.result()
-                all_places.extend(places)
-            except Exception as e:
-                print(
-                    f"Error retrieving places for center {future_to_center[future]}: {e}"
-                )
-
-    # id 기준으로 중복 제거
-    seen_ids: set[str] = set()
-    unique_places: List[PlaceInfo] = []
-
-    for place in all_places:
-        if place.id in seen_ids:
-            continue
-        seen_ids.add(place.id)
-        unique_places.append(place)
-
-    return unique_places
+                deadline,
+            )
+        executor.shutdown(wait=False)  # 스레드는 페이지를 다 보내면 끝난다
+
+    def _produce(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float,
+        category_group_codes: List[PlaceCategory],
+        keyword: Optional[str],
+        deadline: Optional[Deadline],
+    ) -> None:
+        try:
+            pages = iter_travel_candidates_for_short_travel(
+                lat, lon, radius_m, category_group_codes, keyword, deadline
+            )
+            for page in pages:
+                self._queue.put(page)
+                if self._closed.is_set():
+                    break
+        except Exception as e:
+            print(f"Error retrieving places for center {(lat, lon)}: {e}")
+        finally:
+            self._queue.put(_DONE)
+
+    def __iter__(self) -> Iterator[CandidateBatch]:
+        while self._pending:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pages = []
+            for item in items:
+                if item is _DONE:
+                    self._pending -= 1
+                else:
+                    pages.append(item)
+
+            batch = self._fresh(CandidateBatch.concat(pages))
+            if len(batch):
+                yield batch
+
+    def _fresh(self, batch: CandidateBatch) -> CandidateBatch:
+        batch = batch.unique()
+        if self.inner_radius_m > 0:
+            distances_m = batch.distances_km(self.origin_lat, self.origin_lon) * 1000
+            batch = batch.take(distances_m > self.inner_radius_m)
+        batch = batch.take(~batch.id_mask(self._seen))
+        self._seen.update(batch.ids)
+        return batch
+
+    def close(self) -> None:
+        self._closed.set()
 
 
 def get_travel_candidates(
@@ -214,23 +359,21 @@ def get_travel_candidates(
     radius_m: float,
     category_group_codes: List[PlaceCategory],
     keyword: Optional[str] = None,
-) -> List[PlaceInfo]:
+    deadline: Optional[Deadline] = None,
+    inner_radius_m: float = 0.0,
+) -> CandidateBatch:
     """
     여행 시간에 따라 적절한 방법으로 여행지 후보를 검색합니다.
+    inner_radius_m를 주면 그 반경 밖(바깥 고리)의 후보만 반환합니다
+    (여행 시간을 늘렸을 때 이미 검색한 안쪽은 다시 가져오지 않기 위함).
     """
-    if radius_m > MAX_KAKAO_RADIUS_M:
-        return get_travel_candidates_for_long_travel(
-            origin_lat,
-            origin_lon,
-            radius_m,
-            category_group_codes,
-            keyword,
-        )
-    else:
-        return get_travel_candidates_for_short_travel(
-            origin_lat,
-            origin_lon,
-            radius_m,
-            category_group_codes,
-            keyword,
-        )
+    stream = CandidateStream(
+        origin_lat,
+        origin_lon,
+        radius_m,
+        category_group_codes,
+        keyword,
+        deadline,
+        inner_radius_m,
+    )
+    return CandidateBatch.concat(list(stream))
@@ -1,11 +1,14 @@
 import json
 import os
-from typing import List
 
+import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI
 
-from domain.models import FilteredPlaces, ParsedUserInfo, PlaceInfo
+from domain.batch import CandidateBatch
+from domain.models import FilteredPlaces, ParsedUserInfo
+from utils.deadline import Deadline
+from utils.llm import responses_parse
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -47,49 +50,88 @@ prompt_template = """
 """
 
 
+def _keyword_mask(candidates: CandidateBatch, words: list[str]) -> np.ndarray:
+    """
+    이름이나 주소에 words 중 하나라도 그대로 들어 있는 행
+    """
+    words = [w.strip() for w in words if w and w.strip()]
+    return np.fromiter(
+        (
+            any(w in name or w in address for w in words)
+            for name, address in zip(candidates.names, candidates.addresses)
+        ),
+        dtype=bool,
+        count=len(candidates),
+    )
+
+
+def _filter_by_keywords(
+    candidates: CandidateBatch, user_preferences: ParsedUserInfo, k_max: int
+) -> CandidateBatch:
+    """
+    LLM 없이 하는 필터링 (타임아웃 시 degrade).
+    must_avoid 단어가 이름/주소에 그대로 들어 있는 후보는 빼고,
+    dislikes에 걸리는 후보는 뒤로 미룬 다음 앞쪽 k_max개를 남긴다.
+    """
+    kept = candidates.take(
+        ~_keyword_mask(candidates, user_preferences.must_avoid or [])
+    )
+    disliked = _keyword_mask(kept, user_preferences.dislikes or [])
+    return kept.take(np.argsort(disliked, kind="stable")[:k_max])
+
+
 def filter_candidates_by_user_preferences(
-    candidates: List[PlaceInfo],
+    candidates: CandidateBatch,
     user_preferences: ParsedUserInfo,
     candidate_size: int,
-) -> List[PlaceInfo]:
-    if not candidates or candidate_size <= 0:
-        return []
+    deadline: Deadline | None = None,
+) -> CandidateBatch:
+    if not len(candidates) or candidate_size <= 0:
+        return CandidateBatch.empty()
 
     # 결과 최소/최대 개수
     k_min = candidate_size
     k_max = candidate_size * MULTIPLIER
 
     # 후보지 이름 리스트
-    candidates_names = [c.place_name for c in candidates]
+    candidates_names = candidates.names
 
     # 프롬프트에 k_min/k_max 적용
     formatted_prompt = prompt_template.format(k_min=k_min, k_max=k_max).strip()
 
-    response = client.responses.parse(
-        model="gpt-4o-mini",
-        input=[
-            {"role": "system", "content": formatted_prompt},
-            {
-                "role": "user",
-                "content": json.dumps(
-                    {
-                        "preferences": {
-                            "dislikes": user_preferences.dislikes or [],
-                            "must_avoid": user_preferences.must_avoid or [],
+    try:
+        response = responses_parse(
+            client,
+            "filter",
+            deadline,
+            model="gpt-4o-mini",
+            input=[
+                {"role": "system", "content": formatted_prompt},
+                {
+                    "role": "user",
+                    "content": json.dumps(
+                        {
+                            "preferences": {
+                                "dislikes": user_preferences.dislikes or [],
+                                "must_avoid": user_preferences.must_avoid or [],
+                            },
+                            "candidates": candidates_names,
                         },
-                        "candidates": candidates_names,
-                    },
-                    ensure_ascii=False,
-                ),
-            },
-        ],
-        text_format=FilteredPlaces,
-        temperature=0.5,
-    )
+                        ensure_ascii=False,
+                    ),
+                },
+            ],
+            text_format=FilteredPlaces,
+            temperature=0.5,
+        )
+    except APITimeoutError:
+        # 예산 초과 시 단어 일치로만 거른다 (degrade)
+        print("[LLM timeout] 선호 조건 필터링을 단어 일치로 대신합니다.")
+        return _filter_by_keywords(candidates, user_preferences, k_max)
 
     filtered_names = response.output_parsed.places
 
-    # 원본 PlaceInfo 객체로 매칭
-    filtered_candidates = [c for c in candidates if c.place_name in filtered_names]
+    # 원본 후보(행)로 매칭
+    filtered_candidates = candidates.take(candidates.name_mask(filtered_names))
 
-    return filtered_candidates[:k_max]
+    return filtered_candidates.take(slice(k_max))
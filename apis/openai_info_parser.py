@@ -1,10 +1,12 @@
 import os
-from datetime import datetime
 
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from domain.models import ParsedUserInfo
+from utils.deadline import Deadline
+from utils.fixtures import fixture_now
+from utils.llm import responses_parse
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -57,19 +59,41 @@ prompt_template = """
 {now_iso}
 """
 
+previous_template = """
+이전 여행 조건 (이미 추천을 받은 상태):
+{previous_json}
 
-def parse_user_info(user_input: str) -> ParsedUserInfo:
-    now = datetime.now()
-    now_iso = now.isoformat()
+사용자 입력이 이전 조건 중 일부를 바꾸는 말(예: "차 말고 대중교통으로", "4시간으로 늘려줘")이면
+바뀐 항목만 반영하고 나머지 항목은 이전 조건 값을 그대로 유지해라.
+완전히 새로운 여행 조건이면 이전 조건은 무시해라.
+"""
 
-    response = client.responses.parse(
+
+def parse_user_info(
+    user_input: str,
+    deadline: Deadline | None = None,
+    previous: ParsedUserInfo | None = None,
+) -> ParsedUserInfo:
+    """
+    previous(이전 턴의 여행 조건)가 있으면 유저 입력을 그 조건의 변경으로 해석한다.
+    """
+    now = fixture_now()
+    now_iso = now.isoformat()
+    prompt = prompt_template.format(now_iso=now_iso, now=now, user_input=user_input)
+    if previous is not None:
+        prompt += previous_template.format(
+            previous_json=previous.model_dump_json(exclude_none=True)
+        )
+
+    response = responses_parse(
+        client,
+        "info_parser",
+        deadline,
         model="gpt-4o-mini",
         input=[
             {
                 "role": "system",
-                "content": prompt_template.format(
-                    now_iso=now_iso, now=now, user_input=user_input
-                ).strip(),
+                "content": prompt.strip(),
             },
         ],
         text_format=ParsedUserInfo,
@@ -2,10 +2,12 @@ import json
 import os
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI
 
 from domain.enums import ChatIntent
 from domain.models import ParsedUserIntent
+from utils.deadline import Deadline
+from utils.llm import responses_parse
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -18,11 +20,11 @@ prompt_template = """
 
 가능한 intent:
 - TRIP_INFO:
-    새로운 여행 조건을 말하거나 기존 조건을 보완하는 경우.
+    새로운 여행 조건을 말하거나 기존 조건을 보완/변경하는 경우.
 - NEXT_CANDIDATE:
     이미 여행지 추천을 받은 상태에서 '다른 후보 자체'를 요청하는 경우.
 - FOLLOW_UP:
-    방금 추천된 장소를 전제로 상세 질문, 조건 변경, 비교를 요청하는 경우.
+    방금 추천된 장소를 전제로 상세 질문, 비교를 요청하는 경우.
 - UNKNOWN:
     위 세 가지로 분류할 수 없거나 금지 콘텐츠 포함.
 
@@ -33,8 +35,9 @@ prompt_template = """
 
 - has_already_recommended = True:
       "다른 곳", "또 추천해줘", "다음 후보" → NEXT_CANDIDATE  
-      추천된 장소 기반 질문/조건 변경 → FOLLOW_UP  
-      완전히 새로운 여행 조건 → TRIP_INFO
+      추천된 장소 기반 질문/비교 → FOLLOW_UP  
+      완전히 새로운 여행 조건, 또는 기존 조건 변경
+      (교통수단, 여행 시간, 날짜, 출발지, 선호 등. 예: "차 말고 대중교통으로") → TRIP_INFO
       위 세 가지에 해당하지 않으면 UNKNOWN.
 
 [안전/윤리 규칙]
@@ -53,12 +56,14 @@ intent 하나만 반환해라.
 def parse_user_intent(
     user_text: str,
     has_already_recommended: bool,
+    deadline: Deadline | None = None,
 ) -> ChatIntent:
     """
     LLM을 사용해서 사용자의 발화를 ChatIntent 중 하나로 분류한다.
     Args:
         user_text: 사용자가 입력한 텍스트
         has_already_recommended: 이미 여행지 후보를 하나 이상 추천한 뒤의 대화인지 여부
+        deadline: 턴 단위 지연 예산. 초과하면 UNKNOWN으로 처리한다.
     """
 
     payload = {
@@ -66,18 +71,25 @@ def parse_user_intent(
         "utterance": user_text,
     }
 
-    response = client.responses.parse(
-        model="gpt-4o-mini",
-        input=[
-            {"role": "system", "content": prompt_template.strip()},
-            {
-                "role": "user",
-                "content": json.dumps(payload, ensure_ascii=False),
-            },
-        ],
-        text_format=ParsedUserIntent,
-        temperature=0,
-    )
+    try:
+        response = responses_parse(
+            client,
+            "intent_parser",
+            deadline,
+            model="gpt-4o-mini",
+            input=[
+                {"role": "system", "content": prompt_template.strip()},
+                {
+                    "role": "user",
+                    "content": json.dumps(payload, ensure_ascii=False),
+                },
+            ],
+            text_format=ParsedUserIntent,
+            temperature=0,
+        )
+    except APITimeoutError:
+        print("[LLM timeout] intent 분류 실패 → UNKNOWN")
+        return ChatIntent.UNKNOWN
 
     parsed = response.output_parsed
     return parsed.intent
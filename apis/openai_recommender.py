@@ -1,14 +1,17 @@
 import json
 import os
+from dataclasses import replace
 from typing import List
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI
 
 from domain.models import (
     DestinationCandidate,
     LLMRecommendedCandidates,
 )
+from utils.deadline import Deadline
+from utils.llm import responses_parse
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -89,6 +92,7 @@ def recommend_top_k_candidates(
     must_include: List[str],
     likes: List[str],
     k: int,
+    deadline: Deadline | None = None,
 ) -> List[DestinationCandidate]:
     if not candidates or k <= 0:
         return []
@@ -101,27 +105,35 @@ def recommend_top_k_candidates(
         for c in candidates
     ]
 
-    response = client.responses.parse(
-        model="gpt-4o-mini",
-        input=[
-            {"role": "system", "content": prompt_template.strip()},
-            {
-                "role": "user",
-                "content": json.dumps(
-                    {
-                        "preferences": {
-                            "must_include": must_include,
-                            "likes": likes,
+    try:
+        response = responses_parse(
+            client,
+            "recommender",
+            deadline,
+            model="gpt-4o-mini",
+            input=[
+                {"role": "system", "content": prompt_template.strip()},
+                {
+                    "role": "user",
+                    "content": json.dumps(
+                        {
+                            "preferences": {
+                                "must_include": must_include,
+                                "likes": likes,
+                            },
+                            "candidates": candidates_summary,
                         },
-                        "candidates": candidates_summary,
-                    },
-                    ensure_ascii=False,
-                ),
-            },
-        ],
-        text_format=LLMRecommendedCandidates,
-        temperature=0,
-    )
+                        ensure_ascii=False,
+                    ),
+                },
+            ],
+            text_format=LLMRecommendedCandidates,
+            temperature=0,
+        )
+    except APITimeoutError:
+        # 예산 초과 시 실외 활동 점수 순으로만 정렬해서 반환 (추천 이유 없음)
+        print("[LLM timeout] 실외 활동 점수 순으로 top k를 고릅니다.")
+        return sorted(candidates, key=lambda c: c.outdoor_score, reverse=True)[:k]
 
     llm_result: LLMRecommendedCandidates = response.output_parsed
 
@@ -136,9 +148,8 @@ def recommend_top_k_candidates(
         if cand is None:
             # LLM이 이상한 이름을 뱉으면 그냥 무시
             continue
-        # reason 채워넣기
-        cand.reason = rec.reason
-        ordered.append(cand)
+        # reason 채워넣기 (DestinationCandidate는 frozen이므로 복사본)
+        ordered.append(replace(cand, reason=rec.reason))
 
     # 혹시 LLM이 k개보다 많이 줬으면 k개까지만 자르기
     return ordered[:k]
@@ -3,7 +3,10 @@ import json
 import os
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import APITimeoutError, OpenAI
+
+from utils.deadline import Deadline
+from utils.llm import responses_create
 
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -74,7 +77,17 @@ prompt_template = """
 """
 
 
-def handle_unknown_input(user_input: str, has_already_recommended: bool) -> str:
+FALLBACK_RESPONSE = (
+    "죄송해요, 지금은 답변이 조금 지연되고 있어요. "
+    "출발지, 여행 시간, 교통수단을 알려주시면 여행지를 추천해 드릴게요."
+)
+
+
+def handle_unknown_input(
+    user_input: str,
+    has_already_recommended: bool,
+    deadline: Deadline | None = None,
+) -> str:
     """
     여행 intent로 분류되지 않은 발화에 대해
     '여행 챗봇으로서' 자연스럽게 응답을 생성한다.
@@ -84,17 +97,23 @@ def handle_unknown_input(user_input: str, has_already_recommended: bool) -> str:
         "utterance": user_input,
     }
 
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=[
-            {"role": "system", "content": prompt_template.strip()},
-            {
-                "role": "user",
-                "content": json.dumps(user_payload, ensure_ascii=False),
-            },
-        ],
-        temperature=0.5,
-    )
+    try:
+        resp = responses_create(
+            client,
+            "unknown_handler",
+            deadline,
+            model="gpt-4o-mini",
+            input=[
+                {"role": "system", "content": prompt_template.strip()},
+                {
+                    "role": "user",
+                    "content": json.dumps(user_payload, ensure_ascii=False),
+                },
+            ],
+            temperature=0.5,
+        )
+    except APITimeoutError:
+        return FALLBACK_RESPONSE
 
     first_output = resp.output[0]
     first_content = first_output.content[0]
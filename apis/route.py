@@ -1,9 +1,12 @@
+import math
 import os
 from datetime import datetime
 
 from dotenv import load_dotenv
 
 from domain.enums import Transportation
+from utils.cache import TTLCache
+from utils.deadline import Deadline
 from utils.http import safe_get
 
 load_dotenv()
@@ -11,12 +14,51 @@ load_dotenv()
 ODSAY_API_KEY = os.getenv("ODSAY_API_KEY")
 KAKAO_API_KEY = os.getenv("KAKAO_API_KEY")
 
+# 조회한 왕복 시간을 다시 써도 되는 시간 (자동차 경로는 조회 시점의 교통 예측을 반영)
+ROUTE_TTL_SECONDS = float(os.getenv("ROUTE_TTL_SECONDS", str(6 * 3600)))
+# 자동차 경로는 출발 시각을 이 단위(분)로 묶어서 보관한다 (같은 시간대 출발은 같은 경로)
+ROUTE_TIME_BUCKET_MINUTES = int(os.getenv("ROUTE_TIME_BUCKET_MINUTES", "60"))
+
+# 경로가 없다는 응답(카카오 result_code != 0, ODsay path 없음)을 받았을 때 쓰는 왕복 시간.
+# 경로 조회 함수는 경로 없음을 NaN으로 돌려주고(측정한 시간과 구분), get_round_trip_hours가
+# no_route_hours(기본값 이 값)로 바꾼다
+NO_ROUTE_FALLBACK_HOURS = 1.0
+
+_routes = TTLCache("route", ROUTE_TTL_SECONDS, max_entries=65536)
+
+
+def _route_key(
+    transport: Transportation,
+    departure_datetime: str,
+    origin_lat: float,
+    origin_lon: float,
+    dest_lat: float,
+    dest_lon: float,
+) -> tuple:
+    """
+    좌표는 약 10m 단위, 자동차 출발 시각은 ROUTE_TIME_BUCKET_MINUTES 단위
+    (대중교통은 출발 시각을 반영하지 않는다)
+    """
+    bucket = None
+    if transport == Transportation.CAR:
+        dt = datetime.fromisoformat(departure_datetime)
+        minutes = dt.hour * 60 + dt.minute
+        bucket = (dt.date(), minutes // ROUTE_TIME_BUCKET_MINUTES)
+    coords = tuple(round(v, 4) for v in (origin_lat, origin_lon, dest_lat, dest_lon))
+    return transport, bucket, coords
+
 
 def get_round_trip_hours_by_car(
-    departure_datetime, origin_lat, origin_lon, dest_lat, dest_lon
+    departure_datetime,
+    origin_lat,
+    origin_lon,
+    dest_lat,
+    dest_lon,
+    deadline: Deadline | None = None,
 ):
     """
     출발 시각, 출발지, 목적지를 받고 왕복 이동 시간을 계산합니다.
+    응답을 받지 못하면(deadline 만료, API 오류) None을, 경로가 없으면 NaN을 반환합니다.
     """
     url = "https://apis-navi.kakaomobility.com/v1/future/directions"
     headers = {"Authorization": f"KakaoAK {KAKAO_API_KEY}"}
@@ -28,25 +70,31 @@ def get_round_trip_hours_by_car(
         "destination": f"{dest_lon},{dest_lat}",
     }
 
-    res = safe_get(url, headers=headers, params=params)
+    res = safe_get(url, headers=headers, params=params, deadline=deadline)
+    if not res or not res.get("routes"):
+        return None
 
     round_trip_hours = (
         (res["routes"][0]["summary"]["duration"] * 2 / 3600.0)
         if res["routes"][0]["result_code"] == 0
-        else 1
+        else math.nan
     )
 
     return round_trip_hours
 
 
-def get_round_trip_hours_by_public(origin_lat, origin_lon, dest_lat, dest_lon):
+def get_round_trip_hours_by_public(
+    origin_lat, origin_lon, dest_lat, dest_lon, deadline: Deadline | None = None
+):
     """
     ODsay 대중교통 API를 사용해
     출발 시각, 출발지, 목적지를 받고 왕복 대중교통 이동 시간을 계산합니다.
 
     반환:
         왕복 소요 시간(시간 단위, float)
-        - API 실패 또는 경로 없음 시, 기본값 1시간 반환
+        - 경로 없음 시, NaN 반환
+        - 응답을 받지 못하거나(deadline 만료 등) 오류 응답(result/info/totalTime 없음)이면
+          None 반환 (보관하지 않고, 다음 조회에서 다시 시도한다)
     """
     # ODsay는 departure_datetime을 직접 받지는 않지만,
     # 시각에 따라 경로가 달라질 수 있는 여지를 고려하려면 나중에 추가 옵션 사용 가능.
@@ -62,34 +110,37 @@ def get_round_trip_hours_by_public(origin_lat, origin_lon, dest_lat, dest_lon):
     }
 
     try:
-        res = safe_get(url, params=params)
+        res = safe_get(url, params=params, deadline=deadline)
     except Exception as e:
         print("ODsay API 호출 오류:", e)
-        return 1.0  # fallback
+        return None
+
+    if res is None:
+        return None
 
     # 기본 구조 체크
     result = res.get("result")
     if not result:
         print("ODsay: result 없음:", res)
-        return 1.0
+        return None
 
     path_list = result.get("path")
     if not path_list:
         print("ODsay: path 없음:", result)
-        return 1.0
+        return math.nan
 
     # 첫 번째 경로를 최적 경로로 사용
     best_path = path_list[0]
     info = best_path.get("info")
     if not info:
         print("ODsay: info 없음:", best_path)
-        return 1.0
+        return None
 
     # totalTime: 편도 소요 시간(분 단위)
     total_time_min = info.get("totalTime")
     if total_time_min is None:
         print("ODsay: totalTime 없음:", info)
-        return 1.0
+        return None
 
     # 왕복 시간(시간 단위)로 변환
     round_trip_hours = (total_time_min * 2) / 60.0
@@ -103,6 +154,8 @@ def get_round_trip_hours(
     origin_lon: float,
     dest_lat: float,
     dest_lon: float,
+    deadline: Deadline | None = None,
+    no_route_hours: float = NO_ROUTE_FALLBACK_HOURS,
 ) -> dict[Transportation, float | None]:
     """
     교통수단에 따라 왕복 소요 시간을 계산한다.
@@ -116,6 +169,8 @@ def get_round_trip_hours(
     - transportation == CAR → car만 호출
     - transportation == PUBLIC → public만 호출
     - transportation == None → 둘 다 호출
+    - 조회한 결과는 ROUTE_TTL_SECONDS 동안 보관한다 (_route_key)
+    - 경로가 없으면 no_route_hours (도달 불가로 봐야 하는 호출자는 NaN을 넘긴다)
     """
 
     result = {
@@ -123,16 +178,23 @@ def get_round_trip_hours(
         Transportation.PUBLIC: None,
     }
 
+    coords = (origin_lat, origin_lon, dest_lat, dest_lon)
+
     # CAR 요청
     if transportation in (None, Transportation.CAR):
-        result[Transportation.CAR] = get_round_trip_hours_by_car(
-            departure_datetime, origin_lat, origin_lon, dest_lat, dest_lon
+        result[Transportation.CAR] = _routes.get_or_load(
+            _route_key(Transportation.CAR, departure_datetime, *coords),
+            lambda: get_round_trip_hours_by_car(departure_datetime, *coords, deadline),
         )
 
     # PUBLIC 요청
     if transportation in (None, Transportation.PUBLIC):
-        result[Transportation.PUBLIC] = get_round_trip_hours_by_public(
-            origin_lat, origin_lon, dest_lat, dest_lon
+        result[Transportation.PUBLIC] = _routes.get_or_load(
+            _route_key(Transportation.PUBLIC, departure_datetime, *coords),
+            lambda: get_round_trip_hours_by_public(*coords, deadline),
         )
 
+    for transport, hours in result.items():
+        if hours is not None and math.isnan(hours):
+            result[transport] = no_route_hours
     return result
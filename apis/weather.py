@@ -1,15 +1,42 @@
+import os
+from typing import List, Tuple
+
 from domain.enums import WeatherCode
 from domain.models import DailyWeather
+from utils.cache import TTLCache
+from utils.deadline import Deadline
 from utils.http import safe_get
+from utils.rate_limiter import quota_units
 from utils.weather_helper import get_daily_index
 
+# 조회한 예보를 다시 써도 되는 시간 (open-meteo 예보 모델 갱신 주기)
+FORECAST_TTL_SECONDS = float(os.getenv("FORECAST_TTL_SECONDS", str(3 * 3600)))
+# 예보는 이 격자(도) 단위로 보관한다 (가까운 후보끼리 같은 예보를 쓴다)
+FORECAST_GRID_DEG = float(os.getenv("FORECAST_GRID_DEG", "0.02"))
+# 다중 지점 요청 1회에 넣는 최대 지점 수 (URL 길이, 실패 시 잃는 범위를 제한)
+WEATHER_BATCH_MAX_LOCATIONS = int(os.getenv("WEATHER_BATCH_MAX_LOCATIONS", "100"))
+
+_forecasts = TTLCache("forecast", FORECAST_TTL_SECONDS, max_entries=16384)
+
+
+def _forecast_key(lat: float, lon: float, departure_datetime_iso: str) -> tuple:
+    return (
+        round(lat / FORECAST_GRID_DEG),
+        round(lon / FORECAST_GRID_DEG),
+        departure_datetime_iso[:10],
+    )
+
 
 def get_weather_new(
-    lat: float, lon: float, departure_datetime_iso: str
+    lat: float,
+    lon: float,
+    departure_datetime_iso: str,
+    deadline: Deadline | None = None,
 ) -> DailyWeather | None:
     """
     open-meteo.com의 API를 사용하여 특정 날짜(departure_datetime_iso)의
     하루 단위 요약 날씨를 가져온다.
+    응답을 받지 못하면(deadline 만료, API 오류) None을 반환한다.
     """
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
@@ -25,7 +52,89 @@ def get_weather_new(
     }
 
     # 응답 JSON 전체
-    res = safe_get(url, params=params)
+    res = safe_get(url, params=params, deadline=deadline)
+    return _daily_weather(res, departure_datetime_iso)
+
+
+def get_weather_batch(
+    coords: List[Tuple[float, float]],
+    departure_datetime_iso: str,
+    deadline: Deadline | None = None,
+) -> List[DailyWeather | None]:
+    """
+    여러 지점의 날씨를 다중 지점 호출로 가져온다.
+    open-meteo는 latitude/longitude에 쉼표로 이은 좌표 목록을 받으면
+    지점 순서대로 응답 리스트를 돌려준다.
+    응답을 받지 못한 지점은 None.
+    보관한 예보(FORECAST_TTL_SECONDS, FORECAST_GRID_DEG 격자)가 있는 지점은 조회하지 않고,
+    같은 격자의 지점은 한 번만 조회한다.
+    요청 1회에는 WEATHER_BATCH_MAX_LOCATIONS 지점까지만 넣는다 (요청 하나가 실패해도
+    다른 요청의 지점은 채운다).
+    """
+    keys = [_forecast_key(lat, lon, departure_datetime_iso) for lat, lon in coords]
+    forecasts = [_forecasts.get(key) for key in keys]
+    # 격자마다 대표 좌표 하나 (처음 나온 지점)
+    missing: dict[tuple, Tuple[float, float]] = {}
+    for key, coord, forecast in zip(keys, coords, forecasts):
+        if forecast is None:
+            missing.setdefault(key, coord)
+    if not missing:
+        return forecasts
+
+    missing_keys = list(missing)
+    fetched: dict[tuple, DailyWeather] = {}
+    for start in range(0, len(missing_keys), WEATHER_BATCH_MAX_LOCATIONS):
+        chunk = missing_keys[start : start + WEATHER_BATCH_MAX_LOCATIONS]
+        results = _fetch_weather_batch(
+            [missing[key] for key in chunk], departure_datetime_iso, deadline
+        )
+        for key, forecast in zip(chunk, results):
+            if forecast is not None:
+                fetched[key] = forecast
+                _forecasts.put(key, forecast)
+
+    return [
+        forecast if forecast is not None else fetched.get(key)
+        for key, forecast in zip(keys, forecasts)
+    ]
+
+
+def _fetch_weather_batch(
+    coords: List[Tuple[float, float]],
+    departure_datetime_iso: str,
+    deadline: Deadline | None = None,
+) -> List[DailyWeather | None]:
+    url = "https://api.open-meteo.com/v1/forecast"
+    params = {
+        "latitude": ",".join(f"{lat:.6f}" for lat, _ in coords),
+        "longitude": ",".join(f"{lon:.6f}" for _, lon in coords),
+        "timezone": "Asia/Seoul",
+        "daily": (
+            "weathercode",
+            "temperature_2m_max",
+            "temperature_2m_min",
+            "precipitation_sum",
+        ),
+    }
+
+    # open-meteo는 다중 지점 요청을 지점 수만큼의 호출로 센다
+    with quota_units(len(coords)):
+        res = safe_get(url, params=params, deadline=deadline)
+    # 지점이 하나면 리스트가 아니라 객체 하나로 온다
+    results = [res] if isinstance(res, dict) else res or []
+    if len(results) != len(coords):
+        return [None] * len(coords)
+    return [_daily_weather(r, departure_datetime_iso) for r in results]
+
+
+def _daily_weather(
+    res: dict | None, departure_datetime_iso: str
+) -> DailyWeather | None:
+    """
+    open-meteo 응답(지점 하나)에서 출발 날짜의 하루 요약 날씨만 꺼낸다.
+    """
+    if not res or "daily" not in res:
+        return None
     daily = res["daily"]
 
     # ISO 날짜에서 날짜 부분만 추출
@@ -39,11 +148,9 @@ def get_weather_new(
         return None
 
     # 하루 요약 날씨만 추출
-    daily_weather = DailyWeather(
+    return DailyWeather(
         weather_code=WeatherCode(daily["weathercode"][daily_index]),
         t_max=daily["temperature_2m_max"][daily_index],
         t_min=daily["temperature_2m_min"][daily_index],
         precipitation_sum=daily["precipitation_sum"][daily_index],
     )
-
-    return daily_weather
@@ -0,0 +1,302 @@
+"""
+배치 평가: 여러 입력을 동시에 실행하고 gold 랭킹 대비 추천 품질과 처리량을 함께 측정한다.
+
+- 입력: travel_samples.json(리스트) 또는 JSONL(한 줄에 {"id", "user_input"} 하나)
+- 실행: 스레드 풀 또는 프로세스 풀 (--executor), 업스트림 동시 요청 수 상한 (--max-upstream)
+- 품질: travel_samples_gold.json의 ranking 대비 hit@k, NDCG@k, MRR
+- 속도: 처리량(시나리오/초), 시나리오 지연 p50/p95, 업스트림 호출 수, LLM 토큰
+
+로컬 랭커, 캐시, 추정치 같은 속도 최적화가 품질을 떨어뜨리는지 같은 리포트에서 보기 위한 도구.
+기본은 fixture 재생 (benchmarks.pipeline과 동일한 옵션).
+
+사용 예:
+    python -m benchmarks.evaluate --workers 8 --out eval_base.json
+    python -m benchmarks.evaluate --workers 8 --compare eval_base.json
+    python -m benchmarks.evaluate --executor process --workers 4 --max-upstream 32
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.pipeline import (
+    SAMPLES_FILE,
+    TOP_K,
+    _git_revision,
+    _percentile,
+    _prepare_environment,
+    run_scenario,
+)
+
+GOLD_FILE = "travel_samples_gold.json"
+
+
+# -----------------------------
+# 랭킹 지표
+# -----------------------------
+
+
+def _normalize(name: str) -> str:
+    return "".join(name.split()).lower()
+
+
+def _matches(predicted: str, gold: str) -> bool:
+    """
+    장소 이름 비교. 카카오 장소명과 gold 표기가 조금씩 달라서
+    (예: "광교 카페거리" vs "광교카페거리") 공백을 무시하고 포함 관계까지 일치로 본다.
+    """
+    p, g = _normalize(predicted), _normalize(gold)
+    return bool(p and g) and (p == g or p in g or g in p)
+
+
+def _gold_index(predicted: str, gold: list[str]) -> int | None:
+    return next((i for i, g in enumerate(gold) if _matches(predicted, g)), None)
+
+
+def ranking_metrics(predicted: list[str], gold: list[str], k: int) -> dict:
+    """
+    - hit@k: top-k 안에 gold 장소가 하나라도 있으면 1
+    - ndcg@k: gold 순위가 높을수록 큰 relevance (len(gold) - gold 순위)
+    - mrr: gold에 있는 첫 추천의 역순위 (top-k 안에서)
+    같은 gold 장소에 여러 번 맞으면 처음 한 번만 인정한다.
+    """
+    top = predicted[:k]
+    used: set[int] = set()
+    gains = []
+    for name in top:
+        index = _gold_index(name, gold)
+        if index is None or index in used:
+            gains.append(0)
+            continue
+        used.add(index)
+        gains.append(len(gold) - index)
+
+    dcg = sum(gain / math.log2(rank + 2) for rank, gain in enumerate(gains))
+    ideal = sorted((len(gold) - i for i in range(len(gold))), reverse=True)[:k]
+    idcg = sum(gain / math.log2(rank + 2) for rank, gain in enumerate(ideal))
+    first_hit = next((rank for rank, gain in enumerate(gains) if gain), None)
+
+    return {
+        f"hit@{k}": 1.0 if first_hit is not None else 0.0,
+        f"ndcg@{k}": dcg / idcg if idcg else 0.0,
+        "mrr": 1.0 / (first_hit + 1) if first_hit is not None else 0.0,
+    }
+
+
+# -----------------------------
+# 입력
+# -----------------------------
+
+
+def load_inputs(path: str) -> list[dict]:
+    """
+    .json(리스트) 또는 .jsonl 파일에서 {"id", "user_input"} 목록을 읽는다.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = json.load(f)
+
+    inputs = []
+    for i, row in enumerate(rows, start=1):
+        user_input = row.get("user_input")
+        if user_input:
+            inputs.append({"id": row.get("id", i), "user_input": user_input})
+    return inputs
+
+
+def load_gold(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {row["id"]: row["gold_place"]["ranking"] for row in json.load(f)}
+    except FileNotFoundError:
+        return {}
+
+
+# -----------------------------
+# 실행
+# -----------------------------
+
+
+def _init_worker(fixtures: str, fixture_dir: str, latency: str, now: str) -> None:
+    """
+    프로세스 풀 워커 초기화: 부모와 같은 fixture 설정을 적용한다.
+    """
+    _prepare_environment(fixtures)
+    if fixtures != "live":
+        from utils.fixtures import install_fixtures
+
+        install_fixtures(fixtures, fixture_dir, latency, now=now)
+
+
+def _run_one(sample: dict, use_deadline: bool) -> dict:
+    return run_scenario(sample, use_deadline, measure_memory=False)
+
+
+def _make_executor(kind: str, workers: int, init_args: tuple) -> Executor:
+    if kind == "process":
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=init_args
+        )
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _summarize(results: list[dict], wall: float, k: int) -> dict:
+    latencies = [r["wall_ms"] for r in results]
+    graded = [r for r in results if r.get("quality")]
+    quality = {
+        metric: round(statistics.mean(r["quality"][metric] for r in graded), 4)
+        for metric in (f"hit@{k}", f"ndcg@{k}", "mrr")
+        if graded
+    }
+    return {
+        "scenarios": len(results),
+        "graded": len(graded),
+        "errors": sum(1 for r in results if r["error"]),
+        "empty": sum(1 for r in results if not r["recommended"]),
+        "quality": quality,
+        "wall_s": round(wall, 3),
+        "throughput_per_s": round(len(results) / wall, 3) if wall else 0.0,
+        "latency_ms_p50": round(statistics.median(latencies), 3) if results else 0,
+        "latency_ms_p95": round(_percentile(latencies, 0.95), 3) if results else 0,
+        "upstream_calls_total": sum(r["upstream_calls"] for r in results),
+        "llm_tokens_total": sum(r["llm_tokens"]["total"] for r in results),
+    }
+
+
+def run_evaluation(
+    inputs: list[dict],
+    gold: dict,
+    executor: Executor,
+    k: int,
+    use_deadline: bool,
+) -> tuple[list[dict], float]:
+    start = time.perf_counter()
+    futures = [executor.submit(_run_one, sample, use_deadline) for sample in inputs]
+
+    results = []
+    for future in futures:
+        result = future.result()
+        gold_ranking = gold.get(result["id"])
+        result["gold"] = gold_ranking
+        result["quality"] = (
+            ranking_metrics(result["recommended"], gold_ranking, k)
+            if gold_ranking
+            else None
+        )
+        results.append(result)
+    return results, time.perf_counter() - start
+
+
+def _print_report(summary: dict, base: dict | None) -> None:
+    base_summary = base["summary"] if base else {}
+    rows = [(name, value) for name, value in summary["quality"].items()]
+    rows += [
+        ("throughput_per_s", summary["throughput_per_s"]),
+        ("latency_ms_p50", summary["latency_ms_p50"]),
+        ("latency_ms_p95", summary["latency_ms_p95"]),
+        ("upstream_calls_total", summary["upstream_calls_total"]),
+        ("llm_tokens_total", summary["llm_tokens_total"]),
+    ]
+
+    print(
+        f"\n{'metric':<24}{'current':>12}"
+        + (f"{'base':>12}{'delta':>11}" if base else "")
+    )
+    for name, value in rows:
+        line = f"{name:<24}{value:>12.4g}"
+        if base:
+            before = base_summary.get("quality", {}).get(name, base_summary.get(name))
+            if before is not None:
+                delta = f"{(value - before) / before * 100:+.1f}%" if before else "-"
+                line += f"{before:>12.4g}{delta:>11}"
+        print(line)
+    print(
+        f"\nscenarios={summary['scenarios']} graded={summary['graded']} "
+        f"errors={summary['errors']} empty={summary['empty']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--inputs", default=SAMPLES_FILE, help=".json 또는 .jsonl")
+    parser.add_argument("--gold", default=GOLD_FILE)
+    parser.add_argument("-k", type=int, default=TOP_K)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument(
+        "--max-upstream",
+        type=int,
+        default=16,
+        help="프로세스당 업스트림 동시 요청 상한 (0이면 제한 없음)",
+    )
+    parser.add_argument(
+        "--fixtures", choices=("replay", "record", "live"), default="replay"
+    )
+    parser.add_argument("--fixture-dir", default=None)
+    parser.add_argument("--latency", default="")
+    parser.add_argument("--now", default="")
+    parser.add_argument("--deadline", action="store_true")
+    parser.add_argument("--out", help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    _prepare_environment(args.fixtures)
+
+    from utils.fixtures import FIXTURE_DIR
+    from utils.http import set_upstream_concurrency
+
+    fixture_dir = args.fixture_dir or FIXTURE_DIR
+    init_args = (args.fixtures, fixture_dir, args.latency, args.now)
+    set_upstream_concurrency(args.max_upstream)
+    # 프로세스 워커는 환경 변수로 상한을 물려받는다
+    os.environ["MAX_UPSTREAM_CONCURRENCY"] = str(args.max_upstream)
+    if args.executor == "thread":
+        _init_worker(*init_args)
+
+    inputs = load_inputs(args.inputs)
+    gold = load_gold(args.gold)
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    with _make_executor(args.executor, args.workers, init_args) as executor:
+        results, wall = run_evaluation(inputs, gold, executor, args.k, args.deadline)
+
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "started_at": started_at,
+            "python": platform.python_version(),
+            "inputs": args.inputs,
+            "k": args.k,
+            "executor": args.executor,
+            "workers": args.workers,
+            "max_upstream": args.max_upstream,
+            "fixtures": args.fixtures,
+            "latency": args.latency or None,
+            "deadline": args.deadline,
+        },
+        "summary": _summarize(results, wall, args.k),
+        "scenarios": results,
+    }
+
+    base = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            base = json.load(f)
+    _print_report(report["summary"], base)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False, indent=2) + "\n")
+        print(f"[eval] 결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
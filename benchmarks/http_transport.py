@@ -0,0 +1,263 @@
+"""
+requests(HTTP/1.1) vs httpx(HTTP/2) 전송 백엔드 비교 벤치마크.
+
+파이프라인의 실제 fan-out을 흉내낸다.
+- weather: 6단계처럼 후보 N개(기본 30 = k * MULTIPLIER)의 날씨를 동시에 조회 (Open-Meteo, 키 불필요)
+- google: 최종 출력처럼 장소마다 상세 정보 + 사진 메타데이터를 동시에 조회
+  (GOOGLE_PLACES_API_KEY가 있을 때만)
+
+재시도/쿼터/single-flight 영향을 빼기 위해 utils.transport 백엔드를 직접 호출한다.
+
+사용 예:
+    python -m benchmarks.http_transport --rounds 5 --fanout 30 --workers 8
+    python -m benchmarks.http_transport --json > bench_output.txt
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from utils.transport import (
+    HTTP2_AVAILABLE,
+    AsyncHttpxTransport,
+    HttpxTransport,
+    RequestsTransport,
+    TransportError,
+)
+
+load_dotenv()
+GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
+
+WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+GOOGLE_SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+GOOGLE_PLACE_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+TIMEOUT = (10.0, 15.0)
+
+# 서울 근교 좌표 범위 (후보지 흉내)
+LAT_RANGE = (37.2, 37.8)
+LON_RANGE = (126.7, 127.4)
+
+
+def _weather_requests(fanout: int, rng: random.Random) -> list[dict]:
+    requests_ = []
+    for _ in range(fanout):
+        requests_.append(
+            {
+                "method": "GET",
+                "url": WEATHER_URL,
+                "params": {
+                    "latitude": round(rng.uniform(*LAT_RANGE), 4),
+                    "longitude": round(rng.uniform(*LON_RANGE), 4),
+                    "timezone": "Asia/Seoul",
+                    "daily": (
+                        "weathercode",
+                        "temperature_2m_max",
+                        "temperature_2m_min",
+                        "precipitation_sum",
+                    ),
+                },
+            }
+        )
+    return requests_
+
+
+def _google_requests(place_ids: list[str]) -> list[dict]:
+    requests_ = []
+    for place_id in place_ids:
+        url = GOOGLE_PLACE_URL.format(place_id=place_id)
+        for field_mask in ("editorialSummary,reviews.text", "photos"):
+            requests_.append(
+                {
+                    "method": "GET",
+                    "url": url,
+                    "headers": {
+                        "X-Goog-Api-Key": GOOGLE_API_KEY,
+                        "X-Goog-FieldMask": field_mask,
+                    },
+                }
+            )
+    return requests_
+
+
+def _lookup_place_ids(queries: list[str]) -> list[str]:
+    transport = RequestsTransport()
+    place_ids = []
+    for query in queries:
+        res = transport.request(
+            "POST",
+            GOOGLE_SEARCH_URL,
+            timeout=TIMEOUT,
+            headers={
+                "Content-Type": "application/json",
+                "X-Goog-Api-Key": GOOGLE_API_KEY,
+                "X-Goog-FieldMask": "places.id",
+            },
+            json={"textQuery": query},
+        )
+        places = res.json().get("places") if res.status_code == 200 else None
+        if places:
+            place_ids.append(places[0]["id"])
+    return place_ids
+
+
+def _timed_sync(transport, request: dict) -> tuple[float, bool, str]:
+    start = time.perf_counter()
+    try:
+        res = transport.request(timeout=TIMEOUT, **request)
+        ok = res.status_code < 400
+        version = res.http_version
+    except TransportError:
+        ok, version = False, "-"
+    return time.perf_counter() - start, ok, version
+
+
+def run_sync_round(transport, requests_: list[dict], workers: int) -> dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda r: _timed_sync(transport, r), requests_))
+    wall = time.perf_counter() - start
+    return _summarize(results, wall)
+
+
+async def _run_async_round(
+    transport: AsyncHttpxTransport, requests_: list[dict]
+) -> dict:
+    async def timed(request: dict) -> tuple[float, bool, str]:
+        start = time.perf_counter()
+        try:
+            res = await transport.request(timeout=TIMEOUT, **request)
+            ok = res.status_code < 400
+            version = res.http_version
+        except TransportError:
+            ok, version = False, "-"
+        return time.perf_counter() - start, ok, version
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed(r) for r in requests_))
+    wall = time.perf_counter() - start
+    return _summarize(results, wall)
+
+
+def _summarize(results: list[tuple[float, bool, str]], wall: float) -> dict:
+    latencies = sorted(r[0] for r in results)
+    p95_index = max(0, int(round(0.95 * len(latencies))) - 1)
+    return {
+        "wall_s": wall,
+        "p50_s": statistics.median(latencies) if latencies else 0.0,
+        "p95_s": latencies[p95_index] if latencies else 0.0,
+        "errors": sum(1 for r in results if not r[1]),
+        "http_versions": sorted({r[2] for r in results}),
+    }
+
+
+def _aggregate(rounds: list[dict]) -> dict:
+    return {
+        "rounds": len(rounds),
+        "wall_s_median": statistics.median(r["wall_s"] for r in rounds),
+        "p50_s_median": statistics.median(r["p50_s"] for r in rounds),
+        "p95_s_median": statistics.median(r["p95_s"] for r in rounds),
+        "errors": sum(r["errors"] for r in rounds),
+        "http_versions": sorted({v for r in rounds for v in r["http_versions"]}),
+    }
+
+
+def run_benchmark(
+    scenario: str, requests_: list[dict], rounds: int, workers: int
+) -> dict:
+    backends = {
+        "requests": RequestsTransport(),
+        "httpx-http1": HttpxTransport(http2=False),
+        "httpx-http2": HttpxTransport(http2=True),
+    }
+
+    report = {}
+    for name, transport in backends.items():
+        # 첫 라운드는 연결 수립 비용을 포함해 따로 기록 (cold)
+        cold = run_sync_round(transport, requests_, workers)
+        warm = [run_sync_round(transport, requests_, workers) for _ in range(rounds)]
+        report[name] = {"cold": cold, "warm": _aggregate(warm)}
+
+    async def run_async() -> dict:
+        transport = AsyncHttpxTransport(http2=True)
+        cold = await _run_async_round(transport, requests_)
+        warm = [await _run_async_round(transport, requests_) for _ in range(rounds)]
+        await transport.aclose()
+        return {"cold": cold, "warm": _aggregate(warm)}
+
+    report["httpx-http2-async"] = asyncio.run(run_async())
+    return {"scenario": scenario, "requests_per_round": len(requests_), **report}
+
+
+def _print_report(report: dict) -> None:
+    print(f"\n[{report['scenario']}] {report['requests_per_round']} requests per round")
+    print(
+        f"{'backend':<20}{'cold wall':>11}{'warm wall':>11}"
+        f"{'p50':>9}{'p95':>9}{'errors':>8}  versions"
+    )
+    for name, result in report.items():
+        if not isinstance(result, dict):
+            continue
+        cold, warm = result["cold"], result["warm"]
+        print(
+            f"{name:<20}{cold['wall_s']:>10.3f}s{warm['wall_s_median']:>10.3f}s"
+            f"{warm['p50_s_median']:>8.3f}s{warm['p95_s_median']:>8.3f}s"
+            f"{warm['errors']:>8}  {','.join(warm['http_versions'])}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--places",
+        nargs="*",
+        default=["남이섬", "석촌호수", "남산서울타워", "국립중앙박물관", "두물머리"],
+        help="google 시나리오에 쓸 장소 이름",
+    )
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args()
+
+    if not HTTP2_AVAILABLE:
+        print("[warn] h2 패키지가 없어 httpx-http2도 HTTP/1.1로 동작합니다.")
+
+    rng = random.Random(args.seed)
+    reports = [
+        run_benchmark(
+            "weather", _weather_requests(args.fanout, rng), args.rounds, args.workers
+        )
+    ]
+
+    if GOOGLE_API_KEY:
+        place_ids = _lookup_place_ids(args.places)
+        if place_ids:
+            reports.append(
+                run_benchmark(
+                    "google",
+                    _google_requests(place_ids),
+                    args.rounds,
+                    args.workers,
+                )
+            )
+    else:
+        print("[info] GOOGLE_PLACES_API_KEY가 없어 google 시나리오는 건너뜁니다.")
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+    else:
+        for report in reports:
+            _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""
+다중 세션 부하 생성기.
+
+세션(ChatSessionState 하나)마다 여러 턴짜리 대화 스크립트
+(TRIP_INFO → NEXT_CANDIDATE → FOLLOW_UP)를 실행한다.
+세션은 지정한 도착률(초당 세션 수)의 포아송 과정으로 도착하는 open-loop 방식이다.
+업스트림과 LLM은 지연이 있는 로컬 stub이다 (benchmarks.stubs).
+
+도착률마다 다음을 보고한다.
+- 처리량: 초당 완료 턴 수 (offered 대비 achieved)
+- intent별 턴 지연 p50/p95/p99, 응답 없는 턴 비율
+- 포화점: 처리량이 offered의 90% 아래로 떨어지거나, p95가 TURN_SLO_SECONDS를
+  넘거나, 추천 결과 없는 턴(속도 제한/deadline으로 degrade)이 --max-empty를 넘는 첫 도착률
+
+사용 예:
+    python -m benchmarks.load --rates 0.5 1 2 4 --duration 60
+    python -m benchmarks.load --rates 1 2 4 8 --latency-scale 0.2 --json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_SCRIPT = (
+    "{trip}",
+    "다른 곳도 추천해줘",
+    "거기 날씨는 어때?",
+    "다음 후보는?",
+)
+
+NO_RESULT_PREFIX = "추천할 여행지가 없습니다"
+
+
+def _prepare_environment() -> None:
+    """
+    services를 import하기 전에 호출: stub에는 실제 키가 필요 없고,
+    일일 쿼터 파일은 실행마다 새 임시 파일을 쓴다.
+    """
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    fd, path = tempfile.mkstemp(prefix="cai-hw2-load-quota-", suffix=".json")
+    os.close(fd)
+    os.remove(path)
+    os.environ["API_QUOTA_FILE"] = path
+
+
+class _Recorder:
+    def __init__(self):
+        self.turns: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, **turn) -> None:
+        with self._lock:
+            self.turns.append(turn)
+
+
+def run_session(
+    session_id: int,
+    script: list[str],
+    trip_input: str,
+    think_time: float,
+    recorder: _Recorder,
+    rng: random.Random,
+) -> None:
+    from domain.models import ChatSessionState
+    from services.chat_service import run_turn
+
+    state = ChatSessionState()
+    for turn_index, template in enumerate(script):
+        user_input = template.format(trip=trip_input)
+        start = time.perf_counter()
+        try:
+            result = run_turn(user_input, state)
+            intent, response, error = result.intent.value, result.response, None
+        except Exception as e:  # 세션 하나의 실패로 부하 테스트를 멈추지 않는다
+            intent, response, error = "ERROR", "", f"{type(e).__name__}: {e}"
+        recorder.add(
+            session=session_id,
+            turn=turn_index,
+            intent=intent,
+            latency_s=time.perf_counter() - start,
+            finished_at=time.perf_counter(),
+            empty=response.startswith(NO_RESULT_PREFIX),
+            error=error,
+        )
+        if think_time > 0 and turn_index < len(script) - 1:
+            time.sleep(rng.expovariate(1 / think_time))
+
+
+def _percentiles(values: list[float]) -> dict:
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return ordered[max(0, int(round(q * len(ordered))) - 1)]
+
+    return {
+        "count": len(ordered),
+        "p50_s": round(statistics.median(ordered), 3),
+        "p95_s": round(pick(0.95), 3),
+        "p99_s": round(pick(0.99), 3),
+    }
+
+
+def run_rate(
+    rate: float,
+    duration: float,
+    script: list[str],
+    trip_inputs: list[str],
+    think_time: float,
+    max_sessions: int,
+    seed: int,
+    warmup: float,
+) -> dict:
+    """
+    duration초 동안 rate(세션/초)로 세션을 도착시키고, 시작된 세션이 모두 끝날 때까지 기다린다.
+    처리량은 워밍업 이후 ~ duration 사이에 끝난 턴만 센다 (정상 상태 구간).
+    """
+    rng = random.Random(seed)
+    recorder = _Recorder()
+    sessions = 0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_sessions) as executor:
+        next_arrival = start
+        while next_arrival - start < duration:
+            time.sleep(max(0.0, next_arrival - time.perf_counter()))
+            executor.submit(
+                run_session,
+                sessions,
+                script,
+                trip_inputs[sessions % len(trip_inputs)],
+                think_time,
+                recorder,
+                random.Random(rng.random()),
+            )
+            sessions += 1
+            next_arrival += rng.expovariate(rate)
+    drained = time.perf_counter() - start
+
+    window_start, window_end = start + warmup, start + duration
+    in_window = [
+        t for t in recorder.turns if window_start <= t["finished_at"] <= window_end
+    ]
+    by_intent: dict[str, list[float]] = defaultdict(list)
+    for t in recorder.turns:
+        by_intent[t["intent"]].append(t["latency_s"])
+
+    all_latencies = [t["latency_s"] for t in recorder.turns]
+    return {
+        "offered_sessions_per_s": rate,
+        "offered_turns_per_s": round(rate * len(script), 3),
+        "achieved_turns_per_s": round(len(in_window) / (duration - warmup), 3),
+        "sessions": sessions,
+        "turns": len(recorder.turns),
+        "drain_s": round(drained - duration, 3),
+        "errors": sum(1 for t in recorder.turns if t["error"]),
+        "empty_ratio": round(
+            sum(1 for t in recorder.turns if t["empty"]) / max(1, len(recorder.turns)),
+            3,
+        ),
+        "latency": _percentiles(all_latencies) if all_latencies else None,
+        "latency_by_intent": {
+            intent: _percentiles(values) for intent, values in sorted(by_intent.items())
+        },
+    }
+
+
+def find_saturation(
+    results: list[dict], slo_seconds: float, max_empty: float
+) -> float | None:
+    """
+    처리량 부족, p95 SLO 초과, 빈 응답 비율 초과 중 하나라도 해당하는 첫 도착률.
+    """
+    for result in results:
+        latency = result["latency"]
+        shortfall = result["achieved_turns_per_s"] < 0.9 * result["offered_turns_per_s"]
+        slow = latency is not None and latency["p95_s"] > slo_seconds
+        degraded = result["empty_ratio"] > max_empty
+        if shortfall or slow or degraded:
+            return result["offered_sessions_per_s"]
+    return None
+
+
+def _print_report(results: list[dict], saturation: float | None, slo: float):
+    print(
+        f"\n{'rate':>6}{'offered':>10}{'achieved':>10}{'p50':>8}{'p95':>8}"
+        f"{'p99':>8}{'empty':>8}{'errors':>8}"
+    )
+    for r in results:
+        lat = r["latency"] or {"p50_s": 0, "p95_s": 0, "p99_s": 0}
+        print(
+            f"{r['offered_sessions_per_s']:>6g}{r['offered_turns_per_s']:>9.2f}/s"
+            f"{r['achieved_turns_per_s']:>9.2f}/s{lat['p50_s']:>7.2f}s"
+            f"{lat['p95_s']:>7.2f}s{lat['p99_s']:>7.2f}s"
+            f"{r['empty_ratio']:>8.0%}{r['errors']:>8}"
+        )
+        for intent, p in r["latency_by_intent"].items():
+            print(
+                f"{'':>6}  {intent:<16}{p['count']:>6} turns"
+                f"{p['p50_s']:>7.2f}s{p['p95_s']:>7.2f}s{p['p99_s']:>7.2f}s"
+            )
+
+    if saturation is None:
+        print(f"\n포화점: 측정한 도착률 안에서는 포화되지 않음 (SLO {slo:g}s)")
+    else:
+        print(f"\n포화점: {saturation:g} 세션/초 (SLO {slo:g}s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rates", type=float, nargs="+", default=[0.5, 1, 2, 4], help="세션/초"
+    )
+    parser.add_argument("--duration", type=float, default=60, help="도착률별 초")
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=20,
+        help="처리량 계산에서 제외할 앞부분(초). 세션 하나의 길이보다 길게",
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=1.0, help="턴 사이 평균 대기(초)"
+    )
+    parser.add_argument("--max-sessions", type=int, default=512)
+    parser.add_argument(
+        "--max-empty", type=float, default=0.2, help="포화로 볼 빈 응답 비율"
+    )
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="stub 지연 배율"
+    )
+    parser.add_argument("--samples-file", default="travel_samples.json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    parser.add_argument(
+        "--verbose", action="store_true", help="파이프라인 로그(print)를 그대로 출력"
+    )
+    args = parser.parse_args()
+    if args.warmup >= args.duration:
+        parser.error("--warmup은 --duration보다 짧아야 합니다.")
+
+    _prepare_environment()
+
+    from benchmarks.stubs import install_stubs
+    from utils.deadline import TURN_SLO_SECONDS
+
+    install_stubs(scale=args.latency_scale, seed=args.seed)
+
+    with open(args.samples_file, encoding="utf-8") as f:
+        trip_inputs = [s["user_input"] for s in json.load(f)]
+
+    results = []
+    for i, rate in enumerate(args.rates):
+        print(f"[load] {rate:g} 세션/초, {args.duration:g}초 ...")
+        with open(os.devnull, "w") as devnull:
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+                result = run_rate(
+                    rate,
+                    args.duration,
+                    list(DEFAULT_SCRIPT),
+                    trip_inputs,
+                    args.think_time,
+                    args.max_sessions,
+                    args.seed + i,
+                    args.warmup,
+                )
+        results.append(result)
+
+    saturation = find_saturation(results, TURN_SLO_SECONDS, args.max_empty)
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "slo_seconds": TURN_SLO_SECONDS,
+                    "latency_scale": args.latency_scale,
+                    "saturation_sessions_per_s": saturation,
+                    "results": results,
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        _print_report(results, saturation, TURN_SLO_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+travel_samples.json 시나리오 전체에 대한 end-to-end 파이프라인 벤치마크.
+
+시나리오마다 generate_travel_candidates + generate_final_output(첫 번째 후보)을 실행하고
+다음을 기록한다.
+- wall time, 단계별 소요 시간 (트레이스의 최상위 span)
+- 업스트림 호출 수 (호스트별, 재시도 포함 시도 수)
+- LLM 호출 수와 토큰 사용량
+- 최대 메모리 사용량 (tracemalloc)
+
+기본은 기록된 fixture를 재생하므로 네트워크/API 키 없이 반복 측정할 수 있다 (utils.fixtures).
+fixture는 먼저 --fixtures record로 한 번 실행해서 만든다.
+
+사용 예:
+    python -m benchmarks.pipeline --fixtures record
+    python -m benchmarks.pipeline --latency "*=recorded" --out bench_output.txt
+    python -m benchmarks.pipeline --samples 1 2 3 --repeat 3 --compare base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+SAMPLES_FILE = "travel_samples.json"
+TOP_K = 5
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _prepare_environment(mode: str) -> None:
+    """
+    services/apis를 import하기 전에 호출해야 한다.
+    replay에서는 실제 키가 필요 없으므로 OpenAI 클라이언트 생성용 더미 키를 넣고,
+    일일 쿼터 파일도 임시 파일로 돌려 실제 사용량과 섞이지 않게 한다.
+    """
+    if mode == "replay":
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+        os.environ["API_QUOTA_FILE"] = os.path.join(
+            tempfile.gettempdir(), "cai-hw2-bench-quota.json"
+        )
+
+
+def _summarize_trace(trace) -> dict:
+    root = trace.root
+    stages = {}
+    upstream_calls: Counter[str] = Counter()
+    upstream_attempts: Counter[str] = Counter()
+    llm_calls: Counter[str] = Counter()
+    tokens = {"input": 0, "output": 0, "total": 0}
+
+    for s in trace.spans:
+        if root is not None and s.parent_id == root.span_id:
+            stages[s.name] = round(stages.get(s.name, 0.0) + s.duration_ms, 3)
+
+        if s.name.startswith("http "):
+            host = s.name.split(" ", 2)[2]
+            upstream_calls[host] += 1
+            upstream_attempts[host] += s.attributes.get("attempts", 0)
+        elif s.name.startswith("llm "):
+            llm_calls[s.name[4:]] += 1
+            tokens["input"] += s.attributes.get("input_tokens", 0)
+            tokens["output"] += s.attributes.get("output_tokens", 0)
+            tokens["total"] += s.attributes.get("tokens", 0)
+
+    return {
+        "wall_ms": round(root.duration_ms, 3) if root else 0.0,
+        "stages_ms": stages,
+        "upstream_calls": sum(upstream_calls.values()),
+        "upstream_attempts": sum(upstream_attempts.values()),
+        "upstream_by_host": dict(sorted(upstream_calls.items())),
+        "llm_calls": dict(sorted(llm_calls.items())),
+        "llm_tokens": tokens,
+    }
+
+
+def run_scenario(sample: dict, use_deadline: bool, measure_memory: bool) -> dict:
+    from domain.models import ChatSessionState
+    from services.travel_input_service import generate_travel_candidates
+    from services.travel_output_service import generate_final_output
+    from utils.deadline import Deadline
+    from utils.tracing import start_trace
+
+    state = ChatSessionState()
+    baseline = 0
+    if measure_memory:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+    error = None
+    with start_trace("scenario", sample_id=sample["id"]) as trace:
+        deadline = Deadline.start() if use_deadline else None
+        try:
+            generate_travel_candidates(sample["user_input"], TOP_K, state, deadline)
+            generate_final_output(state, deadline)
+        except Exception as e:  # 한 시나리오 실패로 전체 벤치마크를 멈추지 않는다
+            error = f"{type(e).__name__}: {e}"
+
+    result = {"id": sample["id"], **_summarize_trace(trace)}
+    # 시나리오 시작 시점 대비 증가한 최대 메모리
+    result["peak_memory_kb"] = (
+        round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
+        if measure_memory
+        else None
+    )
+    result["recommended"] = [c.place_info.place_name for c in state.candidates]
+    result["error"] = error
+    return result
+
+
+def _median_run(runs: list[dict]) -> dict:
+    """
+    반복 실행 중 wall time이 중앙값인 실행을 대표로 쓰고, wall time 분포를 덧붙인다.
+    """
+    ordered = sorted(runs, key=lambda r: r["wall_ms"])
+    result = dict(ordered[len(ordered) // 2])
+    result["wall_ms_runs"] = [r["wall_ms"] for r in runs]
+    return result
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = max(0, int(round(q * len(ordered))) - 1)
+    return ordered[index]
+
+
+def _summarize(results: list[dict]) -> dict:
+    walls = [r["wall_ms"] for r in results]
+    stage_names = sorted({name for r in results for name in r["stages_ms"]})
+    return {
+        "scenarios": len(results),
+        "errors": sum(1 for r in results if r["error"]),
+        "wall_ms_p50": round(statistics.median(walls), 3),
+        "wall_ms_p95": round(_percentile(walls, 0.95), 3),
+        "wall_ms_total": round(sum(walls), 3),
+        "stages_ms_p50": {
+            name: round(
+                statistics.median(r["stages_ms"].get(name, 0.0) for r in results), 3
+            )
+            for name in stage_names
+        },
+        "upstream_calls_total": sum(r["upstream_calls"] for r in results),
+        "llm_tokens_total": sum(r["llm_tokens"]["total"] for r in results),
+        "peak_memory_kb_max": max(
+            (r["peak_memory_kb"] or 0 for r in results), default=0
+        ),
+    }
+
+
+def run_benchmark(
+    samples: list[dict], repeat: int, use_deadline: bool, measure_memory: bool
+) -> list[dict]:
+    # 첫 시나리오에 import 비용이 섞이지 않도록 미리 불러온다
+    import services.travel_input_service  # noqa: F401
+    import services.travel_output_service  # noqa: F401
+
+    if measure_memory:
+        tracemalloc.start()
+
+    results = []
+    for sample in samples:
+        runs = [
+            run_scenario(sample, use_deadline, measure_memory) for _ in range(repeat)
+        ]
+        result = _median_run(runs)
+        print(
+            f"[bench] #{sample['id']:>2} {result['wall_ms']:>9.1f}ms "
+            f"calls={result['upstream_calls']} tokens={result['llm_tokens']['total']}"
+            + (f" ERROR {result['error']}" if result["error"] else "")
+        )
+        results.append(result)
+
+    if measure_memory:
+        tracemalloc.stop()
+    return results
+
+
+def _print_comparison(base: dict, report: dict) -> None:
+    """
+    이전 결과(JSON)와 요약 지표를 비교해 출력한다.
+    """
+    print(f"\n{'metric':<34}{'base':>14}{'current':>14}{'delta':>10}")
+    base_summary, summary = base["summary"], report["summary"]
+    for key in (
+        "wall_ms_p50",
+        "wall_ms_p95",
+        "wall_ms_total",
+        "upstream_calls_total",
+        "llm_tokens_total",
+        "peak_memory_kb_max",
+    ):
+        before, after = base_summary.get(key), summary.get(key)
+        if before is None or after is None:
+            continue
+        delta = f"{(after - before) / before * 100:+.1f}%" if before else "-"
+        print(f"{key:<34}{before:>14.1f}{after:>14.1f}{delta:>10}")
+
+    for name, after in summary["stages_ms_p50"].items():
+        before = base_summary.get("stages_ms_p50", {}).get(name)
+        if before is None:
+            continue
+        delta = f"{(after - before) / before * 100:+.1f}%" if before else "-"
+        print(f"{'stage ' + name:<34}{before:>14.1f}{after:>14.1f}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples-file", default=SAMPLES_FILE)
+    parser.add_argument(
+        "--samples", type=int, nargs="*", help="실행할 시나리오 id (기본: 전체)"
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="시나리오별 반복 횟수")
+    parser.add_argument(
+        "--fixtures",
+        choices=("replay", "record", "live"),
+        default="replay",
+        help="replay: 기록된 응답 사용, record: 실제 호출 + 기록, live: 실제 호출만",
+    )
+    parser.add_argument("--fixture-dir", default=None)
+    parser.add_argument(
+        "--latency", default="", help="replay 지연 주입 (FIXTURE_LATENCY 형식)"
+    )
+    parser.add_argument(
+        "--now", default="", help="현재 시각 고정 (기본: fixture 기록 시각)"
+    )
+    parser.add_argument(
+        "--deadline", action="store_true", help="턴 지연 예산(TURN_SLO_SECONDS) 적용"
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="tracemalloc을 끈다 (메모리 추적 오버헤드 제거)",
+    )
+    parser.add_argument("--out", help="결과 JSON 파일 경로 (기본: stdout)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    _prepare_environment(args.fixtures)
+
+    from utils.fixtures import FIXTURE_DIR, fixture_store, install_fixtures
+
+    fixture_dir = args.fixture_dir or FIXTURE_DIR
+    if args.fixtures != "live":
+        install_fixtures(args.fixtures, fixture_dir, args.latency, now=args.now)
+
+    with open(args.samples_file, encoding="utf-8") as f:
+        samples = json.load(f)
+    if args.samples:
+        wanted = set(args.samples)
+        samples = [s for s in samples if s["id"] in wanted]
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    start = time.perf_counter()
+    results = run_benchmark(samples, args.repeat, args.deadline, not args.no_memory)
+
+    store = fixture_store()
+    report = {
+        "meta": {
+            "revision": _git_revision(),
+            "started_at": started_at,
+            "duration_s": round(time.perf_counter() - start, 3),
+            "python": platform.python_version(),
+            "fixtures": args.fixtures,
+            "fixture_dir": fixture_dir if args.fixtures != "live" else None,
+            "fixture_misses": store.misses if store else None,
+            "latency": args.latency or None,
+            "deadline": args.deadline,
+            "repeat": args.repeat,
+        },
+        "summary": _summarize(results),
+        "scenarios": results,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+        print(f"[bench] 결과 저장: {args.out}")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            _print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+"""
+부하 테스트용 로컬 stub 업스트림.
+
+Kakao Local/Mobility, ODsay, Open-Meteo, Google Places와 OpenAI 호출을
+프로세스 안에서 흉내낸다. 응답은 요청 파라미터의 해시로 정해지는 결정적인 값이고,
+호스트(LLM은 호출 이름)별 로그정규 지연을 준다.
+
+- HTTP: utils.transport.set_transport_wrapper로 모든 전송 백엔드를 stub으로 교체
+  (재시도, 속도 제한, single-flight, 트레이스, 지표는 실제 호출과 똑같이 동작)
+- LLM: utils.llm.set_llm_override로 responses.parse/create를 stub으로 교체
+- timeout/deadline을 넘기는 지연은 실제처럼 타임아웃 오류로 끝난다
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import re
+import time
+from dataclasses import replace
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import httpx
+from openai import APITimeoutError
+from openai.types.responses import ParsedResponse, Response
+
+from utils.fixtures import (
+    LatencyInjector,
+    fixture_now,
+    parse_latency_spec,
+)
+from utils.llm import set_llm_override
+from utils.transport import TransportError, TransportResponse, set_transport_wrapper
+
+# 호스트 / LLM 호출 이름별 지연 (중앙값 ms ~ 로그정규 sigma, FIXTURE_LATENCY 형식)
+STUB_LATENCY = ",".join(
+    [
+        "dapi.kakao.com=60~0.4",
+        "apis-navi.kakaomobility.com=180~0.4",
+        "api.odsay.com=250~0.5",
+        "api.open-meteo.com=120~0.4",
+        "places.googleapis.com=150~0.4",
+        "llm:intent_parser=450~0.3",
+        "llm:info_parser=1300~0.3",
+        "llm:filter=1600~0.35",
+        "llm:recommender=2200~0.35",
+        "llm:unknown_handler=700~0.3",
+    ]
+)
+
+PAGES_PER_QUERY = 3
+PAGE_SIZE = 15
+
+ORIGINS = {
+    "방배동": (37.4815, 126.9976),
+    "해운대": (35.1631, 129.1636),
+    "수성구": (35.8582, 128.6306),
+    "서울대입구": (37.4812, 126.9527),
+}
+DEFAULT_ORIGIN = (37.5665, 126.9780)
+
+PLACE_WORDS = (
+    "호수공원",
+    "미술관",
+    "박물관",
+    "카페거리",
+    "전망대",
+    "수목원",
+    "한옥마을",
+)
+
+
+def _hash(*parts) -> int:
+    raw = "|".join(str(p) for p in parts).encode()
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], "big")
+
+
+def _json(obj) -> TransportResponse:
+    return TransportResponse(
+        status_code=200,
+        content=json.dumps(obj, ensure_ascii=False).encode(),
+        headers={"content-type": "application/json"},
+    )
+
+
+def _distance_km(lat1, lon1, lat2, lon2) -> float:
+    dy = (lat2 - lat1) * 111.0
+    dx = (lon2 - lon1) * 111.0 * math.cos(math.radians(lat1))
+    return math.hypot(dx, dy)
+
+
+# -----------------------------
+# HTTP stub
+# -----------------------------
+
+
+def _origin_for(query: str) -> tuple[float, float]:
+    return next(
+        (coords for name, coords in ORIGINS.items() if name in query), DEFAULT_ORIGIN
+    )
+
+
+def _places(params: dict) -> dict:
+    code = params.get("category_group_code") or params.get("query", "")
+    lat, lon = float(params["y"]), float(params["x"])
+    radius_km = float(params.get("radius", 20000)) / 1000
+    page = int(params.get("page", 1))
+
+    documents = []
+    for i in range(PAGE_SIZE):
+        h = _hash(code, round(lat, 2), round(lon, 2), page, i)
+        angle = (h % 360) * math.pi / 180
+        r = radius_km * ((h >> 9) % 1000) / 1000
+        d_lat = r * math.sin(angle) / 111.0
+        d_lon = r * math.cos(angle) / (111.0 * math.cos(math.radians(lat)))
+        word = PLACE_WORDS[(h >> 20) % len(PLACE_WORDS)]
+        documents.append(
+            {
+                "id": str(h % 10**9),
+                "place_name": f"{word} {h % 9973}",
+                "road_address_name": f"stub로 {h % 500}",
+                "y": f"{lat + d_lat:.6f}",
+                "x": f"{lon + d_lon:.6f}",
+            }
+        )
+    return {"documents": documents, "meta": {"is_end": page >= PAGES_PER_QUERY}}
+
+
+def _route_params(params: dict) -> tuple[float, float, float, float]:
+    if "origin" in params:
+        o_lon, o_lat = map(float, params["origin"].split(","))
+        d_lon, d_lat = map(float, params["destination"].split(","))
+    else:
+        o_lon, o_lat = float(params["SX"]), float(params["SY"])
+        d_lon, d_lat = float(params["EX"]), float(params["EY"])
+    return o_lat, o_lon, d_lat, d_lon
+
+
+def _weather(params: dict) -> dict | list:
+    """
+    latitude/longitude가 쉼표로 이은 여러 지점이면 지점별 응답 리스트 (open-meteo와 같다)
+    """
+    lats = str(params["latitude"]).split(",")
+    lons = str(params["longitude"]).split(",")
+    results = [_weather_at(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+    return results if len(results) > 1 else results[0]
+
+
+def _weather_at(lat: float, lon: float) -> dict:
+    start = fixture_now().date()
+    days = [(start + timedelta(days=i)).isoformat() for i in range(16)]
+    h = _hash(round(lat, 1), round(lon, 1))
+    codes = [(0, 1, 2, 3, 61, 80)[(h >> i) % 6] for i in range(16)]
+    return {
+        "daily": {
+            "time": days,
+            "weathercode": codes,
+            "temperature_2m_max": [12 + (h >> i) % 10 for i in range(16)],
+            "temperature_2m_min": [2 + (h >> i) % 6 for i in range(16)],
+            "precipitation_sum": [5.0 if c >= 61 else 0.0 for c in codes],
+        }
+    }
+
+
+def stub_response(method: str, url: str, params=None, json_body=None):
+    parts = urlsplit(url)
+    host, path = parts.hostname or "", parts.path
+    params = dict(params or {})
+
+    if host == "dapi.kakao.com":
+        if path.endswith("/search/address") or params.get("size") == 1:
+            lat, lon = _origin_for(params.get("query", ""))
+            return _json({"documents": [{"y": str(lat), "x": str(lon)}]})
+        return _json(_places(params))
+
+    if host == "apis-navi.kakaomobility.com":
+        km = _distance_km(*_route_params(params))
+        return _json(
+            {"routes": [{"result_code": 0, "summary": {"duration": int(km * 75)}}]}
+        )
+
+    if host == "api.odsay.com":
+        km = _distance_km(*_route_params(params))
+        return _json({"result": {"path": [{"info": {"totalTime": int(km * 3) + 10}}]}})
+
+    if host == "api.open-meteo.com":
+        return _json(_weather(params))
+
+    if host == "places.googleapis.com":
+        if path.endswith(":searchText"):
+            query = (json_body or {}).get("textQuery", "")
+            return _json({"places": [{"id": f"stub-{_hash(query) % 10**8}"}]})
+        if path.endswith("/media"):
+            return _json({"photoUri": f"https://stub.local{path}.jpg"})
+        return _json(
+            {
+                "editorialSummary": {"text": "stub 요약"},
+                "reviews": [{"text": {"text": "좋았어요"}}],
+                "photos": [{"name": f"{path[4:]}/photos/{i}"} for i in range(3)],
+            }
+        )
+
+    return TransportResponse(status_code=404, content=b"{}")
+
+
+class StubTransport:
+    name = "stub"
+
+    def __init__(self, latency: LatencyInjector):
+        self.latency = latency
+
+    def _delay(self, url: str, timeout) -> tuple[float, float | None]:
+        delay = self.latency.delay(urlsplit(url).hostname or "", 0.0)
+        return delay, timeout[1] if timeout else None
+
+    def request(
+        self, method, url, timeout, headers=None, params=None, json=None, data=None
+    ) -> TransportResponse:
+        delay, limit = self._delay(url, timeout)
+        if limit is not None and delay > limit:
+            time.sleep(limit)
+            raise TransportError("stub read timeout")
+        time.sleep(delay)
+        return stub_response(method, url, params, json)
+
+
+class AsyncStubTransport(StubTransport):
+    name = "stub-async"
+
+    async def request(
+        self, method, url, timeout, headers=None, params=None, json=None, data=None
+    ) -> TransportResponse:
+        delay, limit = self._delay(url, timeout)
+        if limit is not None and delay > limit:
+            await asyncio.sleep(limit)
+            raise TransportError("stub read timeout")
+        await asyncio.sleep(delay)
+        return stub_response(method, url, params, json)
+
+    async def aclose(self) -> None:
+        pass
+
+
+# -----------------------------
+# LLM stub
+# -----------------------------
+
+
+def _user_payload(kwargs: dict) -> dict:
+    messages = kwargs.get("input") or []
+    user = [m for m in messages if m.get("role") == "user"]
+    try:
+        return json.loads(user[-1]["content"]) if user else {}
+    except (ValueError, KeyError):
+        return {}
+
+
+def _stub_intent(payload: dict) -> dict:
+    text = payload.get("utterance", "")
+    if not payload.get("has_already_recommended"):
+        return {"intent": "TRIP_INFO"}
+    if any(word in text for word in ("말고", "늘려", "줄여", "바꿔")):
+        return {"intent": "TRIP_INFO"}  # 기존 조건 변경
+    if any(word in text for word in ("다른", "다음", "또")):
+        return {"intent": "NEXT_CANDIDATE"}
+    if any(word in text for word in ("날씨", "시간", "주소", "이유", "어디")):
+        return {"intent": "FOLLOW_UP"}
+    return {"intent": "TRIP_INFO"}
+
+
+def _stub_condition_change(prompt: str) -> dict | None:
+    """
+    이전 여행 조건이 프롬프트에 있으면 유저 입력의 변경(교통수단, N시간)만 반영한다.
+    """
+    match = re.search(r"이전 여행 조건[^\n]*\n(\{.*\})", prompt)
+    if match is None:
+        return None
+    info = json.loads(match.group(1))
+    user_input = re.search(r'사용자 입력:\n"(.*)"', prompt).group(1)
+    if "대중교통" in user_input:
+        info["transportation"] = "PUBLIC"
+    elif "자동차" in user_input or "차로" in user_input:
+        info["transportation"] = "CAR"
+    hours = re.search(r"(\d+(?:\.\d+)?)\s*시간", user_input)
+    if hours:
+        info["max_travel_hours"] = float(hours.group(1))
+    return info
+
+
+def _stub_user_info(kwargs: dict) -> dict:
+    prompt = kwargs["input"][0]["content"]
+    changed = _stub_condition_change(prompt)
+    if changed is not None:
+        return changed
+    user_input = re.search(r'사용자 입력:\n"(.*)"', prompt).group(1)
+    origin = next((name for name in ORIGINS if name in prompt), "서울시청")
+    h = _hash(prompt)
+    departure = fixture_now().replace(minute=0, second=0, microsecond=0)
+    return {
+        "origin": origin,
+        "departure_datetime": (departure + timedelta(hours=1)).isoformat(),
+        "max_travel_hours": float(2 + h % 5),
+        "destination_categories": ["AT4", "CT1"] if h % 2 else ["AT4"],
+        "transportation": "PUBLIC" if "대중교통" in user_input else "CAR",
+        "likes": ["자연"] if h % 3 else None,
+    }
+
+
+def _stub_parsed(name: str, kwargs: dict) -> dict:
+    payload = _user_payload(kwargs)
+    if name == "intent_parser":
+        return _stub_intent(payload)
+    if name == "info_parser":
+        return _stub_user_info(kwargs)
+    if name == "filter":
+        # 대략 1/3은 비선호 조건에 걸린다고 가정
+        return {
+            "places": [p for p in payload.get("candidates", []) if _hash(p) % 3][:30]
+        }
+    if name == "recommender":
+        ranked = sorted(payload.get("candidates", []), key=lambda c: -c[1])
+        return {
+            "candidates": [
+                {"place_name": c[0], "reason": f"실외 활동 점수 {c[1]}점"}
+                for c in ranked[:5]
+            ]
+        }
+    raise ValueError(f"stub이 없는 LLM 호출: {name}")
+
+
+def _response_data(text: str, kwargs: dict, parsed=None) -> dict:
+    content = {"type": "output_text", "text": text, "annotations": []}
+    if parsed is not None:
+        content["parsed"] = parsed
+    input_tokens = len(json.dumps(kwargs.get("input"), ensure_ascii=False)) // 2
+    output_tokens = max(1, len(text) // 2)
+    return {
+        "id": "resp_stub",
+        "created_at": 0,
+        "model": kwargs.get("model") or "stub",
+        "object": "response",
+        "output": [
+            {
+                "id": "msg_stub",
+                "type": "message",
+                "role": "assistant",
+                "status": "completed",
+                "content": [content],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+class StubLLM:
+    def __init__(self, latency: LatencyInjector):
+        self.latency = latency
+
+    def __call__(self, method: str, name: str, kwargs: dict, deadline):
+        delay = self.latency.delay(f"llm:{name}", 0.0)
+        if deadline is not None and delay > deadline.remaining():
+            time.sleep(max(0.0, deadline.remaining()))
+            raise APITimeoutError(
+                request=httpx.Request("POST", "https://api.openai.com/v1/responses")
+            )
+        time.sleep(delay)
+
+        if method == "create":
+            return Response.model_validate(_response_data("stub 응답입니다.", kwargs))
+
+        parsed = _stub_parsed(name, kwargs)
+        data = _response_data(json.dumps(parsed, ensure_ascii=False), kwargs, parsed)
+        return ParsedResponse[kwargs["text_format"]].model_validate(data)
+
+
+# -----------------------------
+# 설치
+# -----------------------------
+
+
+def install_stubs(latency: str = STUB_LATENCY, scale: float = 1.0, seed: int = 0):
+    """
+    모든 업스트림/LLM 호출을 stub으로 바꾼다.
+    scale로 지연 전체를 줄이거나 늘릴 수 있다 (예: 0.1이면 10배 빠르게).
+    """
+    models = parse_latency_spec(latency)
+    if scale != 1.0:
+        models = {
+            key: replace(model, median=model.median * scale)
+            for key, model in models.items()
+        }
+    injector = LatencyInjector(models, seed)
+
+    def wrap(transport):
+        if asyncio.iscoroutinefunction(transport.request):
+            return AsyncStubTransport(injector)
+        return StubTransport(injector)
+
+    set_transport_wrapper(wrap)
+    set_llm_override(StubLLM(injector))
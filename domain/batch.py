@@ -0,0 +1,321 @@
+import sys
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from domain.enums import Transportation, WeatherCode
+from domain.models import DailyWeather, DestinationCandidate, PlaceInfo
+
+EARTH_RADIUS_KM = 6371.0088
+NO_WEATHER = -1  # weather_code 열에서 "날씨 정보 없음"
+
+# 6단계(이동 시간/날씨)에서 채우는 열
+_ENRICHMENT_COLUMNS = (
+    "car_hours",
+    "public_hours",
+    "car_routed",
+    "public_routed",
+    "weather_code",
+    "t_max",
+    "t_min",
+    "precipitation",
+)
+
+
+def _floats(values: Iterable[float] = ()) -> np.ndarray:
+    return np.fromiter(values, dtype=np.float64)
+
+
+def _nan(n: int) -> np.ndarray:
+    return np.full(n, np.nan)
+
+
+@dataclass(slots=True)
+class CandidateBatch:
+    """
+    후보지 목록의 열(column) 기반 표현.
+
+    후보마다 PlaceInfo/DestinationCandidate 객체를 만드는 대신 좌표, 이동 시간,
+    날씨를 NumPy 배열로 들고 있고, 문자열(id, 이름, 주소)은 intern해서 리스트로 둔다.
+    검색(4단계) -> 필터링(5단계) -> 이동 시간/날씨(6단계)는 이 구조 위에서
+    한꺼번에 처리하고, 최종 후보만 to_candidates()로 객체로 만든다.
+
+    - 이동 시간 열(car_hours, public_hours): 값 없음은 NaN.
+      car_routed/public_routed는 경로 조회를 이미 했는지 여부 (실패해도 True)
+    - 날씨 열: weather_code가 NO_WEATHER(-1)이면 날씨 정보 없음
+    """
+
+    ids: List[str]
+    names: List[str]
+    addresses: List[str]
+    lat: np.ndarray
+    lon: np.ndarray
+    car_hours: np.ndarray
+    public_hours: np.ndarray
+    car_routed: np.ndarray
+    public_routed: np.ndarray
+    weather_code: np.ndarray
+    t_max: np.ndarray
+    t_min: np.ndarray
+    precipitation: np.ndarray
+
+    # -----------------------------
+    # 생성
+    # -----------------------------
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: List[str],
+        names: List[str],
+        addresses: List[str],
+        lat: np.ndarray,
+        lon: np.ndarray,
+    ) -> "CandidateBatch":
+        n = len(ids)
+        return cls(
+            ids=ids,
+            names=names,
+            addresses=addresses,
+            lat=lat,
+            lon=lon,
+            car_hours=_nan(n),
+            public_hours=_nan(n),
+            car_routed=np.zeros(n, dtype=bool),
+            public_routed=np.zeros(n, dtype=bool),
+            weather_code=np.full(n, NO_WEATHER, dtype=np.int16),
+            t_max=_nan(n),
+            t_min=_nan(n),
+            precipitation=_nan(n),
+        )
+
+    @classmethod
+    def empty(cls) -> "CandidateBatch":
+        return cls.from_columns([], [], [], _floats(), _floats())
+
+    @classmethod
+    def from_documents(cls, documents: List[dict]) -> "CandidateBatch":
+        """
+        카카오 로컬 API documents -> 배치 (PlaceInfo를 거치지 않는다)
+        """
+        return cls.from_columns(
+            ids=[sys.intern(d["id"]) for d in documents],
+            names=[sys.intern(d["place_name"]) for d in documents],
+            addresses=[sys.intern(d["road_address_name"]) for d in documents],
+            lat=_floats(float(d["y"]) for d in documents),
+            lon=_floats(float(d["x"]) for d in documents),
+        )
+
+    @classmethod
+    def from_places(cls, places: List[PlaceInfo]) -> "CandidateBatch":
+        return cls.from_columns(
+            ids=[sys.intern(p.id) for p in places],
+            names=[sys.intern(p.place_name) for p in places],
+            addresses=[sys.intern(p.road_address_name) for p in places],
+            lat=_floats(p.dest_lat for p in places),
+            lon=_floats(p.dest_lon for p in places),
+        )
+
+    @classmethod
+    def concat(cls, batches: List["CandidateBatch"]) -> "CandidateBatch":
+        if not batches:
+            return cls.empty()
+        return cls(
+            ids=[x for b in batches for x in b.ids],
+            names=[x for b in batches for x in b.names],
+            addresses=[x for b in batches for x in b.addresses],
+            lat=np.concatenate([b.lat for b in batches]),
+            lon=np.concatenate([b.lon for b in batches]),
+            car_hours=np.concatenate([b.car_hours for b in batches]),
+            public_hours=np.concatenate([b.public_hours for b in batches]),
+            car_routed=np.concatenate([b.car_routed for b in batches]),
+            public_routed=np.concatenate([b.public_routed for b in batches]),
+            weather_code=np.concatenate([b.weather_code for b in batches]),
+            t_max=np.concatenate([b.t_max for b in batches]),
+            t_min=np.concatenate([b.t_min for b in batches]),
+            precipitation=np.concatenate([b.precipitation for b in batches]),
+        )
+
+    # -----------------------------
+    # 선택
+    # -----------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, index) -> "CandidateBatch":
+        """
+        정수 인덱스 배열, bool 마스크, slice로 일부 행만 고른 새 배치
+        """
+        if isinstance(index, slice):
+            rows = range(len(self))[index]
+        else:
+            index = np.asarray(index)
+            rows = np.flatnonzero(index) if index.dtype == bool else index
+        idx = np.asarray(rows, dtype=np.intp)
+        return CandidateBatch(
+            ids=[self.ids[i] for i in idx],
+            names=[self.names[i] for i in idx],
+            addresses=[self.addresses[i] for i in idx],
+            lat=self.lat[idx],
+            lon=self.lon[idx],
+            car_hours=self.car_hours[idx],
+            public_hours=self.public_hours[idx],
+            car_routed=self.car_routed[idx],
+            public_routed=self.public_routed[idx],
+            weather_code=self.weather_code[idx],
+            t_max=self.t_max[idx],
+            t_min=self.t_min[idx],
+            precipitation=self.precipitation[idx],
+        )
+
+    def unique(self) -> "CandidateBatch":
+        """
+        id 기준 중복 제거 (처음 나온 행을 남긴다)
+        """
+        seen: dict[str, int] = {}
+        for i, place_id in enumerate(self.ids):
+            seen.setdefault(place_id, i)
+        if len(seen) == len(self):
+            return self
+        return self.take(np.fromiter(seen.values(), dtype=np.intp))
+
+    def name_mask(self, names: Iterable[str]) -> np.ndarray:
+        wanted = set(names)
+        return np.fromiter(
+            (n in wanted for n in self.names), dtype=bool, count=len(self)
+        )
+
+    def id_mask(self, ids: Iterable[str]) -> np.ndarray:
+        wanted = set(ids)
+        return np.fromiter((i in wanted for i in self.ids), dtype=bool, count=len(self))
+
+    def carry_over(self, other: "CandidateBatch") -> None:
+        """
+        other에 같은 id가 있는 행은 이동 시간/날씨 열을 그대로 가져온다
+        (다시 검색/필터링한 뒤 이미 조회한 경로, 날씨를 재사용)
+        """
+        source = {place_id: i for i, place_id in enumerate(other.ids)}
+        pairs = [(i, source[p]) for i, p in enumerate(self.ids) if p in source]
+        if not pairs:
+            return
+        dst, src = (np.array(x, dtype=np.intp) for x in zip(*pairs))
+        for column in _ENRICHMENT_COLUMNS:
+            getattr(self, column)[dst] = getattr(other, column)[src]
+
+    def place(self, i: int) -> PlaceInfo:
+        return PlaceInfo(
+            id=self.ids[i],
+            place_name=self.names[i],
+            road_address_name=self.addresses[i],
+            dest_lat=float(self.lat[i]),
+            dest_lon=float(self.lon[i]),
+        )
+
+    # -----------------------------
+    # 거리 / 이동 시간 / 날씨
+    # -----------------------------
+
+    def distances_km(self, origin_lat: float, origin_lon: float) -> np.ndarray:
+        """
+        출발지에서 각 후보까지의 직선(haversine) 거리(km)
+        """
+        lat1, lon1 = np.radians(origin_lat), np.radians(origin_lon)
+        lat2, lon2 = np.radians(self.lat), np.radians(self.lon)
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    def hours(self, transport: Transportation) -> np.ndarray:
+        return self.car_hours if transport == Transportation.CAR else self.public_hours
+
+    def routed(self, transport: Transportation) -> np.ndarray:
+        return (
+            self.car_routed if transport == Transportation.CAR else self.public_routed
+        )
+
+    def set_round_trip_hours(
+        self,
+        i: int,
+        hours: dict[Transportation, Optional[float]],
+        transports: Iterable[Transportation],
+    ) -> None:
+        """
+        transports로 조회한 결과만 기록한다 (나머지 교통수단 열은 그대로 둔다)
+        """
+        for transport in transports:
+            value = hours.get(transport)
+            self.hours(transport)[i] = np.nan if value is None else value
+            self.routed(transport)[i] = True
+
+    def reset_routes(self, transport: Transportation) -> None:
+        self.hours(transport)[:] = np.nan
+        self.routed(transport)[:] = False
+
+    def round_trip_hours(
+        self, i: int, transports: Iterable[Transportation] = tuple(Transportation)
+    ) -> dict[Transportation, Optional[float]]:
+        result: dict[Transportation, Optional[float]] = {
+            t: None for t in Transportation
+        }
+        for transport in transports:
+            value = self.hours(transport)[i]
+            result[transport] = None if np.isnan(value) else float(value)
+        return result
+
+    def shortest_hours(
+        self, transports: Iterable[Transportation] = tuple(Transportation)
+    ) -> np.ndarray:
+        """
+        transports 중 가장 짧은 왕복 시간 (모두 없으면 NaN)
+        """
+        shortest = _nan(len(self))
+        for transport in transports:
+            shortest = np.fmin(shortest, self.hours(transport))
+        return shortest
+
+    def set_weather(self, i: int, weather: DailyWeather) -> None:
+        self.weather_code[i] = int(weather.weather_code)
+        self.t_max[i] = weather.t_max
+        self.t_min[i] = weather.t_min
+        self.precipitation[i] = weather.precipitation_sum
+
+    def reset_weather(self) -> None:
+        self.weather_code[:] = NO_WEATHER
+        self.t_max[:] = np.nan
+        self.t_min[:] = np.nan
+        self.precipitation[:] = np.nan
+
+    def has_weather(self) -> np.ndarray:
+        return self.weather_code != NO_WEATHER
+
+    def weather(self, i: int) -> DailyWeather:
+        return DailyWeather(
+            weather_code=WeatherCode(int(self.weather_code[i])),
+            t_max=float(self.t_max[i]),
+            t_min=float(self.t_min[i]),
+            precipitation_sum=float(self.precipitation[i]),
+        )
+
+    def to_candidates(
+        self,
+        outdoor_scores: np.ndarray,
+        transports: Iterable[Transportation] = tuple(Transportation),
+    ) -> List[DestinationCandidate]:
+        """
+        최종 후보만 DestinationCandidate 객체로 만든다 (날씨가 채워진 행 전제).
+        이동 시간은 transports(유저가 고른 교통수단)만 채운다.
+        """
+        transports = tuple(transports)
+        return [
+            DestinationCandidate(
+                place_info=self.place(i),
+                round_trip_hours=self.round_trip_hours(i, transports),
+                daily_weather=self.weather(i),
+                outdoor_score=int(outdoor_scores[i]),
+            )
+            for i in range(len(self))
+        ]
@@ -1,12 +1,15 @@
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from pydantic import BaseModel
 
 from domain.enums import ChatIntent, PlaceCategory, Transportation, WeatherCode
 
+if TYPE_CHECKING:
+    from domain.plan import TripPlan
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class PlaceInfo:  # 장소 정보 (카카오맵 api 응답과 매핑)
     id: str
     place_name: str
@@ -15,7 +18,7 @@ class PlaceInfo:  # 장소 정보 (카카오맵 api 응답과 매핑)
     dest_lon: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DailyWeather:
     weather_code: WeatherCode  # 날씨 상태 코드
     t_max: float  # 최고 기온 (°C)
@@ -23,7 +26,7 @@ class DailyWeather:
     precipitation_sum: float  # 일 강수량 총합 (mm)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DestinationCandidate:
     place_info: PlaceInfo  # 장소 정보
     round_trip_hours: Dict[Transportation, float | None]  # 왕복 이동 시간
@@ -82,3 +85,4 @@ class ChatSessionState:
     parsed_user_info: Optional[ParsedUserInfo] = None
     candidates: List[DestinationCandidate] = field(default_factory=list)
     current_index: int = 0
+    plan: Optional["TripPlan"] = None  # 조건 변경 시 재사용할 파이프라인 중간 결과
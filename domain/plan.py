@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from domain.batch import CandidateBatch
+from domain.enums import Transportation
+from domain.models import ParsedUserInfo
+
+
+def transports_for(
+    transportation: Optional[Transportation],
+) -> tuple[Transportation, ...]:
+    """
+    유저가 고른 교통수단으로 조회할 경로 종류 (선택이 없으면 둘 다)
+    """
+    if transportation is None:
+        return (Transportation.CAR, Transportation.PUBLIC)
+    return (transportation,)
+
+
+def changed_fields(old: ParsedUserInfo, new: ParsedUserInfo) -> set[str]:
+    """
+    두 여행 조건에서 값이 달라진 필드 이름
+    """
+    old_values, new_values = old.model_dump(), new.model_dump()
+    return {name for name in new_values if old_values.get(name) != new_values[name]}
+
+
+@dataclass(slots=True)
+class TripPlan:
+    """
+    추천 파이프라인(1~6단계)의 중간 결과.
+    여행 조건이 바뀌면 바뀐 조건이 입력인 단계만 다시 계산한다
+    (services.travel_input_service.generate_travel_candidates 참고).
+    """
+
+    info: ParsedUserInfo  # 이 계획을 만든 여행 조건
+    origin_lat: float  # 2단계
+    origin_lon: float
+    radius_m: float  # 3단계
+    searched: CandidateBatch  # 4단계 검색 결과 (거리순)
+    pool: CandidateBatch  # 5단계 필터 통과 후보 + 6단계 이동 시간/날씨 열
@@ -0,0 +1,387 @@
+"""
+다중 세션 채팅 서버 (asyncio, 표준 라이브러리만 사용).
+
+세션 id별로 ChatSessionState를 SessionStore(SESSION_STORE: memory | sqlite | file)에
+두고, 턴은 CLI와 같은 services.chat_service.run_turn으로 처리한다.
+턴 처리(세션 로드/저장, OpenAI/업스트림 호출)는 블로킹이므로 이벤트 루프가 아니라
+TURN_WORKERS개 스레드 풀에서 실행한다. 같은 세션의 턴은 순서대로 처리한다:
+프로세스 안에서는 세션별 asyncio lock으로 기다리고(워커 스레드를 잡지 않음), 저장소를
+공유하는 워커 프로세스 사이에서는 저장소의 세션 lock(SessionStore.lock)으로 막는다.
+세션 생성/삭제, 세션 수 조회도 디스크를 쓰므로 이벤트 루프 밖에서 실행한다.
+
+API (JSON):
+    POST   /sessions                  새 세션 생성 -> {"session_id"}
+    POST   /sessions/{id}/turns       {"message": "..."} -> {"intent", "response", "duration_ms"}
+                                      (없는 세션 id면 새로 만든다)
+    DELETE /sessions/{id}             세션 삭제
+    GET    /healthz                   세션 수, 처리 중인 턴 수
+    GET    /metrics                   Prometheus 텍스트 형식 지표
+
+사용 예:
+    python server.py --port 8080
+    python server.py --stubs --latency-scale 0.2     # 업스트림/LLM 대신 로컬 stub
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlsplit
+
+from domain.models import ChatSessionState
+from services.chat_service import TurnResult, run_turn
+from services.session_store import (
+    SESSION_STORE,
+    SessionStore,
+    check_session_id,
+    create_session_store,
+)
+from services.warmup_service import start_warmup_daemon
+from utils.fixtures import install_fixtures_from_env
+from utils.metrics import REGISTRY, start_metrics_exporters
+
+# 서버 설정
+# - TURN_WORKERS: 턴을 처리할 스레드 수 (동시에 진행되는 턴 수의 상한)
+# - MAX_PENDING_TURNS: 처리 중 + 대기 중인 턴이 이 수를 넘으면 503으로 거절
+# - SESSION_SWEEP_SECONDS: 만료 세션 정리 주기
+# - KEEPALIVE_SECONDS: 요청 없는 keep-alive 연결을 닫기까지의 시간
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+TURN_WORKERS = int(os.getenv("TURN_WORKERS", "64"))
+MAX_PENDING_TURNS = int(os.getenv("MAX_PENDING_TURNS", "512"))
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+KEEPALIVE_SECONDS = float(os.getenv("KEEPALIVE_SECONDS", "75"))
+MAX_BODY_BYTES = 64 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+SERVER_SESSIONS = REGISTRY.gauge(
+    "server_sessions", "저장소에 있는 세션 수 (만료 세션 정리 주기마다 갱신)"
+)
+SERVER_PENDING_TURNS = REGISTRY.gauge(
+    "server_pending_turns", "처리 중이거나 스레드 풀에서 대기 중인 턴 수"
+)
+SERVER_REQUESTS = REGISTRY.counter(
+    "server_requests_total", "HTTP 요청 수", ("route", "status")
+)
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or STATUS_TEXT.get(status, ""))
+        self.status = status
+        self.message = message or STATUS_TEXT.get(status, "")
+
+
+class ChatServer:
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        workers: int = TURN_WORKERS,
+        max_pending: int = MAX_PENDING_TURNS,
+    ):
+        self.store = store if store is not None else create_session_store()
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="turn"
+        )
+        # 진행 중인 턴이 없는 세션의 lock은 자동으로 사라진다
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
+
+    # -----------------------------
+    # 세션 / 턴
+    # -----------------------------
+
+    def _session_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def create_session(self) -> str:
+        session_id = uuid.uuid4().hex
+        self.store.put(session_id, ChatSessionState())
+        return session_id
+
+    def delete_session(self, session_id: str) -> None:
+        self.store.delete(session_id)
+
+    def _run_turn(self, session_id: str, message: str) -> TurnResult:
+        """
+        워커 스레드에서 실행: 세션 lock 안에서 세션 로드 -> 턴 처리 -> 저장.
+        """
+        with self.store.lock(session_id):
+            state = self.store.get(session_id) or ChatSessionState()
+            result = run_turn(message, state)
+            self.store.put(session_id, state)
+        return result
+
+    async def handle_turn(self, session_id: str, message: str) -> dict:
+        if self.pending >= self.max_pending:
+            raise HttpError(
+                503, "처리 중인 요청이 많습니다. 잠시 후 다시 시도해 주세요."
+            )
+
+        self.pending += 1
+        SERVER_PENDING_TURNS.set(self.pending)
+        try:
+            async with self._session_lock(session_id):
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, self._run_turn, session_id, message
+                )
+        finally:
+            self.pending -= 1
+            SERVER_PENDING_TURNS.set(self.pending)
+
+        return {
+            "session_id": session_id,
+            "intent": result.intent.value,
+            "response": result.response,
+            "duration_ms": round(result.duration_seconds * 1000, 1),
+        }
+
+    async def sweep_sessions(self, interval: float = SESSION_SWEEP_SECONDS) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            # sqlite/file 저장소는 디스크를 훑으므로 이벤트 루프 밖에서 실행
+            evicted = await asyncio.to_thread(self.store.evict_expired)
+            remaining = await asyncio.to_thread(len, self.store)
+            SERVER_SESSIONS.set(remaining)
+            if evicted:
+                print(f"[server] 만료 세션 {evicted}개 정리 (남은 세션 {remaining})")
+
+    # -----------------------------
+    # 라우팅
+    # -----------------------------
+
+    async def route(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[str, int, object]:
+        """
+        (route 이름, status, 응답 본문)을 반환한다. 본문이 str이면 text/plain으로 보낸다.
+        """
+        parts = [p for p in path.split("/") if p]
+        if len(parts) >= 2 and parts[0] == "sessions":
+            try:
+                check_session_id(parts[1])
+            except ValueError as e:
+                raise HttpError(400, str(e))
+
+        if parts == ["healthz"] and method == "GET":
+            health = {
+                "status": "ok",
+                "sessions": await asyncio.to_thread(len, self.store),
+                "pending_turns": self.pending,
+            }
+            return "healthz", 200, health
+
+        if parts == ["metrics"] and method == "GET":
+            return "metrics", 200, REGISTRY.render()
+
+        if parts == ["sessions"] and method == "POST":
+            session_id = await asyncio.to_thread(self.create_session)
+            return "sessions", 201, {"session_id": session_id}
+
+        if len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+            await asyncio.to_thread(self.delete_session, parts[1])
+            return "session", 204, None
+
+        if len(parts) == 3 and parts[0] == "sessions" and parts[2] == "turns":
+            if method != "POST":
+                raise HttpError(405)
+            message = _parse_message(body)
+            return "turns", 200, await self.handle_turn(parts[1], message)
+
+        raise HttpError(404)
+
+    # -----------------------------
+    # HTTP/1.1 연결 처리
+    # -----------------------------
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        _read_request(reader), KEEPALIVE_SECONDS
+                    )
+                except HttpError as e:
+                    await _write_response(writer, e.status, {"error": e.message}, True)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                close = headers.get("connection", "").lower() == "close"
+                route = "unknown"
+                try:
+                    route, status, payload = await self.route(method, path, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:  # 턴 하나의 실패로 서버를 멈추지 않는다
+                    print(f"[server] 요청 처리 실패 {method} {path}: {e}")
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                SERVER_REQUESTS.inc(route=route, status=status)
+                await _write_response(writer, status, payload, close)
+                if close:
+                    break
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host: str = SERVER_HOST, port: int = SERVER_PORT) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        sweeper = asyncio.create_task(self.sweep_sessions())
+        print(f"[server] http://{host}:{port} 에서 대기 중")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _parse_message(body: bytes) -> str:
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "본문이 올바른 JSON이 아닙니다.")
+    message = data.get("message") if isinstance(data, dict) else None
+    if not isinstance(message, str) or not message.strip():
+        raise HttpError(400, '"message" 문자열이 필요합니다.')
+    return message.strip()
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[tuple[str, str, dict[str, str], bytes]]:
+    """
+    요청 하나를 읽어 (method, path, headers, body)로 반환한다.
+    클라이언트가 연결을 닫았으면 None.
+    """
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431)
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "잘못된 요청 줄입니다.")
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(400, "잘못된 Content-Length입니다.")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413)
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), urlsplit(target).path, headers, body
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter, status: int, payload, close: bool
+) -> None:
+    if payload is None:
+        body, content_type = b"", None
+    elif isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+    if content_type:
+        lines.append(f"Content-Type: {content_type}")
+    lines.append(f"Content-Length: {len(body)}")
+    if status == 503:
+        lines.append("Retry-After: 1")
+    lines.append(f"Connection: {'close' if close else 'keep-alive'}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=TURN_WORKERS)
+    parser.add_argument(
+        "--session-store",
+        default=SESSION_STORE,
+        help='"memory" | "sqlite:<db 경로>" | "file:<디렉터리>"',
+    )
+    parser.add_argument(
+        "--stubs",
+        action="store_true",
+        help="업스트림/LLM 대신 benchmarks.stubs 사용 (로컬 부하 테스트용)",
+    )
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="stub 지연 배율"
+    )
+    parser.add_argument(
+        "--warmup",
+        action="store_true",
+        help="매일 WARMUP_AT_HOUR 시에 인기 출발지의 캐시를 미리 채운다",
+    )
+    args = parser.parse_args()
+
+    start_metrics_exporters()
+    if args.stubs:
+        from benchmarks.stubs import install_stubs
+
+        install_stubs(scale=args.latency_scale)
+    else:
+        install_fixtures_from_env()
+
+    if args.warmup:
+        start_warmup_daemon()
+
+    server = ChatServer(
+        store=create_session_store(args.session_store), workers=args.workers
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("[server] 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+비용 인지 업스트림 호출 스케줄러.
+
+업스트림마다 비용과 가치가 다르다: open-meteo는 싸고 빠르며 여러 지점을 한 번에 조회하고,
+ODsay는 느리고 일일 쿼터가 작고, 카카오모빌리티/Google Places는 호출마다 과금된다.
+
+- 턴마다 예산(TurnBudget: 호출 수, 비용, 시간)을 두고 실제로 보낸 업스트림 호출만
+  차감한다 (utils.rate_limiter.spending: 예산을 넘는 호출은 보내지 않는다)
+- 6단계는 싼 신호(거리, 날씨)로 후보의 우선순위(candidate_priority)를 먼저 매기고,
+  비싼 경로 조회는 우선순위 순으로 예산(affords) 안에서만 한다
+- 최종 출력의 Google 장소 정보 몫(OUTPUT_RESERVE)은 6단계에서 쓰지 않고 남겨둔다
+- 턴이 끝나면 쓴 예산과 건너뛴 후보 수(이유별)를 출력하고 지표/span에 남긴다
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+import numpy as np
+
+from domain.batch import CandidateBatch
+from domain.enums import Transportation
+from domain.models import ParsedUserInfo
+from utils.deadline import Deadline
+from utils.metrics import BUDGET_SKIPPED, TURN_UPSTREAM_CALLS, TURN_UPSTREAM_COST
+from utils.rate_limiter import current_call_budget, spending
+from utils.tracing import current_span
+from utils.weather_helper import calculate_outdoor_scores
+
+WEATHER_HOST = "api.open-meteo.com"
+PLACES_HOST = "places.googleapis.com"
+ROUTE_HOSTS = {
+    Transportation.CAR: "apis-navi.kakaomobility.com",
+    Transportation.PUBLIC: "api.odsay.com",
+}
+
+# 호출당 비용(원). 없는 호스트는 무료 (쿼터만 있음)
+CALL_COSTS_KRW = {
+    ROUTE_HOSTS[Transportation.CAR]: float(os.getenv("KAKAO_NAVI_COST_KRW", "2")),
+    PLACES_HOST: float(os.getenv("GOOGLE_PLACES_COST_KRW", "20")),
+}
+
+# 턴 예산. 시간 예산은 턴 deadline (TURN_SLO_SECONDS)
+TURN_MAX_CALLS = int(os.getenv("TURN_MAX_CALLS", "150"))
+TURN_MAX_COST_KRW = float(os.getenv("TURN_MAX_COST_KRW", "400"))
+# 호스트별 턴당 최대 호출 수 (ODsay는 일일 쿼터가 작다)
+TURN_HOST_CALLS = {
+    ROUTE_HOSTS[Transportation.PUBLIC]: int(os.getenv("TURN_MAX_TRANSIT_CALLS", "20")),
+}
+
+# 최종 출력(장소 검색 + 설명 + 사진 목록 + 사진 3장)에 남겨둘 호출
+OUTPUT_RESERVE = Counter({PLACES_HOST: 6})
+
+PREFERRED_BONUS = 100.0  # 선호 조건이 이름/주소에 들어간 후보
+UNKNOWN_OUTDOOR_SCORE = 50.0  # 날씨를 아직 모르는 후보
+DISTANCE_WEIGHT = 50.0  # 가장 먼 후보가 잃는 점수
+
+
+@dataclass
+class TurnBudget:
+    """
+    턴 하나의 업스트림 호출 예산과 사용량 (여러 스레드에서 차감한다)
+    """
+
+    deadline: Optional[Deadline] = None
+    max_calls: int = TURN_MAX_CALLS
+    max_cost: float = TURN_MAX_COST_KRW
+    calls: Counter = field(default_factory=Counter)  # 호스트별 실제 호출 수
+    skipped: Counter = field(default_factory=Counter)  # 이유별 건너뛴 후보 수
+    started_at: float = field(default_factory=time.monotonic)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def spent_calls(self) -> int:
+        return sum(self.calls.values())
+
+    @property
+    def spent_cost(self) -> float:
+        return sum(CALL_COSTS_KRW.get(h, 0.0) * n for h, n in self.calls.items())
+
+    def affords(self, calls: Counter, reserve: Counter = Counter()) -> bool:
+        """
+        호스트별 calls만큼 더 호출하고도 reserve를 남길 수 있는지
+        """
+        with self._lock:
+            return self._affords(calls + reserve)
+
+    def _affords(self, total: Counter) -> bool:
+        if self.spent_calls + sum(total.values()) > self.max_calls:
+            return False
+        extra_cost = sum(CALL_COSTS_KRW.get(h, 0.0) * n for h, n in total.items())
+        if self.spent_cost + extra_cost > self.max_cost:
+            return False
+        return all(
+            self.calls[host] + n <= TURN_HOST_CALLS.get(host, self.max_calls)
+            for host, n in total.items()
+        )
+
+    def spend(self, host: str) -> bool:
+        """
+        host로 한 번 더 호출할 수 있으면 차감하고 True.
+        최종 출력이 아닌 호출은 출력 몫(OUTPUT_RESERVE)을 남긴다.
+        """
+        reserve = Counter() if host == PLACES_HOST else OUTPUT_RESERVE
+        with self._lock:
+            if not self._affords(Counter({host: 1}) + reserve):
+                return False
+            self.calls[host] += 1
+            return True
+
+    def refund(self, host: str) -> None:
+        with self._lock:
+            self.calls[host] -= 1
+
+    def skip(self, reason: str, count: int) -> None:
+        if count:
+            with self._lock:
+                self.skipped[reason] += count
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started_at
+        budget_s = self.deadline.expires_at - self.started_at if self.deadline else None
+        skipped = ", ".join(f"{r}={n}" for r, n in sorted(self.skipped.items()))
+        return (
+            f"calls {self.spent_calls}/{self.max_calls}, "
+            f"cost {self.spent_cost:g}/{self.max_cost:g}원, "
+            f"time {elapsed:.2f}"
+            + (f"/{budget_s:.2f}s" if budget_s is not None else "s")
+            + f", skipped candidates: {skipped or 'none'}"
+        )
+
+
+def current_budget() -> Optional[TurnBudget]:
+    budget = current_call_budget()
+    return budget if isinstance(budget, TurnBudget) else None
+
+
+@contextmanager
+def turn_budget(deadline: Optional[Deadline] = None) -> Iterator[TurnBudget]:
+    """
+    턴 하나를 예산 안에서 실행하고, 끝나면 사용량을 출력/기록한다
+    """
+    budget = TurnBudget(deadline=deadline)
+    with spending(budget):
+        yield budget
+
+    TURN_UPSTREAM_CALLS.observe(budget.spent_calls)
+    TURN_UPSTREAM_COST.observe(budget.spent_cost)
+    for reason, count in budget.skipped.items():
+        BUDGET_SKIPPED.inc(count, reason=reason)
+    s = current_span()
+    if s is not None:
+        s.set(
+            budget_calls=budget.spent_calls,
+            budget_cost=budget.spent_cost,
+            skipped_candidates=sum(budget.skipped.values()),
+        )
+    print(f"[budget] {budget.summary()}")
+
+
+def route_calls(
+    candidates: CandidateBatch,
+    rows: np.ndarray,
+    transports: tuple[Transportation, ...],
+) -> Counter:
+    """
+    rows의 경로를 조회하는 데 필요한 호스트별 호출 수 (이미 조회한 교통수단 제외)
+    """
+    return Counter(
+        {ROUTE_HOSTS[t]: int((~candidates.routed(t)[rows]).sum()) for t in transports}
+    )
+
+
+def candidate_priority(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+) -> np.ndarray:
+    """
+    싼 신호로 매긴 후보 우선순위 (클수록 먼저 조회).
+    선호 조건 보너스 + 실외 활동 점수(7단계 top k가 선호) - 거리 페널티.
+    """
+    terms = [
+        t
+        for t in (parsed_user_info.must_include or []) + (parsed_user_info.likes or [])
+        if t
+    ]
+    preferred = np.fromiter(
+        (
+            any(t in name or t in address for t in terms)
+            for name, address in zip(candidates.names, candidates.addresses)
+        ),
+        dtype=bool,
+        count=len(candidates),
+    )
+    outdoor = np.where(
+        candidates.has_weather(),
+        calculate_outdoor_scores(
+            candidates.weather_code,
+            candidates.t_max,
+            candidates.t_min,
+            candidates.precipitation,
+        ),
+        UNKNOWN_OUTDOOR_SCORE,
+    )
+    distances_km = candidates.distances_km(origin_lat, origin_lon)
+    farthest = max(float(distances_km.max(initial=0.0)), 1e-9)
+    return (
+        PREFERRED_BONUS * preferred
+        + outdoor
+        - DISTANCE_WEIGHT * distances_km / farthest
+    )
+
+
+def enrichment_order(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    transports: tuple[Transportation, ...],
+) -> np.ndarray:
+    """
+    6단계 조회 순서: 이미 조회한 후보(호출 없음) -> 우선순위 높은 후보 순
+    """
+    needs_calls = ~candidates.has_weather()
+    for transport in transports:
+        needs_calls |= ~candidates.routed(transport)
+    priority = candidate_priority(candidates, parsed_user_info, origin_lat, origin_lon)
+    # np.lexsort는 마지막 키가 1순위
+    return np.lexsort((-priority, needs_calls))
@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from apis.openai_followup_handler import handle_follow_up
+from apis.openai_intent_parser import parse_user_intent
+from apis.openai_unknown_handler import handle_unknown_input
+from domain.enums import ChatIntent
+from domain.models import ChatSessionState
+from services.call_scheduler import turn_budget
+from services.travel_input_service import (
+    generate_more_candidates,
+    generate_travel_candidates,
+)
+from services.travel_output_service import generate_final_output
+from utils.deadline import Deadline
+from utils.metrics import TURN_LLM_TOKENS, TURN_SECONDS
+from utils.tracing import Trace, current_span, finish_trace, start_trace
+
+TOP_K = 5  # 한 번에 추천할 후보지 수
+
+
+@dataclass
+class TurnResult:
+    intent: ChatIntent
+    response: str
+    trace: Optional[Trace] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        if self.trace is None or self.trace.root is None:
+            return 0.0
+        return self.trace.root.duration_ms / 1000
+
+
+def handle_turn(
+    user_input: str,
+    state: ChatSessionState,
+    deadline: Optional[Deadline] = None,
+) -> TurnResult:
+    """
+    유저 입력 1회 처리: intent 분류 후 intent별로 라우팅한다.
+    """
+    has_already_recommended = len(state.candidates) > 0
+
+    # Intent 추출
+    intent = parse_user_intent(
+        user_input,
+        has_already_recommended,
+        deadline,
+    )
+    s = current_span()
+    if s is not None:
+        s.set(intent=intent.value)
+
+    # Intent 라우팅
+    if intent == ChatIntent.TRIP_INFO:
+        generate_travel_candidates(user_input, TOP_K, state, deadline)
+        response = generate_final_output(state, deadline)
+
+    elif intent == ChatIntent.NEXT_CANDIDATE:
+        # 준비한 후보를 다 보여줬으면 남은 후보 풀에서 다음 페이지를 만든다
+        if state.current_index >= len(state.candidates):
+            generate_more_candidates(TOP_K, state, deadline)
+        response = generate_final_output(state, deadline)
+
+    elif intent == ChatIntent.FOLLOW_UP:
+        response = handle_follow_up(user_input, state)
+
+    else:
+        response = handle_unknown_input(user_input, has_already_recommended, deadline)
+
+    return TurnResult(intent=intent, response=response)
+
+
+def run_turn(user_input: str, state: ChatSessionState) -> TurnResult:
+    """
+    handle_turn + 턴 단위 지연/호출 예산(TURN_SLO_SECONDS, TurnBudget), 트레이스, 턴 지표.
+    CLI, 부하 생성기 등 턴을 실행하는 모든 곳에서 사용한다.
+    """
+    with start_trace("turn") as trace:
+        deadline = Deadline.start()
+        with turn_budget(deadline):
+            result = handle_turn(user_input, state, deadline)
+
+    finish_trace(trace)
+    result.trace = trace
+    TURN_SECONDS.observe(result.duration_seconds, intent=result.intent.value)
+    TURN_LLM_TOKENS.observe(trace.total("tokens"))
+    return result
@@ -0,0 +1,344 @@
+"""
+도달 가능 영역(isochrone) 모델.
+
+max_travel_hours_to_radius_m는 고정 속도(자동차 60km/h, 대중교통 22km/h)로 원형 반경을
+정하기 때문에 고속도로/지하철이 한쪽으로만 뻗은 곳에서는 원이 실제 도달 가능 영역보다
+넓거나 좁다. 여기서는 출발지 주변 극좌표 격자(방위 x 거리)의 왕복 이동 시간을 실제 경로
+API로 샘플링해 두고(TravelTimeProfile), 여행 시간 한도마다 방위별 도달 거리를 보간한
+다각형(Isochrone)으로 검색 센터와 후보를 거른다.
+
+- 프로필은 (출발 타일, 교통수단, 출발 시간대)마다 한 번 만들어 TTLCache에 둔다
+- 캐시에 없으면 백그라운드에서 만들고 이번 턴은 원형 반경을 그대로 쓴다 (턴을 막지 않음)
+- 샘플 조회가 하나라도 실패하면(rate limit 등) 다각형이 작아질 수 있으므로 캐시하지 않고,
+  같은 프로필은 ISOCHRONE_RETRY_SECONDS부터 두 배씩 늘어나는 간격이 지나야 다시 만든다
+- 경로가 없는 샘플(바다, 대중교통 없음)은 NaN으로 두고 도달 불가로 본다
+"""
+
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from apis.route import get_round_trip_hours
+from domain.enums import Transportation
+from domain.plan import transports_for
+from utils.cache import TTLCache
+from utils.distance_helper import from_local_km, to_local_km
+from utils.rate_limiter import is_low_priority, low_priority
+from utils.tracing import bind_context
+
+ISOCHRONE_ENABLED = os.getenv("ISOCHRONE", "1") == "1"
+ISOCHRONE_BEARINGS = int(os.getenv("ISOCHRONE_BEARINGS", "8"))
+# 교통수단별 샘플 거리(km, 편도 직선거리)
+ISOCHRONE_DISTANCES_KM = {
+    Transportation.CAR: os.getenv("ISOCHRONE_CAR_KM", "10,25,50,100,150"),
+    Transportation.PUBLIC: os.getenv("ISOCHRONE_PUBLIC_KM", "5,10,20,35,60"),
+}
+ISOCHRONE_TTL_SECONDS = float(os.getenv("ISOCHRONE_TTL_SECONDS", str(7 * 24 * 3600)))
+ISOCHRONE_BUILD_WORKERS = int(os.getenv("ISOCHRONE_BUILD_WORKERS", "2"))
+# 도달 거리 여유 배율: 샘플 사이를 직선으로 보간한 추정이라 경계 근처 후보를 잃지 않도록
+ISOCHRONE_MARGIN = float(os.getenv("ISOCHRONE_MARGIN", "1.2"))
+# 만들기에 실패한 프로필을 다시 만들기까지 기다리는 시간 (실패할 때마다 두 배, 최대 MAX)
+ISOCHRONE_RETRY_SECONDS = float(os.getenv("ISOCHRONE_RETRY_SECONDS", "300"))
+ISOCHRONE_RETRY_MAX_SECONDS = float(os.getenv("ISOCHRONE_RETRY_MAX_SECONDS", "3600"))
+
+TILE_DEG = 0.05  # 출발 타일 크기 (약 5km)
+TIME_BUCKET_HOURS = 3  # 자동차 출발 시간대 단위 (대중교통은 시각을 반영하지 않는다)
+MIN_REACH_KM = 3.0  # max_travel_hours_to_radius_m의 최소 반경과 같다
+
+_profiles = TTLCache("isochrone", ISOCHRONE_TTL_SECONDS, max_entries=512)
+# key -> (연속 실패 횟수, 다시 만들어도 되는 시각(monotonic))
+_failures = TTLCache("isochrone_failures", ISOCHRONE_RETRY_MAX_SECONDS, max_entries=512)
+_building: set[tuple] = set()
+_building_lock = threading.Lock()
+_builder = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="isochrone"
+)  # 프로필은 한 번에 하나씩 만든다 (경로 API 쿼터)
+
+
+@dataclass(frozen=True, slots=True)
+class TravelTimeProfile:
+    """
+    출발 타일 중심에서 방위(북쪽 기준 시계 방향)별, 거리별 왕복 이동 시간 샘플.
+    hours[b, d]: bearings_deg[b] 방향으로 distances_km[d] 떨어진 지점까지의 왕복 시간
+    (경로가 없으면 NaN).
+    """
+
+    origin_lat: float
+    origin_lon: float
+    bearings_deg: np.ndarray
+    distances_km: np.ndarray
+    hours: np.ndarray
+
+    def reach_km(self, max_round_trip_hours: float) -> np.ndarray:
+        """
+        방위별 도달 거리(km).
+        한도 안에 드는 가장 먼 샘플과 그다음 샘플 사이를 선형 보간한다
+        (중간에 닿지 않는 샘플(바다 등)이 있어도 더 먼 샘플이 닿으면 그쪽을 쓴다).
+        경로가 없는 샘플(NaN)은 닿지 않는 것으로 보고, 그쪽으로는 보간하지 않는다.
+        """
+        distances = np.concatenate([[0.0], self.distances_km])
+        reach = np.empty(len(self.bearings_deg))
+        for b, row in enumerate(self.hours):
+            hours = np.concatenate([[0.0], row])
+            reachable = np.flatnonzero(hours <= max_round_trip_hours)
+            j = reachable[-1]
+            reach[b] = distances[j]
+            if j + 1 < len(hours) and hours[j + 1] > hours[j]:
+                t = (max_round_trip_hours - hours[j]) / (hours[j + 1] - hours[j])
+                reach[b] += t * (distances[j + 1] - distances[j])
+        return reach
+
+
+@dataclass(frozen=True, slots=True)
+class Isochrone:
+    """
+    방위별 도달 거리를 꼭짓점으로 하는 다각형 (원점 기준 star-shaped).
+    """
+
+    origin_lat: float
+    origin_lon: float
+    bearings_deg: np.ndarray
+    reach_km: np.ndarray
+
+    @property
+    def radius_m(self) -> float:
+        """
+        다각형을 모두 덮는 검색 반경
+        """
+        return float(self.reach_km.max()) * 1000.0
+
+    def contains(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """
+        점들이 다각형 안에 있는지 (벡터화).
+        점이 속한 방위 구간의 두 꼭짓점을 잇는 변까지의 거리와 비교한다.
+        """
+        x, y = to_local_km(
+            np.asarray(lat), np.asarray(lon), self.origin_lat, self.origin_lon
+        )
+        r = np.hypot(x, y)
+        theta = np.degrees(np.arctan2(x, y)) % 360.0
+
+        step = 360.0 / len(self.bearings_deg)
+        i = np.floor(theta / step).astype(np.intp) % len(self.bearings_deg)
+        j = (i + 1) % len(self.bearings_deg)
+        a = np.radians(theta - i * step)
+        d = math.radians(step)
+        ri, rj = self.reach_km[i], self.reach_km[j]
+
+        denominator = ri * np.sin(a) + rj * np.sin(d - a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            boundary = np.where(
+                denominator > 0, ri * rj * math.sin(d) / denominator, 0.0
+            )
+        return r <= boundary
+
+    def intersects_circle(self, lat: float, lon: float, radius_m: float) -> bool:
+        """
+        원(검색 센터와 카카오 검색 반경)이 다각형과 겹치는지 (근사).
+        원 위의 점 16개, 원점에 가장 가까운 점, 원 안에 든 꼭짓점으로 판단한다.
+        """
+        radius_km = radius_m / 1000.0
+        cx, cy = to_local_km(
+            np.array(lat), np.array(lon), self.origin_lat, self.origin_lon
+        )
+        center_r = float(np.hypot(cx, cy))
+        if center_r <= radius_km:
+            return True
+
+        angles = np.linspace(0, 2 * np.pi, 16, endpoint=False)
+        px = np.concatenate(
+            [cx + radius_km * np.sin(angles), [cx * (1 - radius_km / center_r)]]
+        )
+        py = np.concatenate(
+            [cy + radius_km * np.cos(angles), [cy * (1 - radius_km / center_r)]]
+        )
+        if self.contains(
+            *from_local_km(px, py, self.origin_lat, self.origin_lon)
+        ).any():
+            return True
+
+        bearings = np.radians(self.bearings_deg)
+        vx, vy = self.reach_km * np.sin(bearings), self.reach_km * np.cos(bearings)
+        return bool((np.hypot(vx - cx, vy - cy) <= radius_km).any())
+
+
+def _profile_key(
+    origin_lat: float,
+    origin_lon: float,
+    transport: Transportation,
+    departure_datetime: str,
+) -> tuple:
+    tile = (round(origin_lat / TILE_DEG), round(origin_lon / TILE_DEG))
+    if transport == Transportation.CAR:
+        dt = datetime.fromisoformat(departure_datetime)
+        bucket = (dt.weekday() >= 5, dt.hour // TIME_BUCKET_HOURS)
+    else:
+        bucket = None
+    return tile, transport, bucket
+
+
+def build_profile(
+    origin_lat: float,
+    origin_lon: float,
+    transport: Transportation,
+    departure_datetime: str,
+) -> Optional[TravelTimeProfile]:
+    """
+    출발 타일 중심에서 극좌표 격자 지점들의 왕복 이동 시간을 조회한다
+    (ISOCHRONE_BUILD_WORKERS개씩 동시에). 실패한 조회가 있으면 None.
+    """
+    tile, _, _ = _profile_key(origin_lat, origin_lon, transport, departure_datetime)
+    center_lat, center_lon = tile[0] * TILE_DEG, tile[1] * TILE_DEG
+
+    bearings = np.arange(ISOCHRONE_BEARINGS) * (360.0 / ISOCHRONE_BEARINGS)
+    distances = np.array(
+        [float(d) for d in ISOCHRONE_DISTANCES_KM[transport].split(",")]
+    )
+    bb, dd = np.meshgrid(np.radians(bearings), distances, indexing="ij")
+    lat, lon = from_local_km(dd * np.sin(bb), dd * np.cos(bb), center_lat, center_lon)
+
+    def route(point: tuple[float, float]) -> Optional[float]:
+        return get_round_trip_hours(
+            transportation=transport,
+            departure_datetime=departure_datetime,
+            origin_lat=center_lat,
+            origin_lon=center_lon,
+            dest_lat=point[0],
+            dest_lon=point[1],
+            no_route_hours=math.nan,
+        )[transport]
+
+    # bind_context: 호출한 쪽의 트레이스/우선순위(low_priority)를 그대로 쓴다
+    with ThreadPoolExecutor(max_workers=ISOCHRONE_BUILD_WORKERS) as executor:
+        futures = [
+            executor.submit(bind_context(route), point)
+            for point in zip(lat.ravel(), lon.ravel())
+        ]
+        results = [future.result() for future in futures]
+
+    failed = sum(1 for h in results if h is None)
+    if failed:
+        print(f"[isochrone] {failed}/{len(results)} samples failed, not cached")
+        return None
+
+    return TravelTimeProfile(
+        origin_lat=center_lat,
+        origin_lon=center_lon,
+        bearings_deg=bearings,
+        distances_km=distances,
+        hours=np.array(results, dtype=np.float64).reshape(bb.shape),
+    )
+
+
+def warm_profile(
+    origin_lat: float,
+    origin_lon: float,
+    transport: Transportation,
+    departure_datetime: str,
+) -> Optional[TravelTimeProfile]:
+    """
+    프로필을 (없으면 만들어서) 캐시에 넣고 돌려준다. 호출한 스레드에서 만든다.
+    """
+    key = _profile_key(origin_lat, origin_lon, transport, departure_datetime)
+    profile = _profiles.get(key)
+    if profile is None:
+        profile = build_profile(origin_lat, origin_lon, transport, departure_datetime)
+        if profile is not None:
+            _profiles.put(key, profile)
+    return profile
+
+
+def _backoff(key: tuple) -> None:
+    """
+    만들기에 실패한 프로필을 한동안 다시 만들지 않는다
+    """
+    failures, _ = _failures.get(key) or (0, 0.0)
+    delay = min(ISOCHRONE_RETRY_SECONDS * 2**failures, ISOCHRONE_RETRY_MAX_SECONDS)
+    _failures.put(key, (failures + 1, time.monotonic() + delay))
+    print(f"[isochrone] retrying in {delay:.0f}s")
+
+
+def _backing_off(key: tuple) -> bool:
+    failure = _failures.get(key)
+    return failure is not None and time.monotonic() < failure[1]
+
+
+def _build_in_background(key: tuple, *args) -> None:
+    if _backing_off(key):
+        return
+    with _building_lock:
+        if key in _building:
+            return
+        _building.add(key)
+
+    # 호출한 쪽의 우선순위(캐시 워밍이면 low_priority)만 넘긴다.
+    # 턴 예산/트레이스는 넘기지 않는다 (턴은 이 빌드를 기다리지 않고 먼저 끝난다)
+    priority = low_priority() if is_low_priority() else nullcontext()
+
+    def run():
+        profile = None
+        try:
+            with priority:
+                profile = warm_profile(*args)
+        except Exception as e:
+            print(f"[isochrone] build failed: {e}")
+        finally:
+            if profile is None:
+                _backoff(key)
+            with _building_lock:
+                _building.discard(key)
+
+    _builder.submit(run)
+
+
+def get_isochrone(
+    origin_lat: float,
+    origin_lon: float,
+    transportation: Optional[Transportation],
+    departure_datetime: str,
+    max_round_trip_hours: float,
+) -> Optional[Isochrone]:
+    """
+    캐시된 프로필로 여행 시간 한도의 도달 가능 다각형을 만든다 (원점은 출발지).
+    교통수단을 고르지 않았으면 두 교통수단 중 더 멀리 가는 쪽을 방위별로 택한다.
+    프로필이 하나라도 없으면 백그라운드에서 만들기 시작하고 None (원형 반경 사용).
+    최근에 만들기에 실패한 프로필은 다시 만들지 않는다 (_backoff).
+    """
+    if not ISOCHRONE_ENABLED:
+        return None
+
+    profiles = []
+    for transport in transports_for(transportation):
+        args = (origin_lat, origin_lon, transport, departure_datetime)
+        key = _profile_key(*args)
+        profile = _profiles.get(key)
+        if profile is None:
+            _build_in_background(key, *args)
+        profiles.append(profile)
+    if any(p is None for p in profiles):
+        return None
+
+    reach = np.max([p.reach_km(max_round_trip_hours) for p in profiles], axis=0)
+    # 프로필은 타일 중심에서 샘플링했으므로, 다각형은 유저의 출발지를 원점으로 두고
+    # 방위별 도달 거리를 출발지와 타일 중심 사이 거리만큼 늘린다
+    x, y = to_local_km(
+        np.array(origin_lat),
+        np.array(origin_lon),
+        profiles[0].origin_lat,
+        profiles[0].origin_lon,
+    )
+    offset_km = float(np.hypot(x, y))
+    return Isochrone(
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        bearings_deg=profiles[0].bearings_deg,
+        reach_km=np.maximum(reach * ISOCHRONE_MARGIN + offset_km, MIN_REACH_KM),
+    )
@@ -0,0 +1,141 @@
+"""
+TRIP_INFO 결과 캐시.
+
+출발 동네, 카테고리, 여행 시간, 출발 날짜가 사실상 같은 요청이 반복되므로
+정규화한 여행 조건(result_key)마다 마지막으로 만든 계획(TripPlan: 검색/필터 결과와
+경로/날씨 열)과 top k 후보를 보관하고, 같은 조건이면 3~7단계를 건너뛴다.
+
+- 항목 수명은 경로/예보 TTL 중 짧은 쪽 (apis.route.ROUTE_TTL_SECONDS,
+  apis.weather.FORECAST_TTL_SECONDS): 보관한 이동 시간/날씨가 낡으면 항목도 버린다
+- deadline에 걸려 잘린 결과(검색 중단, 순위 LLM timeout)는 보관하지 않는다
+- 여행 시간은 구간 단위로 묶으므로 꺼낼 때 유저의 한도를 넘는 후보는 빼고,
+  남은 후보가 k개보다 적으면 쓰지 않는다
+"""
+
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+
+from apis.route import ROUTE_TTL_SECONDS
+from apis.weather import FORECAST_TTL_SECONDS
+from domain.enums import Transportation
+from domain.models import DestinationCandidate, ParsedUserInfo
+from domain.plan import TripPlan, transports_for
+from utils.cache import TTLCache
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE", "1") == "1"
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+
+TILE_DEG = 0.01  # 출발 타일 크기 (약 1km, 같은 동네)
+HOURS_BUCKET = 1.0  # 여행 시간(왕복) 구간 단위
+TIME_BUCKET_HOURS = 3  # 출발 시간대 단위
+
+_results = TTLCache(
+    "trip_result",
+    min(ROUTE_TTL_SECONDS, FORECAST_TTL_SECONDS),
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResult:
+    plan: TripPlan
+    candidates: List[DestinationCandidate]  # 7단계 top k (추천 이유 포함)
+
+
+def _terms(values: Optional[List[str]]) -> tuple[str, ...]:
+    """
+    선호/비선호 목록 정규화: 공백/대소문자/순서/중복 무시
+    """
+    return tuple(sorted({v.strip().lower() for v in values or () if v and v.strip()}))
+
+
+def result_key(
+    parsed_user_info: ParsedUserInfo, origin_lat: float, origin_lon: float
+) -> tuple:
+    """
+    결과가 같다고 볼 수 있는 여행 조건의 정규화 키
+    """
+    dt = datetime.fromisoformat(parsed_user_info.departure_datetime)
+    transportation = parsed_user_info.transportation
+    return (
+        (round(origin_lat / TILE_DEG), round(origin_lon / TILE_DEG)),
+        tuple(sorted({c.value for c in parsed_user_info.destination_categories})),
+        (parsed_user_info.keyword or "").strip().lower(),
+        transportation.value if transportation else None,
+        math.floor(parsed_user_info.max_travel_hours / HOURS_BUCKET),
+        dt.date().isoformat(),
+        dt.hour // TIME_BUCKET_HOURS,
+        _terms(parsed_user_info.likes),
+        _terms(parsed_user_info.dislikes),
+        _terms(parsed_user_info.must_include),
+        _terms(parsed_user_info.must_avoid),
+    )
+
+
+def _copy_plan(plan: TripPlan, parsed_user_info: ParsedUserInfo) -> TripPlan:
+    """
+    세션마다 풀을 고쳐 쓰므로(경로 초기화, 다음 페이지 조회) 배치를 복사한다.
+    출발지는 풀의 경로를 조회한 출발지 그대로 둔다.
+    """
+    return TripPlan(
+        info=parsed_user_info,
+        origin_lat=plan.origin_lat,
+        origin_lon=plan.origin_lon,
+        radius_m=plan.radius_m,
+        searched=plan.searched.take(slice(None)),
+        pool=plan.pool.take(slice(None)),
+    )
+
+
+def get_result(
+    parsed_user_info: ParsedUserInfo, origin_lat: float, origin_lon: float, k: int
+) -> Optional[CachedResult]:
+    """
+    같은 조건의 결과가 있으면 이 세션용 복사본 (계획의 조건은 이번 요청 값).
+    - 유저의 한도 안에 드는 후보가 k개보다 적으면 None (처음부터 다시 찾는다)
+    - 같은 동네의 다른 출발지면 계획의 출발지를 이번 요청 값으로 바꾸고 풀의 경로는
+      지운다 (다음 페이지부터 이 출발지에서 다시 조회한다. top k 후보는 그대로 쓴다)
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+    entry = _results.get(result_key(parsed_user_info, origin_lat, origin_lon))
+    if entry is None:
+        return None
+
+    max_round_trip_hours = parsed_user_info.max_travel_hours * 0.5
+    transports = transports_for(parsed_user_info.transportation)
+    candidates = [
+        c
+        for c in entry.candidates
+        if any(
+            (hours := c.round_trip_hours.get(t)) is not None
+            and hours <= max_round_trip_hours
+            for t in transports
+        )
+    ]
+    if len(candidates) < k:
+        return None
+
+    plan = _copy_plan(entry.plan, parsed_user_info)
+    if (plan.origin_lat, plan.origin_lon) != (origin_lat, origin_lon):
+        plan.origin_lat, plan.origin_lon = origin_lat, origin_lon
+        for transport in Transportation:
+            plan.searched.reset_routes(transport)
+            plan.pool.reset_routes(transport)
+    return CachedResult(plan=plan, candidates=candidates)
+
+
+def put_result(plan: TripPlan, candidates: List[DestinationCandidate]) -> None:
+    if not RESULT_CACHE_ENABLED or not candidates:
+        return
+    key = result_key(plan.info, plan.origin_lat, plan.origin_lon)
+    _results.put(
+        key,
+        CachedResult(
+            plan=_copy_plan(plan, plan.info),
+            candidates=list(candidates),
+        ),
+    )
@@ -0,0 +1,626 @@
+import math
+import os
+import re
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import ContextManager, Iterator, Optional, Protocol
+
+import numpy as np
+
+from domain.batch import CandidateBatch
+from domain.enums import Transportation, WeatherCode
+from domain.models import (
+    ChatSessionState,
+    DailyWeather,
+    DestinationCandidate,
+    ParsedUserInfo,
+    PlaceInfo,
+)
+from domain.plan import TripPlan
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 세션 보관 설정
+# - SESSION_STORE: "memory" | "sqlite:<db 경로>" | "file:<디렉터리>"
+#   sqlite/file은 재시작 후에도 세션이 남고 여러 워커 프로세스가 같은 세션을 공유한다
+# - SESSION_TTL_SECONDS: 마지막 사용 이후 이 시간이 지나면 세션을 버린다
+# - MAX_SESSIONS: 메모리에 둘 최대 세션 수 (넘으면 가장 오래 안 쓴 세션부터 버린다)
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+# - SESSION_LOCK_SECONDS: sqlite 세션 lock의 lease 시간 (lock을 쥔 프로세스가 죽어도
+#   이 시간이 지나면 다른 프로세스가 가져간다. 턴 하나보다 충분히 길어야 한다)
+SESSION_LOCK_SECONDS = float(os.getenv("SESSION_LOCK_SECONDS", "60"))
+SESSION_LOCK_POLL_SECONDS = 0.05
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def check_session_id(session_id: str) -> None:
+    """
+    세션 id는 파일 이름/URL 경로에 그대로 쓰이므로 영문, 숫자, _, - 만 허용한다.
+    """
+    if not SESSION_ID_PATTERN.match(session_id):
+        raise ValueError(f"잘못된 세션 id입니다: {session_id!r}")
+
+
+# -----------------------------
+# 직렬화
+# -----------------------------
+#
+# 형식 (zlib 압축 전, 정수/실수는 little-endian):
+#   header     : magic "CS" + version(u8)
+#   세션       : current_index(u32), parsed_user_info(JSON str)
+#   후보 수(u32) 후 후보마다
+#     place    : id, place_name, road_address_name (str), dest_lat, dest_lon (f64)
+#     이동 시간: CAR, PUBLIC (f64, 값 없음은 NaN) + 키 존재 비트마스크(u8)
+#     날씨     : weather_code(u8), t_max, t_min, precipitation_sum (f64)
+#     기타     : outdoor_score(u8), reason(str, 없음은 길이 0xFFFFFFFF)
+#   plan 유무(u8) 후 plan이 있으면 (version 2부터)
+#     info, origin_lat, origin_lon, radius_m (f64)
+#     searched : 행 수(u32), 행마다 id/이름/주소(str), lat, lon 배열
+#     pool     : 행 수(u32), searched 행 번호(u32 배열), 이동 시간/날씨 열 배열
+# str은 길이(u32) + UTF-8 바이트, 배열은 원소를 그대로 이어 붙인 바이트
+
+_MAGIC = b"CS"
+_VERSION = 2
+_READABLE_VERSIONS = (1, 2)
+_NONE_LEN = 0xFFFFFFFF
+_TRANSPORTS = (Transportation.CAR, Transportation.PUBLIC)
+
+_HEADER = struct.Struct("<2sB")
+_U32 = struct.Struct("<I")
+_COORDS = struct.Struct("<dd")
+_TRIP = struct.Struct("<ddB")
+_WEATHER = struct.Struct("<Bddd")
+_U8 = struct.Struct("<B")
+_PLAN = struct.Struct("<ddd")
+
+# pool 열과 dtype (배열은 little-endian으로 저장)
+_POOL_COLUMNS = (
+    ("car_hours", "<f8"),
+    ("public_hours", "<f8"),
+    ("car_routed", "?"),
+    ("public_routed", "?"),
+    ("weather_code", "<i2"),
+    ("t_max", "<f8"),
+    ("t_min", "<f8"),
+    ("precipitation", "<f8"),
+)
+
+
+def _pack_str(out: list[bytes], value: Optional[str]) -> None:
+    if value is None:
+        out.append(_U32.pack(_NONE_LEN))
+        return
+    data = value.encode("utf-8")
+    out.append(_U32.pack(len(data)))
+    out.append(data)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def array(self, dtype: str, count: int) -> np.ndarray:
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset)
+        self.offset += values.nbytes
+        return values.astype(values.dtype.newbyteorder("="))
+
+    def str(self) -> Optional[str]:
+        (length,) = self.unpack(_U32)
+        if length == _NONE_LEN:
+            return None
+        value = self.data[self.offset : self.offset + length].decode("utf-8")
+        self.offset += length
+        return value
+
+
+def encode_session(state: ChatSessionState) -> bytes:
+    """
+    ChatSessionState -> 압축된 바이너리. decode_session과 짝을 이룬다.
+    """
+    out = [_HEADER.pack(_MAGIC, _VERSION), _U32.pack(state.current_index)]
+    info = state.parsed_user_info
+    _pack_str(out, info.model_dump_json() if info is not None else None)
+
+    out.append(_U32.pack(len(state.candidates)))
+    for c in state.candidates:
+        p = c.place_info
+        _pack_str(out, p.id)
+        _pack_str(out, p.place_name)
+        _pack_str(out, p.road_address_name)
+        out.append(_COORDS.pack(p.dest_lat, p.dest_lon))
+
+        hours, present = [], 0
+        for bit, transport in enumerate(_TRANSPORTS):
+            value = c.round_trip_hours.get(transport)
+            if transport in c.round_trip_hours:
+                present |= 1 << bit
+            hours.append(math.nan if value is None else value)
+        out.append(_TRIP.pack(*hours, present))
+
+        w = c.daily_weather
+        out.append(
+            _WEATHER.pack(int(w.weather_code), w.t_max, w.t_min, w.precipitation_sum)
+        )
+        out.append(_U8.pack(c.outdoor_score))
+        _pack_str(out, c.reason)
+
+    out.append(_U8.pack(state.plan is not None))
+    if state.plan is not None:
+        _pack_plan(out, state.plan)
+
+    return zlib.compress(b"".join(out))
+
+
+def _pack_array(out: list[bytes], values: np.ndarray, dtype: str) -> None:
+    out.append(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+
+def _pack_plan(out: list[bytes], plan: TripPlan) -> None:
+    _pack_str(out, plan.info.model_dump_json())
+    out.append(_PLAN.pack(plan.origin_lat, plan.origin_lon, plan.radius_m))
+
+    searched = plan.searched
+    out.append(_U32.pack(len(searched)))
+    for i in range(len(searched)):
+        _pack_str(out, searched.ids[i])
+        _pack_str(out, searched.names[i])
+        _pack_str(out, searched.addresses[i])
+    _pack_array(out, searched.lat, "<f8")
+    _pack_array(out, searched.lon, "<f8")
+
+    # pool은 searched의 부분집합이므로 문자열/좌표 대신 행 번호만 저장
+    row_of = {place_id: i for i, place_id in enumerate(searched.ids)}
+    pool = plan.pool
+    out.append(_U32.pack(len(pool)))
+    _pack_array(out, [row_of[place_id] for place_id in pool.ids], "<u4")
+    for column, dtype in _POOL_COLUMNS:
+        _pack_array(out, getattr(pool, column), dtype)
+
+
+def _read_plan(reader: _Reader) -> TripPlan:
+    info = ParsedUserInfo.model_validate_json(reader.str())
+    origin_lat, origin_lon, radius_m = reader.unpack(_PLAN)
+
+    (count,) = reader.unpack(_U32)
+    ids, names, addresses = [], [], []
+    for _ in range(count):
+        ids.append(sys.intern(reader.str()))
+        names.append(sys.intern(reader.str()))
+        addresses.append(sys.intern(reader.str()))
+    searched = CandidateBatch.from_columns(
+        ids, names, addresses, reader.array("<f8", count), reader.array("<f8", count)
+    )
+
+    (count,) = reader.unpack(_U32)
+    pool = searched.take(reader.array("<u4", count))
+    for column, dtype in _POOL_COLUMNS:
+        setattr(pool, column, reader.array(dtype, count))
+
+    return TripPlan(info, origin_lat, origin_lon, radius_m, searched, pool)
+
+
+def decode_session(data: bytes) -> ChatSessionState:
+    reader = _Reader(zlib.decompress(data))
+    magic, version = reader.unpack(_HEADER)
+    if magic != _MAGIC or version not in _READABLE_VERSIONS:
+        raise ValueError(f"지원하지 않는 세션 형식입니다: {magic!r} v{version}")
+
+    (current_index,) = reader.unpack(_U32)
+    info_json = reader.str()
+    info = (
+        ParsedUserInfo.model_validate_json(info_json) if info_json is not None else None
+    )
+
+    (count,) = reader.unpack(_U32)
+    candidates = []
+    for _ in range(count):
+        place = PlaceInfo(
+            reader.str(), reader.str(), reader.str(), *reader.unpack(_COORDS)
+        )
+        *hours, present = reader.unpack(_TRIP)
+        round_trip_hours = {
+            transport: None if math.isnan(value) else value
+            for bit, (transport, value) in enumerate(zip(_TRANSPORTS, hours))
+            if present & (1 << bit)
+        }
+        code, t_max, t_min, precipitation = reader.unpack(_WEATHER)
+        weather = DailyWeather(WeatherCode(code), t_max, t_min, precipitation)
+        (score,) = reader.unpack(_U8)
+        candidates.append(
+            DestinationCandidate(place, round_trip_hours, weather, score, reader.str())
+        )
+
+    plan = None
+    if version >= 2 and reader.unpack(_U8)[0]:
+        plan = _read_plan(reader)
+
+    return ChatSessionState(
+        parsed_user_info=info,
+        candidates=candidates,
+        current_index=current_index,
+        plan=plan,
+    )
+
+
+# -----------------------------
+# 저장소
+# -----------------------------
+
+
+class SessionStore(Protocol):
+    """
+    세션 id -> ChatSessionState 저장소.
+    턴 하나(get -> 처리 -> put)는 lock(session_id) 안에서 실행한다.
+    저장소를 공유하는 모든 스레드/프로세스 사이에서 같은 세션의 턴이 겹치지 않는다.
+    """
+
+    def lock(self, session_id: str) -> ContextManager[None]: ...
+
+    def get(self, session_id: str) -> Optional[ChatSessionState]: ...
+
+    def put(self, session_id: str, state: ChatSessionState) -> None: ...
+
+    def delete(self, session_id: str) -> None: ...
+
+    def evict_expired(self) -> int: ...
+
+    def __len__(self) -> int: ...
+
+
+class _KeyedLock:
+    """
+    키마다 하나인 threading.Lock (쓰는 스레드가 없는 키의 lock은 버린다)
+    """
+
+    def __init__(self):
+        self._locks: dict[str, tuple[threading.Lock, int]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def __call__(self, key: str) -> Iterator[None]:
+        with self._lock:
+            lock, users = self._locks.get(key, (None, 0))
+            lock = lock or threading.Lock()
+            self._locks[key] = (lock, users + 1)
+        try:
+            with lock:
+                yield
+        finally:
+            with self._lock:
+                users = self._locks[key][1] - 1
+                if users:
+                    self._locks[key] = (lock, users)
+                else:
+                    del self._locks[key]
+
+
+class InMemorySessionStore:
+    """
+    프로세스 메모리에 세션을 두는 LRU 저장소.
+    - get/put 할 때마다 최근 사용으로 갱신
+    - TTL이 지난 세션은 조회 시 또는 evict_expired()에서 제거
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[float, ChatSessionState]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.lock = _KeyedLock()  # 프로세스 안에서만 공유되므로 스레드 lock으로 충분
+
+    def _expired(self, last_used: float, now: float) -> bool:
+        return now - last_used > self.ttl_seconds
+
+    def get(self, session_id: str) -> Optional[ChatSessionState]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if self._expired(entry[0], now):
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (now, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def put(self, session_id: str, state: ChatSessionState) -> None:
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), state)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_expired(self) -> int:
+        """
+        TTL이 지난 세션을 모두 제거하고 제거한 개수를 반환한다.
+        OrderedDict가 사용 순서대로 정렬되어 있으므로 앞에서부터 보면 된다.
+        """
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            while self._sessions:
+                session_id, (last_used, _) = next(iter(self._sessions.items()))
+                if not self._expired(last_used, now):
+                    break
+                del self._sessions[session_id]
+                evicted += 1
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SqliteSessionStore:
+    """
+    SQLite 파일에 직렬화한 세션을 두는 저장소.
+    - 세션은 조회할 때만 메모리에 올라오므로 쉬는 세션이 RAM을 차지하지 않는다
+    - WAL 모드라 여러 워커 프로세스가 같은 파일을 동시에 읽고 쓸 수 있다
+    - TTL 판단에는 프로세스 간에 공유되는 벽시계 시간(time.time)을 쓴다
+    - 세션 lock은 session_locks 테이블의 lease 행 (SESSION_LOCK_SECONDS).
+      턴 동안 DB 전체 쓰기 lock(BEGIN IMMEDIATE)을 쥐지 않으므로 다른 세션은 기다리지 않는다
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " id TEXT PRIMARY KEY, data BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_updated_at"
+                " ON sessions (updated_at)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_locks ("
+                " id TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드 간에 공유하지 않는다 (스레드마다 하나)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _try_lock(self, session_id: str, owner: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            # 다른 owner의 lease가 남아 있으면 갱신하지 않으므로 행이 돌아오지 않는다
+            row = conn.execute(
+                "INSERT INTO session_locks (id, owner, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE"
+                " SET owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE session_locks.expires_at < ?"
+                " RETURNING owner",
+                (session_id, owner, now + SESSION_LOCK_SECONDS, now),
+            ).fetchone()
+        return row is not None
+
+    @contextmanager
+    def lock(self, session_id: str) -> Iterator[None]:
+        owner = uuid.uuid4().hex
+        while not self._try_lock(session_id, owner):
+            time.sleep(SESSION_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            with self._connect() as conn:
+                conn.execute(
+                    "DELETE FROM session_locks WHERE id = ? AND owner = ?",
+                    (session_id, owner),
+                )
+
+    def get(self, session_id: str) -> Optional[ChatSessionState]:
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "UPDATE sessions SET updated_at = ? WHERE id = ? AND updated_at >= ?"
+                " RETURNING data",
+                (now, session_id, now - self.ttl_seconds),
+            ).fetchone()
+        return decode_session(row[0]) if row else None
+
+    def put(self, session_id: str, state: ChatSessionState) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO sessions (id, data, updated_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (id) DO UPDATE"
+                " SET data = excluded.data, updated_at = excluded.updated_at",
+                (session_id, encode_session(state), time.time()),
+            )
+
+    def delete(self, session_id: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def evict_expired(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            conn.execute("DELETE FROM session_locks WHERE expires_at < ?", (now,))
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        cursor = self._connect().execute(
+            "SELECT COUNT(*) FROM sessions WHERE updated_at >= ?",
+            (time.time() - self.ttl_seconds,),
+        )
+        return cursor.fetchone()[0]
+
+
+class FileSessionStore:
+    """
+    세션마다 파일 하나(<root>/<session_id>.bin)를 두는 저장소.
+    - 임시 파일에 쓴 뒤 os.replace로 교체하므로 읽는 쪽은 항상 완전한 파일을 본다
+    - 마지막 사용 시각은 파일 mtime (조회 시 갱신)
+    - 공유 디렉터리(NFS 등)를 쓰면 여러 서버가 세션을 공유할 수 있다
+    - 세션 lock은 <root>/<session_id>.lock 파일의 flock
+      (fcntl이 없으면(Windows) 프로세스 안에서만 보호하므로 워커를 하나만 둔다)
+    """
+
+    SUFFIX = ".bin"
+    LOCK_SUFFIX = ".lock"
+
+    def __init__(self, root: str, ttl_seconds: float = SESSION_TTL_SECONDS):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+        self._local_lock = _KeyedLock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, session_id: str, suffix: str = SUFFIX) -> str:
+        check_session_id(session_id)
+        return os.path.join(self.root, session_id + suffix)
+
+    @contextmanager
+    def lock(self, session_id: str) -> Iterator[None]:
+        path = self._path(session_id, self.LOCK_SUFFIX)
+        with self._local_lock(session_id):
+            if fcntl is None:
+                yield
+                return
+            while True:
+                f = open(path, "a")
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # 기다리는 동안 evict_expired가 lock 파일을 지웠으면 새 파일로 다시 잡는다
+                try:
+                    if os.stat(path).st_ino == os.fstat(f.fileno()).st_ino:
+                        break
+                except FileNotFoundError:
+                    pass
+                f.close()
+            try:
+                yield
+            finally:
+                f.close()
+
+    def get(self, session_id: str) -> Optional[ChatSessionState]:
+        path = self._path(session_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return decode_session(data)
+
+    def put(self, session_id: str, state: ChatSessionState) -> None:
+        path = self._path(session_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encode_session(state))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def delete(self, session_id: str) -> None:
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self) -> list[os.DirEntry]:
+        with os.scandir(self.root) as it:
+            return [e for e in it if e.name.endswith(self.SUFFIX)]
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl_seconds
+        evicted = 0
+        for entry in self._entries():
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    evicted += 1
+            except FileNotFoundError:
+                pass  # 다른 프로세스가 먼저 지움
+        self._remove_stale_locks()
+        return evicted
+
+    def _remove_stale_locks(self) -> None:
+        """
+        세션 파일이 없고 아무도 쥐고 있지 않은 lock 파일을 지운다
+        """
+        if fcntl is None:
+            return
+        with os.scandir(self.root) as it:
+            locks = [e for e in it if e.name.endswith(self.LOCK_SUFFIX)]
+        for entry in locks:
+            session_path = entry.path[: -len(self.LOCK_SUFFIX)] + self.SUFFIX
+            if os.path.exists(session_path):
+                continue
+            try:
+                with open(entry.path, "a") as f:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.remove(entry.path)
+            except (BlockingIOError, FileNotFoundError):
+                pass  # 턴이 쥐고 있거나 다른 프로세스가 먼저 지움
+
+    def __len__(self) -> int:
+        """
+        TTL 안에 쓴 세션 수 (SqliteSessionStore와 같이 만료된 파일은 세지 않는다)
+        """
+        cutoff = time.time() - self.ttl_seconds
+        count = 0
+        for entry in self._entries():
+            try:
+                count += entry.stat().st_mtime >= cutoff
+            except FileNotFoundError:
+                pass  # 다른 프로세스가 지움
+        return count
+
+
+def create_session_store(spec: str = SESSION_STORE) -> SessionStore:
+    """
+    "memory" | "sqlite:<db 경로>" | "file:<디렉터리>" 문자열로 저장소를 만든다.
+    """
+    kind, _, location = spec.partition(":")
+    if kind == "memory":
+        return InMemorySessionStore()
+    if kind == "sqlite":
+        return SqliteSessionStore(location or "sessions.db")
+    if kind == "file":
+        return FileSessionStore(location or "sessions")
+    raise ValueError(f"알 수 없는 SESSION_STORE입니다: {spec!r}")
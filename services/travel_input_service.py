@@ -1,119 +1,943 @@
-from typing import List
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import numpy as np
+from openai import APITimeoutError
 
 from apis.kakao_local_address import get_coords
-from apis.kakao_local_candidates import (
-    get_travel_candidates,
-)
+from apis.kakao_local_candidates import CandidateStream
 from apis.openai_filter import filter_candidates_by_user_preferences
 from apis.openai_info_parser import parse_user_info
 from apis.openai_recommender import recommend_top_k_candidates
 from apis.route import get_round_trip_hours
-from apis.weather import get_weather_new
+from apis.weather import get_weather_batch
+from domain.batch import CandidateBatch
 from domain.enums import Transportation
-from domain.models import (
-    ChatSessionState,
-    DestinationCandidate,
-    PlaceInfo,
+from domain.models import ChatSessionState, DestinationCandidate, ParsedUserInfo
+from domain.plan import TripPlan, changed_fields, transports_for
+from services.call_scheduler import (
+    OUTPUT_RESERVE,
+    ROUTE_HOSTS,
+    WEATHER_HOST,
+    current_budget,
+    enrichment_order,
+    route_calls,
 )
-from utils.distance_helper import max_travel_hours_to_radius_m
-from utils.weather_helper import calculate_outdoor_score
+from services.isochrone_service import Isochrone, get_isochrone
+from services.result_cache import get_result, put_result
+from services.warmup_service import record_trip
+from utils.deadline import Deadline
+from utils.distance_helper import max_travel_hours_to_radius_m, to_local_km
+from utils.metrics import (
+    ENRICH_AVOIDED_CALLS,
+    ROUTE_CLUSTER_ERROR,
+    ROUTE_CLUSTER_SAVED,
+    SPECULATIVE_ROWS,
+    STAGE_CANDIDATES,
+    STAGE_SECONDS,
+)
+from utils.tracing import Span, bind_context, current_span, span
+from utils.weather_helper import calculate_outdoor_scores
+
+# deadline 분배: 뒤 단계가 쓸 시간을 앞 단계에서 미리 남겨둔다.
+OUTPUT_RESERVE_SECONDS = 1.0  # 최종 출력(Google Places 조회)
+RANKING_RESERVE_SECONDS = 2.0 + OUTPUT_RESERVE_SECONDS  # 7단계 LLM top-k 선정
+
+# 조건이 바뀌었을 때 다시 계산할 단계를 정하는 필드 (domain.plan.changed_fields)
+SEARCH_FIELDS = {"destination_categories", "keyword"}  # 4단계부터 다시
+FILTER_FIELDS = {"dislikes", "must_avoid"}  # 5단계부터 다시
+
+# 6단계: 유망한 후보부터 ENRICH_WAVE_SIZE개씩 동시에 경로/날씨를 조회하고,
+# 조건을 통과한 후보가 k + ENRICH_SAFETY_MARGIN개가 되면 조회를 멈춘다.
+# (조회하지 않은 후보는 풀에 남아 다음 페이지에서 조회한다)
+ENRICH_WAVE_SIZE = int(os.getenv("ENRICH_WAVE_SIZE", "5"))
+ENRICH_SAFETY_MARGIN = int(os.getenv("ENRICH_SAFETY_MARGIN", "5"))
+
+# 5단계 LLM 필터링이 도는 동안 미리 경로/날씨를 조회할 (가장 가까운) 후보 수.
+# 필터링에서 빠진 후보의 조회는 버려지므로 업스트림 쿼터를 써서 지연을 줄이는 옵션 (0이면 끔)
+SPECULATIVE_ENRICH_WIDTH = int(os.getenv("SPECULATIVE_ENRICH_WIDTH", "0"))
+# 미리 조회에 쓰는 스레드 수 (모든 턴이 나눠 쓴다)
+SPECULATIVE_ENRICH_WORKERS = int(os.getenv("SPECULATIVE_ENRICH_WORKERS", "8"))
+
+# 6-1. ROUTE_CLUSTER_RADIUS_M 안에 모인 후보(공원과 그 안의 박물관 등)는 대표 하나만 경로를
+# 조회하고 나머지는 대표의 이동 시간에 출발지까지 거리 차이만큼 보정해서 쓴다 (0이면 끔).
+# ROUTE_CLUSTER_VALIDATE_RATE 비율의 멤버는 실제로도 조회해 추정 오차를 지표로 남긴다
+# (route_cluster_error_minutes로 반경을 조정).
+ROUTE_CLUSTER_RADIUS_M = float(os.getenv("ROUTE_CLUSTER_RADIUS_M", "300"))
+ROUTE_CLUSTER_VALIDATE_RATE = float(os.getenv("ROUTE_CLUSTER_VALIDATE_RATE", "0.05"))
+MIN_LOCAL_SPEED_KMH = 4.0  # 보정에 쓰는 최저 속도 (도보)
+
+_speculator = ThreadPoolExecutor(
+    max_workers=SPECULATIVE_ENRICH_WORKERS, thread_name_prefix="speculate"
+)
+
+
+@contextmanager
+def _stage(name: str) -> Iterator[Span]:
+    """
+    파이프라인 단계: span + 단계별 소요 시간 지표.
+    span에 count를 남기면 단계 이후 후보 수 지표도 함께 기록한다.
+    """
+    with STAGE_SECONDS.time(stage=name), span(name) as s:
+        yield s
+    if "count" in s.attributes:
+        STAGE_CANDIDATES.observe(s.attributes["count"], stage=name)
 
 
 def generate_travel_candidates(
-    user_input: str, k: int, state: ChatSessionState
+    user_input: str,
+    k: int,
+    state: ChatSessionState,
+    deadline: Optional[Deadline] = None,
 ) -> List[DestinationCandidate]:
-    # 1. 유저의 input으로부터 여행 정보 파싱
-    parsed_user_info = parse_user_info(user_input)
+    """
+    여행 조건 -> top k 후보.
+    이전 추천의 중간 결과(state.plan)가 있으면 유저 입력을 이전 조건의 변경으로 해석하고,
+    바뀐 조건이 입력인 단계만 다시 계산한다.
+    - 출발지 변경: 처음부터 다시
+    - 카테고리/키워드 변경: 4단계(검색)부터 (이미 조회한 경로/날씨는 id로 재사용)
+    - 여행 시간 증가: 늘어난 바깥 고리만 검색/필터링, 이후 새 후보만 경로/날씨 조회
+    - 여행 시간 감소: 기존 후보 중 반경 안쪽만 남김 (업스트림 호출 없음)
+    - 비선호 조건 변경: 5단계(필터링)부터
+    - 교통수단 변경: 아직 조회하지 않은 교통수단의 경로만 조회
+    - 출발 일시 변경: 자동차 경로(출발 시각 반영) 다시 조회, 날짜가 바뀌면 날씨도 다시 조회
+    - 선호(likes/must_include) 변경: 7단계(top k 선정)만
+    """
+    # 단계별 deadline (deadline이 없으면 제한 없음)
+    search_deadline = deadline.reserve(RANKING_RESERVE_SECONDS) if deadline else None
+    ranking_deadline = deadline.reserve(OUTPUT_RESERVE_SECONDS) if deadline else None
+
+    # 1. 유저의 input으로부터 여행 정보 파싱 (이전 조건이 있으면 그 조건의 변경으로)
+    with _stage("1.parse_user_info"):
+        try:
+            parsed_user_info = parse_user_info(
+                user_input, search_deadline, state.parsed_user_info
+            )
+        except APITimeoutError:
+            print("1. Parsing user input timed out")
+            state.candidates = []
+            state.current_index = 0
+            return []
     print("1. Parsed user input:", parsed_user_info)
 
+    plan = state.plan
+    changed = changed_fields(plan.info, parsed_user_info) if plan else set()
+    if plan is not None and "origin" in changed:
+        plan = None
+    if plan is not None:
+        print(f"1. Re-planning, changed conditions: {sorted(changed) or 'none'}")
+
     # 2. 출발지 주소 -> 좌표 변환
-    origin_lat, origin_lon = get_coords(parsed_user_info.origin)
+    with _stage("2.geocode_origin") as s:
+        if plan is not None:
+            origin_lat, origin_lon = plan.origin_lat, plan.origin_lon
+            s.set(reused=True)
+        else:
+            origin_lat, origin_lon = get_coords(
+                parsed_user_info.origin, search_deadline
+            )
     print(f"2. Origin coords: lat={origin_lat}, lon={origin_lon}")
+    if origin_lat is None or origin_lon is None:
+        state.candidates = []
+        state.current_index = 0
+        return []
 
-    # 3. 이동 가능 거리 나이브하게 계산
-    radius_m = max_travel_hours_to_radius_m(
-        parsed_user_info.max_travel_hours, parsed_user_info.transportation
-    )
-    print(f"3. Calculated radius (km): {radius_m / 1000}")
+    record_trip(parsed_user_info)
 
-    # 4. 반경 내 여행지 후보지 검색
-    candidates: List[PlaceInfo] = get_travel_candidates(
-        origin_lat, origin_lon, radius_m, parsed_user_info.destination_categories
-    )
-    print(f"4. {len(candidates)} candidates after distance-based retrieval")
+    # 같은 조건(동네, 카테고리, 여행 시간 구간, 출발 날짜/시간대, 선호)의 최근 결과에
+    # 한도 안의 후보가 k개 이상 있으면 3~7단계를 건너뛴다
+    cached = get_result(parsed_user_info, origin_lat, origin_lon, k)
+    if current_span() is not None:
+        current_span().set(result_cache="miss" if cached is None else "hit")
+    if cached is not None:
+        print(f"3-7. Reusing cached result: {len(cached.candidates)} candidates")
+        state.parsed_user_info = parsed_user_info
+        state.plan = cached.plan
+        state.candidates = cached.candidates
+        state.current_index = 0
+        return cached.candidates
 
-    # 5. 유저의 비선호 조건에 따른 필터링
-    filtered_by_preference_candidates: List[PlaceInfo] = (
-        filter_candidates_by_user_preferences(candidates, parsed_user_info, k)
-    )
+    # 3. 이동 가능 영역: 캐시된 isochrone이 있으면 그 다각형을 덮는 반경,
+    # 없으면(백그라운드에서 만드는 중) 나이브하게 계산한 원형 반경
+    with _stage("3.radius") as s:
+        isochrone = get_isochrone(
+            origin_lat,
+            origin_lon,
+            parsed_user_info.transportation,
+            parsed_user_info.departure_datetime,
+            parsed_user_info.max_travel_hours * 0.5,
+        )
+        if isochrone is not None:
+            radius_m = isochrone.radius_m
+        else:
+            radius_m = max_travel_hours_to_radius_m(
+                parsed_user_info.max_travel_hours, parsed_user_info.transportation
+            )
+        s.set(isochrone=isochrone is not None)
     print(
-        f"5. {len(filtered_by_preference_candidates)} candidates after filtering by preferences"
+        f"3. Calculated radius (km): {radius_m / 1000}"
+        + (" (isochrone)" if isochrone is not None else "")
     )
 
-    # 6. 여행 시간 내에 다녀올 수 있는 후보지 선별 및 날씨 정보 추가
-    enriched_candidates: List[DestinationCandidate] = []
-
-    for candidate in filtered_by_preference_candidates:
-        # 6-1. 왕복 여행 시간 계산
-        round_trip_hours_dict = get_round_trip_hours(
-            transportation=parsed_user_info.transportation,
-            departure_datetime=parsed_user_info.departure_datetime,
-            origin_lat=origin_lat,
-            origin_lon=origin_lon,
-            dest_lat=candidate.dest_lat,
-            dest_lon=candidate.dest_lon,
-        )
+    target = k + ENRICH_SAFETY_MARGIN
+    if plan is not None and "departure_datetime" in changed:
+        # 자동차 경로는 출발 시각을 반영하고, 날씨는 출발 날짜 기준
+        plan.pool.reset_routes(Transportation.CAR)
+        if _date(plan.info) != _date(parsed_user_info):
+            plan.pool.reset_weather()
 
-        # 6-2. 충분하게 여행을 다녀올 수 없는 후보지는 제외
-        car_time = round_trip_hours_dict.get(Transportation.CAR)
-        public_time = round_trip_hours_dict.get(Transportation.PUBLIC)
+    # 4~6. 검색 -> 필터링 -> 경로/날씨 조회
+    # base: 이전 계획에서 다시 쓰는 검색 결과, kept: 그중 필터링을 통과한 후보.
+    # 새로 검색하는 후보(stream)는 카카오 페이지가 도착하는 대로 필터링/조회해서
+    # 첫 페이지의 경로/날씨 조회가 나머지 페이지, 고리 센터 검색과 겹치도록 한다.
+    full_search = plan is None or bool(changed & SEARCH_FIELDS)
+    started = time.perf_counter()
+    with _stage("4.search_candidates") as s:
+        if full_search:
+            base = CandidateBatch.empty()
+        else:
+            distances_m = plan.searched.distances_km(origin_lat, origin_lon) * 1000
+            base = plan.searched.take(distances_m <= radius_m)
+
+        stream = None
+        if full_search or radius_m > plan.radius_m:
+            stream = CandidateStream(
+                origin_lat,
+                origin_lon,
+                radius_m,
+                parsed_user_info.destination_categories,
+                keyword=parsed_user_info.keyword,
+                deadline=search_deadline,
+                inner_radius_m=0.0 if full_search else plan.radius_m,
+                exclude_ids=base.ids,
+                keep_center=isochrone.intersects_circle if isochrone else None,
+            )
 
-        if car_time is None:
-            shortest_time = public_time
-        elif public_time is None:
-            shortest_time = car_time
+        # 도달 가능 영역 밖의 후보는 필터링/조회하지 않는다 (검색 결과에는 남긴다)
+        reachable = _reachable(base, isochrone)
+
+        # 5. 유저의 비선호 조건에 따른 필터링 (이전 계획에서 다시 쓰는 부분)
+        if full_search:
+            kept = CandidateBatch.empty()
+        elif changed & FILTER_FIELDS:
+            kept = _filter_preferences(
+                reachable,
+                parsed_user_info,
+                k,
+                plan,
+                origin_lat,
+                origin_lon,
+                search_deadline,
+                speculate=True,
+            )
         else:
-            shortest_time = min(car_time, public_time)
+            kept = plan.pool.take(plan.pool.id_mask(reachable.ids))
 
-        # 필터링
-        if shortest_time > parsed_user_info.max_travel_hours * 0.5:
-            continue
+        # 6. 여행 시간 내에 다녀올 수 있는 후보지 선별 및 날씨 정보 추가
+        with _stage("6.enrich"):
+            feasible = _enrich_rows(
+                kept, parsed_user_info, origin_lat, origin_lon, search_deadline, target
+            )
 
-        # 6-3. 날씨 정보 가져오기
-        daily_weather = get_weather_new(
-            candidate.dest_lat,
-            candidate.dest_lon,
-            parsed_user_info.departure_datetime,
-        )
+        # 조건을 통과한 후보가 target개 모이기 전까지는 도착한 페이지마다 필터링/조회하고,
+        # 모인 뒤에 도착한 페이지는 모아서 한 번에 필터링한다 (LLM 호출 수 제한)
+        fetched, filtered, rest = [], [], []
+        for chunk in stream or ():
+            fetched.append(chunk)
+            chunk = _reachable(chunk, isochrone)
+            if feasible >= target:
+                rest.append(chunk)
+            else:
+                chunk = _filter_preferences(
+                    chunk,
+                    parsed_user_info,
+                    k,
+                    plan,
+                    origin_lat,
+                    origin_lon,
+                    search_deadline,
+                    speculate=True,
+                )
+                filtered.append(chunk)
+                with _stage("6.enrich"):
+                    was_feasible = feasible
+                    feasible += _enrich_rows(
+                        chunk,
+                        parsed_user_info,
+                        origin_lat,
+                        origin_lon,
+                        search_deadline,
+                        target - feasible,
+                    )
+                if not was_feasible and feasible:
+                    s.set(first_enriched_s=round(time.perf_counter() - started, 3))
+
+            if search_deadline is not None and search_deadline.expired():
+                print("4. Deadline reached, stopping candidate search")
+                stream.close()
+                break
 
-        # 6-4. 실외 활동 적합도 점수 계산
-        outdoor_score = calculate_outdoor_score(daily_weather)
+        if rest:
+            chunk = _filter_preferences(
+                CandidateBatch.concat(rest),
+                parsed_user_info,
+                k,
+                plan,
+                origin_lat,
+                origin_lon,
+                search_deadline,
+            )
+            filtered.append(chunk)
+            with _stage("6.enrich"):
+                # 조회는 하지 않는다 (다음 페이지에서 조회, 건너뛴 호출 수만 기록)
+                _enrich_rows(
+                    chunk, parsed_user_info, origin_lat, origin_lon, search_deadline, 0
+                )
 
-        destination_candidate = DestinationCandidate(
-            place_info=candidate,
-            round_trip_hours=round_trip_hours_dict,
-            daily_weather=daily_weather,
-            outdoor_score=outdoor_score,
+        searched = _by_distance(
+            CandidateBatch.concat([base, *fetched]), origin_lat, origin_lon
         )
-        enriched_candidates.append(destination_candidate)
+        pool = _by_distance(
+            CandidateBatch.concat([kept, *filtered]), origin_lat, origin_lon
+        )
+        s.set(
+            count=len(searched),
+            fetched=sum(len(c) for c in fetched),
+            unreachable=int((~_reachable_mask(searched, isochrone)).sum()),
+        )
+
+    print(
+        f"4. {len(searched)} candidates after distance-based retrieval"
+        f" ({s.attributes['unreachable']} outside the reachable area)"
+    )
+    print(f"5. {len(pool)} candidates after filtering by preferences")
+    if "first_enriched_s" in s.attributes:
+        print(f"6. First enriched candidate after {s.attributes['first_enriched_s']}s")
 
+    enriched_candidates = _enriched_candidates(pool, parsed_user_info)
+    STAGE_CANDIDATES.observe(len(pool), stage="5.filter_preferences")
+    STAGE_CANDIDATES.observe(len(enriched_candidates), stage="6.enrich")
     print(
         f"6. {len(enriched_candidates)} enriched candidates after adding travel time and weather info"
     )
 
+    # deadline에 걸려 잘린 결과는 결과 캐시에 넣지 않는다
+    complete = search_deadline is None or not search_deadline.expired()
+
     # 7. top k 후보지 선정
-    top_k_candidates = recommend_top_k_candidates(
-        enriched_candidates,
-        parsed_user_info.must_include or [],
-        parsed_user_info.likes or [],
-        k,
-    )
+    with _stage("7.rank_top_k") as s:
+        top_k_candidates = recommend_top_k_candidates(
+            enriched_candidates,
+            parsed_user_info.must_include or [],
+            parsed_user_info.likes or [],
+            k,
+            ranking_deadline,
+        )
+        s.set(count=len(top_k_candidates))
 
     print(f"7. {len(top_k_candidates)} candidates after recommending top k")
 
-    # 8. 세션 상태에 후보지 저장
-    state.parsed_user_ifo = parsed_user_info
+    # 8. 세션 상태에 후보지와 중간 결과 저장
+    state.parsed_user_info = parsed_user_info
+    state.plan = TripPlan(
+        info=parsed_user_info,
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        radius_m=radius_m,
+        searched=searched,
+        pool=pool,
+    )
     state.candidates = top_k_candidates
     state.current_index = 0
+    if complete and not (ranking_deadline and ranking_deadline.expired()):
+        put_result(state.plan, top_k_candidates)
 
     return top_k_candidates
+
+
+def generate_more_candidates(
+    k: int,
+    state: ChatSessionState,
+    deadline: Optional[Deadline] = None,
+) -> List[DestinationCandidate]:
+    """
+    준비한 후보를 모두 보여줬을 때 다음 페이지(k개)를 골라 state.candidates 뒤에 붙인다.
+    파이프라인을 다시 돌리지 않고 state.plan의 후보 풀에서 아직 보여주지 않은 후보만
+    순위를 매기고 추천 이유를 붙인다. 이미 조회한 경로/날씨는 재사용하고,
+    deadline으로 조회하지 못했던 후보만 이때 조회한다.
+    """
+    plan = state.plan
+    if plan is None:
+        return []
+
+    enrich_deadline = deadline.reserve(RANKING_RESERVE_SECONDS) if deadline else None
+    ranking_deadline = deadline.reserve(OUTPUT_RESERVE_SECONDS) if deadline else None
+
+    shown = plan.pool.id_mask(c.place_info.id for c in state.candidates)
+    remaining = plan.pool.take(~shown)
+
+    with _stage("6.enrich") as s:
+        enriched_candidates = _enrich_candidates(
+            remaining,
+            plan.info,
+            plan.origin_lat,
+            plan.origin_lon,
+            enrich_deadline,
+            target=k + ENRICH_SAFETY_MARGIN,
+        )
+        plan.pool.carry_over(remaining)  # 새로 조회한 경로/날씨를 풀에 반영
+        s.set(count=len(enriched_candidates), page=True)
+
+    with _stage("7.rank_top_k") as s:
+        page = recommend_top_k_candidates(
+            enriched_candidates,
+            plan.info.must_include or [],
+            plan.info.likes or [],
+            k,
+            ranking_deadline,
+        )
+        if not page and enriched_candidates:
+            # LLM이 고른 후보가 없으면 실외 활동 점수 순으로 (페이지가 비지 않도록)
+            page = sorted(
+                enriched_candidates, key=lambda c: c.outdoor_score, reverse=True
+            )[:k]
+        s.set(count=len(page), page=True)
+
+    print(
+        f"7. Next page: {len(page)} of {len(enriched_candidates)} remaining candidates"
+    )
+    state.candidates.extend(page)
+    return page
+
+
+def _date(info: ParsedUserInfo) -> str:
+    return info.departure_datetime.split("T", 1)[0]
+
+
+def _filter_preferences(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    k: int,
+    plan: Optional[TripPlan],
+    origin_lat: float,
+    origin_lon: float,
+    deadline: Optional[Deadline] = None,
+    speculate: bool = False,
+) -> CandidateBatch:
+    """
+    5단계: 비선호 조건에 따른 필터링. 이전 계획에 같은 후보가 있으면 경로/날씨를 가져온다.
+    speculate이면 LLM 필터링과 동시에 가까운 후보의 경로/날씨를 미리 조회하고(_speculate),
+    필터링에서 빠진 후보의 조회 결과는 버린다.
+    """
+    with _stage("5.filter_preferences") as s:
+        if plan is not None:
+            candidates.carry_over(plan.pool)
+        rows, futures = (
+            _speculate(candidates, parsed_user_info, origin_lat, origin_lon, deadline)
+            if speculate and SPECULATIVE_ENRICH_WIDTH > 0
+            else (np.empty(0, dtype=np.intp), [])
+        )
+
+        try:
+            filtered = filter_candidates_by_user_preferences(
+                candidates, parsed_user_info, k, deadline
+            )
+        except BaseException:
+            # 시작하지 않은 조회는 취소하고, 도는 조회가 candidates를 다 쓸 때까지 기다린다
+            for future in futures:
+                future.cancel()
+            wait(futures)
+            raise
+
+        if futures:
+            wait(futures)
+            filtered.carry_over(candidates)
+            used = int(filtered.id_mask(candidates.ids[i] for i in rows).sum())
+            SPECULATIVE_ROWS.inc(used, outcome="used")
+            SPECULATIVE_ROWS.inc(len(rows) - used, outcome="discarded")
+            s.set(speculated=len(rows), speculative_discarded=len(rows) - used)
+            print(f"5. Speculatively enriched {len(rows)} candidates, {used} kept")
+        s.set(filtered=len(filtered))
+    return filtered
+
+
+def _reachable_mask(
+    candidates: CandidateBatch, isochrone: Optional[Isochrone]
+) -> np.ndarray:
+    if isochrone is None:
+        return np.ones(len(candidates), dtype=bool)
+    return isochrone.contains(candidates.lat, candidates.lon)
+
+
+def _reachable(
+    candidates: CandidateBatch, isochrone: Optional[Isochrone]
+) -> CandidateBatch:
+    """
+    도달 가능 영역(isochrone) 안의 후보만 (isochrone이 없으면 그대로)
+    """
+    if isochrone is None:
+        return candidates
+    return candidates.take(_reachable_mask(candidates, isochrone))
+
+
+def _by_distance(
+    candidates: CandidateBatch, origin_lat: float, origin_lon: float
+) -> CandidateBatch:
+    """
+    가까운 후보부터 정렬한다 (다음 페이지/재계획에서 가까운 곳부터 쓰도록).
+    """
+    distances_km = candidates.distances_km(origin_lat, origin_lon)
+    return candidates.take(np.argsort(distances_km, kind="stable"))
+
+
+def _route_one(
+    candidates: CandidateBatch,
+    idx: int,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    transports: tuple[Transportation, ...],
+    deadline: Optional[Deadline] = None,
+) -> bool:
+    """
+    6-1. 후보 하나의 왕복 여행 시간 계산 (아직 조회하지 않은 교통수단만).
+    경로를 조회했는지를 돌려준다.
+    """
+    missing = [t for t in transports if not candidates.routed(t)[idx]]
+    if not missing:
+        return False
+    round_trip_hours_dict = get_round_trip_hours(
+        transportation=missing[0] if len(missing) == 1 else None,
+        departure_datetime=parsed_user_info.departure_datetime,
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        dest_lat=float(candidates.lat[idx]),
+        dest_lon=float(candidates.lon[idx]),
+        deadline=deadline,
+    )
+    candidates.set_round_trip_hours(idx, round_trip_hours_dict, missing)
+    return True
+
+
+def _route_clusters(
+    candidates: CandidateBatch,
+    order: np.ndarray,
+    transports: tuple[Transportation, ...],
+) -> np.ndarray:
+    """
+    6-1. 경로 조회를 나눠 쓸 클러스터 (leader clustering).
+    조회 순서대로 훑으면서 ROUTE_CLUSTER_RADIUS_M 안에 대표가 있으면 그 클러스터에 넣고,
+    없으면 새 대표가 된다. 이미 경로가 있는 후보를 먼저 대표로 삼는다 (호출 없이 공유).
+    leaders[i]: i가 속한 클러스터 대표의 행 번호 (대표는 자기 자신).
+    """
+    leaders = np.arange(len(candidates))
+    if ROUTE_CLUSTER_RADIUS_M <= 0 or len(candidates) < 2:
+        return leaders
+
+    routed = np.ones(len(candidates), dtype=bool)
+    for transport in transports:
+        routed &= candidates.routed(transport)
+    order = np.concatenate([order[routed[order]], order[~routed[order]]])
+
+    x, y = to_local_km(
+        candidates.lat,
+        candidates.lon,
+        float(candidates.lat.mean()),
+        float(candidates.lon.mean()),
+    )
+    radius_km = ROUTE_CLUSTER_RADIUS_M / 1000.0
+    heads = np.empty(len(candidates), dtype=np.intp)
+    count = 0
+    for idx in order:
+        if count:
+            d = np.hypot(x[heads[:count]] - x[idx], y[heads[:count]] - y[idx])
+            nearest = int(np.argmin(d))
+            if d[nearest] <= radius_km:
+                leaders[idx] = heads[nearest]
+                continue
+        heads[count] = idx
+        count += 1
+    return leaders
+
+
+def _derive_route(
+    candidates: CandidateBatch,
+    idx: int,
+    leader: int,
+    distances_km: np.ndarray,
+    transports: tuple[Transportation, ...],
+) -> bool:
+    """
+    6-1. 클러스터 대표의 왕복 시간으로 멤버의 왕복 시간을 추정한다.
+    대표 경로의 평균 속도(최저 MIN_LOCAL_SPEED_KMH)로 출발지까지 직선거리 차이를
+    왕복 시간에 더한다. 대표 경로를 못 구한 교통수단은 추정하지 않고 조회하지 않은
+    상태로 둔다 (멤버가 직접 조회한다). 추정했는지를 돌려준다.
+    """
+    hours: dict[Transportation, Optional[float]] = {}
+    delta_km = float(distances_km[idx] - distances_km[leader])
+    for transport in transports:
+        leader_hours = float(candidates.hours(transport)[leader])
+        if candidates.routed(transport)[idx] or np.isnan(leader_hours):
+            continue
+        speed_kmh = MIN_LOCAL_SPEED_KMH
+        if leader_hours > 0:
+            speed_kmh = max(speed_kmh, 2 * float(distances_km[leader]) / leader_hours)
+        hours[transport] = max(0.0, leader_hours + 2 * delta_km / speed_kmh)
+    if not hours:
+        return False
+    candidates.set_round_trip_hours(idx, hours, list(hours))
+    return True
+
+
+def _promote_leaders(
+    candidates: CandidateBatch,
+    leaders: np.ndarray,
+    members: List[int],
+    transports: tuple[Transportation, ...],
+) -> None:
+    """
+    6-1. 대표 경로를 못 구해 직접 조회한 멤버 중 경로를 구한 첫 멤버를 그 클러스터의
+    새 대표로 삼는다 (남은 멤버는 새 대표의 경로로 추정한다).
+    """
+
+    def has_routes(row: int) -> bool:
+        return all(not np.isnan(candidates.hours(t)[row]) for t in transports)
+
+    for idx in members:
+        leader = int(leaders[idx])
+        if leader == idx or has_routes(leader) or not has_routes(idx):
+            continue
+        leaders[leaders == leader] = idx
+        leaders[leader] = leader
+
+
+def _validate_route(
+    candidates: CandidateBatch,
+    idx: int,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    transports: tuple[Transportation, ...],
+    deadline: Optional[Deadline] = None,
+) -> None:
+    """
+    추정한 멤버의 경로를 실제로 조회해 오차(분)를 기록하고 실제 값으로 바꾼다.
+    """
+    estimated = candidates.round_trip_hours(idx, transports)
+    actual = get_round_trip_hours(
+        transportation=transports[0] if len(transports) == 1 else None,
+        departure_datetime=parsed_user_info.departure_datetime,
+        origin_lat=origin_lat,
+        origin_lon=origin_lon,
+        dest_lat=float(candidates.lat[idx]),
+        dest_lon=float(candidates.lon[idx]),
+        deadline=deadline,
+    )
+    for transport in transports:
+        if estimated.get(transport) is None or actual.get(transport) is None:
+            continue
+        error_minutes = abs(estimated[transport] - actual[transport]) * 60
+        ROUTE_CLUSTER_ERROR.observe(error_minutes, transport=transport.value)
+    candidates.set_round_trip_hours(idx, actual, transports)
+
+
+def _fetch_weather(
+    candidates: CandidateBatch,
+    rows: np.ndarray,
+    parsed_user_info: ParsedUserInfo,
+    deadline: Optional[Deadline] = None,
+) -> int:
+    """
+    6-3. 날씨가 없는 행들의 날씨를 한 번의 호출로 가져온다. 조회한 행 수를 돌려준다.
+    """
+    rows = rows[~candidates.has_weather()[rows]]
+    if not len(rows):
+        return 0
+    forecasts = get_weather_batch(
+        [(float(candidates.lat[i]), float(candidates.lon[i])) for i in rows],
+        parsed_user_info.departure_datetime,
+        deadline,
+    )
+    for idx, daily_weather in zip(rows, forecasts):
+        if daily_weather is not None:
+            candidates.set_weather(int(idx), daily_weather)
+    return len(rows)
+
+
+def _speculate(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    deadline: Optional[Deadline] = None,
+) -> tuple[np.ndarray, List[Future]]:
+    """
+    5단계 필터링(LLM)이 도는 동안 가장 가까운 SPECULATIVE_ENRICH_WIDTH개 후보의
+    경로/날씨를 미리 조회하기 시작한다. (조회할 행, 작업 목록)을 돌려준다.
+    날씨는 이동 시간 조건을 확인하기 전에 한 번의 호출로 같이 가져온다.
+    """
+    transports = transports_for(parsed_user_info.transportation)
+    needs_calls = ~candidates.has_weather()
+    for transport in transports:
+        needs_calls |= ~candidates.routed(transport)
+    rows = np.flatnonzero(needs_calls)
+    distances_km = candidates.distances_km(origin_lat, origin_lon)[rows]
+    rows = rows[np.argsort(distances_km, kind="stable")][:SPECULATIVE_ENRICH_WIDTH]
+    if not len(rows):
+        return rows, []
+
+    # 날씨는 호출 한 번이므로 경로 조회 뒤에 밀리지 않게 먼저 넣는다
+    futures = [
+        _speculator.submit(
+            bind_context(_fetch_weather), candidates, rows, parsed_user_info, deadline
+        )
+    ]
+    futures += [
+        _speculator.submit(
+            bind_context(_route_one),
+            candidates,
+            int(idx),
+            parsed_user_info,
+            origin_lat,
+            origin_lon,
+            transports,
+            deadline,
+        )
+        for idx in rows
+    ]
+    return rows, futures
+
+
+def _enrich_candidates(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    deadline: Optional[Deadline] = None,
+    target: Optional[int] = None,
+) -> List[DestinationCandidate]:
+    """
+    6단계: 왕복 이동 시간으로 후보를 거르고, 남은 후보에 날씨/실외 점수를 붙인다.
+    """
+    _enrich_rows(candidates, parsed_user_info, origin_lat, origin_lon, deadline, target)
+    return _enriched_candidates(candidates, parsed_user_info)
+
+
+def _feasible(
+    candidates: CandidateBatch, parsed_user_info: ParsedUserInfo
+) -> np.ndarray:
+    """
+    이동 시간/날씨 조건을 통과한 행 (이동 시간을 못 구했으면 NaN이라 제외)
+    """
+    max_round_trip_hours = parsed_user_info.max_travel_hours * 0.5
+    transports = transports_for(parsed_user_info.transportation)
+    return (candidates.shortest_hours(transports) <= max_round_trip_hours) & (
+        candidates.has_weather()
+    )
+
+
+def _enrich_rows(
+    candidates: CandidateBatch,
+    parsed_user_info: ParsedUserInfo,
+    origin_lat: float,
+    origin_lon: float,
+    deadline: Optional[Deadline] = None,
+    target: Optional[int] = None,
+) -> int:
+    """
+    이동 시간/날씨를 배치 열에 채우고, 조건을 통과한 행 수를 돌려준다.
+    이미 조회한 경로/날씨(재계획 시 이전 결과)는 다시 조회하지 않는다.
+
+    싼 신호부터 조회한다: 날씨는 모든 후보를 먼저 한 번의 호출로 가져오고,
+    거리/날씨로 매긴 우선순위 순(services.call_scheduler.enrichment_order)으로
+    ENRICH_WAVE_SIZE개씩 경로를 동시에 조회한다.
+    가까이 모인 후보는 클러스터 대표의 경로로 추정하고(_route_clusters),
+    조건을 통과한 후보가 target개 이상이 되면 남은 후보는 조회하지 않는다.
+    턴 예산(TurnBudget)으로 다음 wave의 경로 조회와 최종 출력 몫(OUTPUT_RESERVE)을
+    감당할 수 없거나 deadline이 바닥나도 남은 후보는 조회하지 않는다.
+    건너뛴 후보 수는 이유별로 턴 예산에 기록한다.
+    """
+    if not len(candidates):
+        return 0
+
+    max_hours = parsed_user_info.max_travel_hours * 0.5
+    transports = transports_for(parsed_user_info.transportation)
+    budget = current_budget()
+    weathered = 0
+    # 경로를 하나도 조회할 수 없으면 (target 도달, 예산 소진) 날씨도 미리 가져오지 않는다
+    first_calls = Counter({WEATHER_HOST: 1, **{ROUTE_HOSTS[t]: 1 for t in transports}})
+    if (target is None or target > 0) and (
+        budget is None or budget.affords(first_calls, OUTPUT_RESERVE)
+    ):
+        # 6-3. 날씨(open-meteo, 무료)는 여러 지점을 한 번에 조회하므로 먼저 가져와서
+        # 경로 조회 순서를 정하는 데 쓴다 (실패한 행은 wave에서 다시 시도)
+        weathered = _fetch_weather(
+            candidates, np.arange(len(candidates)), parsed_user_info, deadline
+        )
+    order = enrichment_order(
+        candidates, parsed_user_info, origin_lat, origin_lon, transports
+    )
+
+    def feasible() -> np.ndarray:
+        return _feasible(candidates, parsed_user_info)
+
+    leaders = _route_clusters(candidates, order, transports)
+    distances_km = candidates.distances_km(origin_lat, origin_lon)
+    had_routes = np.ones(len(candidates), dtype=bool)
+    for transport in transports:
+        had_routes &= candidates.routed(transport)
+
+    routed = derived = validated = processed = 0
+    stop_reason = None
+    with ThreadPoolExecutor(max_workers=ENRICH_WAVE_SIZE) as executor:
+        while processed < len(order):
+            if target is not None and feasible().sum() >= target:
+                stop_reason = "target"
+                break
+            if deadline is not None and deadline.expired():
+                dropped = len(order) - processed
+                print(f"6. Deadline reached, dropping {dropped} remaining candidates")
+                stop_reason = "deadline"
+                break
+            wave = order[processed : processed + ENRICH_WAVE_SIZE]
+            if budget is not None and not budget.affords(
+                route_calls(candidates, np.unique(leaders[wave]), transports),
+                OUTPUT_RESERVE,
+            ):
+                dropped = len(order) - processed
+                print(f"6. Budget reached, dropping {dropped} remaining candidates")
+                stop_reason = "budget"
+                break
+            # 대표만 조회한다 (멤버의 대표가 다음 wave에 있으면 앞당겨 조회)
+            futures = [
+                executor.submit(
+                    bind_context(_route_one),
+                    candidates,
+                    int(idx),
+                    parsed_user_info,
+                    origin_lat,
+                    origin_lon,
+                    transports,
+                    deadline,
+                )
+                for idx in np.unique(leaders[wave])
+            ]
+            routed += sum(future.result() for future in futures)
+            members = [
+                int(idx)
+                for idx in wave
+                if leaders[idx] != idx
+                and _derive_route(
+                    candidates, int(idx), int(leaders[idx]), distances_km, transports
+                )
+            ]
+            derived += len(members)
+            # 대표 경로를 못 구한 멤버는 예산이 되면 직접 조회한다
+            orphans = [
+                int(idx)
+                for idx in wave
+                if leaders[idx] != idx
+                and not all(candidates.routed(t)[idx] for t in transports)
+            ]
+            if orphans and (
+                budget is None
+                or budget.affords(
+                    route_calls(candidates, np.array(orphans), transports),
+                    OUTPUT_RESERVE,
+                )
+            ):
+                futures = [
+                    executor.submit(
+                        bind_context(_route_one),
+                        candidates,
+                        idx,
+                        parsed_user_info,
+                        origin_lat,
+                        origin_lon,
+                        transports,
+                        deadline,
+                    )
+                    for idx in orphans
+                ]
+                routed += sum(future.result() for future in futures)
+                _promote_leaders(candidates, leaders, orphans, transports)
+            samples = [
+                idx for idx in members if random.random() < ROUTE_CLUSTER_VALIDATE_RATE
+            ]
+            # 검증은 선택 사항이므로 예산이 남을 때만 한다
+            if budget is not None and not budget.affords(
+                Counter({ROUTE_HOSTS[t]: len(samples) for t in transports}),
+                OUTPUT_RESERVE,
+            ):
+                samples = []
+            for future in [
+                executor.submit(
+                    bind_context(_validate_route),
+                    candidates,
+                    idx,
+                    parsed_user_info,
+                    origin_lat,
+                    origin_lon,
+                    transports,
+                    deadline,
+                )
+                for idx in samples
+            ]:
+                future.result()
+            validated += len(samples)
+            # 6-2. 앞에서 날씨를 못 가져온 후보는 여행을 다녀올 수 있을 때만 다시 조회
+            # (이동 시간을 못 구했으면 NaN이라 판단할 수 없으므로 제외)
+            reachable = candidates.shortest_hours(transports)[wave] <= max_hours
+            weathered += _fetch_weather(
+                candidates, wave[reachable], parsed_user_info, deadline
+            )
+            processed += len(wave)
+
+    # 조회하지 않은 후보에 필요했을 호출 수 (날씨는 먼저 한 번에 조회하므로 대부분 0)
+    skipped = order[processed:]
+    missing_routes = sum(
+        (~candidates.routed(t)[skipped]).astype(int) for t in transports
+    )
+    missing_weather = ~candidates.has_weather()[skipped]
+    avoided_routes = int(np.sum(missing_routes))
+    avoided_weather = int(missing_weather.sum())
+    skipped_count = int(((missing_routes > 0) | missing_weather).sum())
+    if budget is not None and stop_reason is not None:
+        budget.skip(stop_reason, skipped_count)
+    ENRICH_AVOIDED_CALLS.inc(avoided_routes, kind="route")
+    ENRICH_AVOIDED_CALLS.inc(avoided_weather, kind="weather")
+    saved_routes = derived - validated
+    ROUTE_CLUSTER_SAVED.inc(saved_routes)
+    s = current_span()
+    if s is not None:
+        s.add("avoided_calls", avoided_routes + avoided_weather)
+        s.add("cluster_saved", saved_routes)
+
+    reused = int(had_routes[order[:processed]].sum())
+    print(
+        f"6. Routed {routed}, derived {derived} from nearby routes "
+        f"({validated} validated), reused {reused} routes, fetched {weathered} forecasts, "
+        f"skipped {skipped_count} candidates "
+        f"(avoided {avoided_routes} route / {avoided_weather} weather calls)"
+    )
+
+    return int(feasible().sum())
+
+
+def _enriched_candidates(
+    candidates: CandidateBatch, parsed_user_info: ParsedUserInfo
+) -> List[DestinationCandidate]:
+    """
+    6-4. 이동 시간/날씨 조건을 통과한 후보만 남기고 실외 활동 적합도 점수 계산
+    """
+    transports = transports_for(parsed_user_info.transportation)
+    enriched = candidates.take(_feasible(candidates, parsed_user_info))
+    outdoor_scores = calculate_outdoor_scores(
+        enriched.weather_code, enriched.t_max, enriched.t_min, enriched.precipitation
+    )
+    return enriched.to_candidates(outdoor_scores, transports)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from apis.google_places import (
     get_photo_urls,
     get_place_description,
@@ -5,25 +7,39 @@ from apis.google_places import (
 )
 from domain.enums import Transportation
 from domain.models import ChatSessionState
+from services.call_scheduler import OUTPUT_RESERVE, current_budget
+from utils.deadline import Deadline
+from utils.tracing import span
 
 
-def generate_final_output(state: ChatSessionState) -> str:
+def generate_final_output(
+    state: ChatSessionState, deadline: Optional[Deadline] = None
+) -> str:
     if not state.candidates:
         return "추천할 여행지가 없습니다. 새로운 여행 계획을 입력해 주세요."
+    if state.current_index >= len(state.candidates):
+        return "준비한 여행지를 모두 소개했습니다. 새로운 여행 조건을 알려주세요."
 
     candidate = state.candidates[state.current_index]
 
     # Google place_id 검색
-    place_id = search_place_id(candidate.place_info.place_name)
-    if not place_id:
-        summary = None
-        reviews = []
-        photos = []
-    else:
-        description = get_place_description(place_id) or {}
-        summary = description.get("summary")
-        reviews = description.get("reviews", [])
-        photos = get_photo_urls(place_id, max_photos=3)
+    # Google 장소 정보는 호출마다 과금되므로 턴 예산이 남아 있을 때만 조회한다
+    budget = current_budget()
+    with span("output.place_details") as s:
+        if budget is not None and not budget.affords(OUTPUT_RESERVE):
+            s.set(skipped="budget")
+            place_id = None
+        else:
+            place_id = search_place_id(candidate.place_info.place_name, deadline)
+        if not place_id:
+            summary = None
+            reviews = []
+            photos = []
+        else:
+            description = get_place_description(place_id, deadline) or {}
+            summary = description.get("summary")
+            reviews = description.get("reviews", [])
+            photos = get_photo_urls(place_id, max_photos=3, deadline=deadline)
 
     # --- 포맷팅 ---
     name = candidate.place_info.place_name
@@ -0,0 +1,398 @@
+"""
+캐시 워밍 (주말 오전 피크 전에 인기 출발지의 업스트림 응답을 미리 채운다).
+
+- 대상: 최근 여행 조건 로그(TRIP_LOG_FILE, record_trip이 기록)에서 자주 나온 조건.
+  로그가 없으면 시드 파일(WARMUP_SEED_FILE, travel_samples.json처럼 user_input이 있으면
+  LLM 파서로 조건을 뽑는다)
+- 출발지마다: 좌표 -> isochrone 프로필 -> 후보 검색 페이지 -> 가까운 후보의 경로
+  (자동차는 출발 시각마다) -> 예보 -> Google 장소 정보
+- 출발 시각은 다가오는 주말의 WARMUP_DEPARTURE_HOURS 시 (경로 캐시의 출발 시간대와 맞춘다)
+- 저우선순위(utils.rate_limiter.low_priority)로 호출해 라이브 트래픽 몫의 토큰과
+  쿼터를 남긴다
+- 끝나면 종류별 커버리지와 업스트림 호출 수를 출력한다
+
+실행: python -m services.warmup_service [--seed travel_samples.json] [--stubs]
+서버에서는 python server.py --warmup 으로 매일 WARMUP_AT_HOUR 시에 돈다.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from apis.google_places import get_photo_urls, get_place_description, search_place_id
+from apis.kakao_local_address import get_coords
+from apis.kakao_local_candidates import CandidateStream
+from apis.route import get_round_trip_hours
+from apis.weather import get_weather_batch
+from domain.batch import CandidateBatch
+from domain.enums import PlaceCategory, Transportation
+from domain.models import ParsedUserInfo
+from domain.plan import transports_for
+from services.isochrone_service import get_isochrone, warm_profile
+from utils.distance_helper import max_travel_hours_to_radius_m
+from utils.rate_limiter import low_priority
+from utils.tracing import bind_context, start_trace
+
+# 설정하면 TRIP_INFO 턴의 여행 조건을 JSONL로 남긴다 (워밍 대상 선정용)
+TRIP_LOG_FILE = os.getenv("TRIP_LOG_FILE")
+WARMUP_SEED_FILE = os.getenv("WARMUP_SEED_FILE", "travel_samples.json")
+WARMUP_LOOKBACK_DAYS = float(os.getenv("WARMUP_LOOKBACK_DAYS", "7"))
+WARMUP_MAX_TARGETS = int(os.getenv("WARMUP_MAX_TARGETS", "20"))
+WARMUP_DEPARTURE_HOURS = os.getenv("WARMUP_DEPARTURE_HOURS", "8,9,10")
+WARMUP_CANDIDATES = int(os.getenv("WARMUP_CANDIDATES", "20"))  # 경로/예보를 채울 후보
+WARMUP_PLACE_DETAILS = int(os.getenv("WARMUP_PLACE_DETAILS", "5"))  # Google 장소 정보
+WARMUP_AT_HOUR = int(os.getenv("WARMUP_AT_HOUR", "4"))
+WARMUP_WORKERS = int(os.getenv("WARMUP_WORKERS", "4"))
+
+_log_lock = threading.Lock()
+
+
+def record_trip(parsed_user_info: ParsedUserInfo) -> None:
+    """
+    여행 조건 한 줄을 TRIP_LOG_FILE에 덧붙인다 (설정하지 않았으면 아무것도 하지 않음)
+    """
+    if not TRIP_LOG_FILE:
+        return
+    line = json.dumps(
+        {"at": time.time(), "info": parsed_user_info.model_dump(mode="json")},
+        ensure_ascii=False,
+    )
+    try:
+        with _log_lock, open(TRIP_LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"[warmup] 여행 조건 기록 실패: {e}")
+
+
+@dataclass(frozen=True, slots=True)
+class WarmupTarget:
+    """
+    워밍 단위: 검색/경로 캐시 키를 결정하는 여행 조건
+    """
+
+    origin: str
+    categories: tuple[PlaceCategory, ...]
+    max_travel_hours: float
+    transportation: Optional[Transportation]
+    keyword: Optional[str] = None
+
+    @classmethod
+    def from_info(cls, parsed_user_info: ParsedUserInfo) -> "WarmupTarget":
+        return cls(
+            origin=parsed_user_info.origin.strip(),
+            categories=tuple(
+                sorted(
+                    set(parsed_user_info.destination_categories),
+                    key=lambda c: c.value,
+                )
+            ),
+            max_travel_hours=parsed_user_info.max_travel_hours,
+            transportation=parsed_user_info.transportation,
+            keyword=(parsed_user_info.keyword or "").strip() or None,
+        )
+
+
+@dataclass
+class Coverage:
+    """
+    종류별로 채우려 한 항목 수와 채운(이미 있었거나 새로 가져온) 항목 수
+    """
+
+    requested: Counter = field(default_factory=Counter)
+    ok: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, ok: bool) -> None:
+        with self._lock:
+            self.requested[kind] += 1
+            self.ok[kind] += int(ok)
+
+    def ratio(self, kind: str) -> float | None:
+        requested = self.requested[kind]
+        return self.ok[kind] / requested if requested else None
+
+
+def recent_trips(
+    path: str, lookback_days: float = WARMUP_LOOKBACK_DAYS
+) -> List[ParsedUserInfo]:
+    cutoff = time.time() - lookback_days * 24 * 3600
+    trips = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["at"] >= cutoff:
+                    trips.append(ParsedUserInfo.model_validate(record["info"]))
+            except (ValueError, KeyError):
+                continue  # 깨진 줄 (쓰는 도중 종료 등)
+    return trips
+
+
+def seed_trips(path: str) -> List[ParsedUserInfo]:
+    """
+    시드 파일: 여행 조건(ParsedUserInfo 필드) 또는 user_input 문장의 목록
+    """
+    from apis.openai_info_parser import parse_user_info
+
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+
+    trips = []
+    for entry in entries:
+        try:
+            if "user_input" in entry:
+                trips.append(parse_user_info(entry["user_input"]))
+            else:
+                trips.append(ParsedUserInfo.model_validate(entry))
+        except Exception as e:
+            print(f"[warmup] 시드 항목을 건너뜁니다 ({entry.get('id', '?')}): {e}")
+    return trips
+
+
+def load_targets(
+    max_targets: int = WARMUP_MAX_TARGETS, seed_file: str = WARMUP_SEED_FILE
+) -> List[WarmupTarget]:
+    """
+    최근 로그(없으면 시드 파일)에서 자주 나온 조건 순으로 max_targets개
+    """
+    trips = []
+    if TRIP_LOG_FILE and os.path.exists(TRIP_LOG_FILE):
+        trips = recent_trips(TRIP_LOG_FILE)
+    if not trips and os.path.exists(seed_file):
+        trips = seed_trips(seed_file)
+    counts = Counter(WarmupTarget.from_info(t) for t in trips)
+    return [target for target, _ in counts.most_common(max_targets)]
+
+
+def weekend_departures(today: date, hours: List[int]) -> List[str]:
+    """
+    다가오는 주말(토, 일; 일요일이면 그날만)의 출발 시각들 (ISO 8601)
+    """
+    if today.weekday() == 6:
+        days = [today]
+    else:
+        saturday = today + timedelta(days=(5 - today.weekday()) % 7)
+        days = [saturday, saturday + timedelta(days=1)]
+    return [
+        datetime(day.year, day.month, day.day, hour).isoformat(timespec="seconds")
+        for day in days
+        for hour in hours
+    ]
+
+
+def _search(
+    lat: float, lon: float, target: WarmupTarget, departures: List[str]
+) -> CandidateBatch:
+    """
+    출발 시각마다 파이프라인과 같은 반경/검색 센터로 검색한다
+    (isochrone 다각형이 출발 시간대마다 다를 수 있으므로 반경별로 한 번씩)
+    """
+    batches, radii = [], set()
+    for departure in departures:
+        isochrone = get_isochrone(
+            lat, lon, target.transportation, departure, target.max_travel_hours * 0.5
+        )
+        if isochrone is not None:
+            radius_m = isochrone.radius_m
+        else:
+            radius_m = max_travel_hours_to_radius_m(
+                target.max_travel_hours, target.transportation
+            )
+        if radius_m in radii:
+            continue
+        radii.add(radius_m)
+        stream = CandidateStream(
+            lat,
+            lon,
+            radius_m,
+            list(target.categories),
+            keyword=target.keyword,
+            keep_center=isochrone.intersects_circle if isochrone else None,
+        )
+        batches.extend(stream)
+    return (
+        CandidateBatch.concat(batches).unique() if batches else CandidateBatch.empty()
+    )
+
+
+def warm_target(
+    target: WarmupTarget,
+    departures: List[str],
+    coverage: Coverage,
+    executor: ThreadPoolExecutor,
+) -> None:
+    lat, lon = get_coords(target.origin)
+    coverage.record("geocode", lat is not None)
+    if lat is None or lon is None:
+        return
+
+    transports = transports_for(target.transportation)
+    # 대중교통은 출발 시각을 반영하지 않으므로 한 번만
+    departures_for = {
+        Transportation.CAR: departures,
+        Transportation.PUBLIC: departures[:1],
+    }
+
+    for transport in transports:
+        for departure in departures_for[transport]:
+            profile = warm_profile(lat, lon, transport, departure)
+            coverage.record("isochrone", profile is not None)
+
+    searched = _search(lat, lon, target, departures)
+    coverage.record("search", len(searched) > 0)
+    distances_km = searched.distances_km(lat, lon)
+    nearest = searched.take(distances_km.argsort(kind="stable")[:WARMUP_CANDIDATES])
+
+    def route(i: int, transport: Transportation, departure: str) -> bool:
+        hours = get_round_trip_hours(
+            transport,
+            departure,
+            lat,
+            lon,
+            float(nearest.lat[i]),
+            float(nearest.lon[i]),
+        )
+        return hours[transport] is not None
+
+    jobs = [
+        (i, transport, departure)
+        for i in range(len(nearest))
+        for transport in transports
+        for departure in departures_for[transport]
+    ]
+    for future in [executor.submit(bind_context(route), *job) for job in jobs]:
+        coverage.record("route", future.result())
+
+    coords = [(float(a), float(b)) for a, b in zip(nearest.lat, nearest.lon)]
+    for day in sorted({d[:10] for d in departures}):
+        departure = next(d for d in departures if d.startswith(day))
+        for forecast in get_weather_batch(coords, departure):
+            coverage.record("forecast", forecast is not None)
+
+    def place_details(name: str) -> bool:
+        place_id = search_place_id(name)
+        if not place_id:
+            return False
+        description = get_place_description(place_id)
+        get_photo_urls(place_id, max_photos=3)  # travel_output_service와 같은 키
+        return description is not None
+
+    names = nearest.names[:WARMUP_PLACE_DETAILS]
+    for future in [executor.submit(bind_context(place_details), n) for n in names]:
+        coverage.record("place_details", future.result())
+
+
+def _upstream_calls(trace) -> Counter:
+    calls: Counter[str] = Counter()
+    for s in trace.spans:
+        if s.name.startswith("http "):
+            calls[s.name.split(" ", 2)[2]] += 1
+    return calls
+
+
+def run_warmup(
+    targets: Optional[List[WarmupTarget]] = None, today: Optional[date] = None
+) -> Coverage:
+    """
+    대상 조건들의 캐시를 저우선순위로 채우고 커버리지 리포트를 출력한다
+    """
+    if targets is None:
+        targets = load_targets()
+    hours = [int(h) for h in WARMUP_DEPARTURE_HOURS.split(",") if h.strip()]
+    departures = weekend_departures(today or date.today(), hours)
+    coverage = Coverage()
+
+    started = time.perf_counter()
+    with low_priority(), start_trace("warmup") as trace:
+        with ThreadPoolExecutor(
+            max_workers=WARMUP_WORKERS, thread_name_prefix="warmup"
+        ) as executor:
+            for target in targets:
+                try:
+                    warm_target(target, departures, coverage, executor)
+                except Exception as e:
+                    print(f"[warmup] {target.origin} 워밍 실패: {e}")
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"[warmup] 조건 {len(targets)}개, 출발 시각 {len(departures)}개, {elapsed:.1f}s"
+    )
+    print(f"  {'kind':<14}{'requested':>10}{'ok':>8}{'coverage':>10}")
+    for kind in (
+        "geocode",
+        "isochrone",
+        "search",
+        "route",
+        "forecast",
+        "place_details",
+    ):
+        ratio = coverage.ratio(kind)
+        print(
+            f"  {kind:<14}{coverage.requested[kind]:>10}{coverage.ok[kind]:>8}"
+            f"{'-' if ratio is None else f'{ratio:.1%}':>10}"
+        )
+    calls = _upstream_calls(trace)
+    print(
+        "  upstream calls: "
+        + (", ".join(f"{host}={n}" for host, n in sorted(calls.items())) or "none")
+    )
+    return coverage
+
+
+def _seconds_until(hour: int) -> float:
+    now = datetime.now()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def start_warmup_daemon(at_hour: int = WARMUP_AT_HOUR) -> threading.Thread:
+    """
+    매일 at_hour 시에 run_warmup을 도는 데몬 스레드를 시작한다
+    """
+
+    def loop():
+        while True:
+            time.sleep(_seconds_until(at_hour))
+            try:
+                run_warmup()
+            except Exception as e:
+                print(f"[warmup] 실패: {e}")
+
+    thread = threading.Thread(target=loop, name="warmup", daemon=True)
+    thread.start()
+    print(f"[warmup] 매일 {at_hour}시에 캐시 워밍")
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", default=WARMUP_SEED_FILE, help="시드 파일")
+    parser.add_argument("--max-targets", type=int, default=WARMUP_MAX_TARGETS)
+    parser.add_argument(
+        "--stubs",
+        action="store_true",
+        help="업스트림/LLM 대신 benchmarks.stubs 사용 (로컬 테스트용)",
+    )
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="stub 지연 배율"
+    )
+    args = parser.parse_args()
+
+    if args.stubs:
+        from benchmarks.stubs import install_stubs
+
+        install_stubs(scale=args.latency_scale)
+    run_warmup(load_targets(args.max_targets, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+
+# apis.openai_* 모듈은 import할 때 클라이언트를 만든다 (테스트는 호출하지 않는다)
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,112 @@
+from collections import Counter
+
+import pytest
+
+from domain.enums import Transportation
+from services import call_scheduler
+from services.call_scheduler import (
+    OUTPUT_RESERVE,
+    PLACES_HOST,
+    ROUTE_HOSTS,
+    WEATHER_HOST,
+    TurnBudget,
+    turn_budget,
+)
+from utils import rate_limiter
+from utils.rate_limiter import acquire_permit
+
+CAR_HOST = ROUTE_HOSTS[Transportation.CAR]
+TRANSIT_HOST = ROUTE_HOSTS[Transportation.PUBLIC]
+RESERVED = sum(OUTPUT_RESERVE.values())
+
+
+def test_spend_charges_calls_and_cost():
+    budget = TurnBudget(max_calls=10, max_cost=1_000)
+
+    assert budget.spend(CAR_HOST)
+    assert budget.spend(WEATHER_HOST)
+
+    assert budget.calls == Counter({CAR_HOST: 1, WEATHER_HOST: 1})
+    assert budget.spent_calls == 2
+    assert budget.spent_cost == call_scheduler.CALL_COSTS_KRW[CAR_HOST]
+
+
+def test_calls_before_output_keep_the_reserve():
+    budget = TurnBudget(max_calls=RESERVED + 2, max_cost=1_000)
+
+    assert budget.spend(WEATHER_HOST)
+    assert budget.spend(WEATHER_HOST)
+    # 출력 몫만 남았다: 6단계 호출은 거절하고, 최종 출력(Places)은 다 쓸 수 있다
+    assert not budget.spend(WEATHER_HOST)
+    assert not budget.affords(Counter({CAR_HOST: 1}), OUTPUT_RESERVE)
+    assert budget.affords(OUTPUT_RESERVE)
+    assert all(budget.spend(PLACES_HOST) for _ in range(RESERVED))
+    assert not budget.spend(PLACES_HOST)
+    assert budget.spent_calls == budget.max_calls
+
+
+def test_cost_limit_keeps_the_reserve():
+    reserve_cost = call_scheduler.CALL_COSTS_KRW[PLACES_HOST] * RESERVED
+    car_cost = call_scheduler.CALL_COSTS_KRW[CAR_HOST]
+    budget = TurnBudget(max_calls=1_000, max_cost=reserve_cost + car_cost)
+
+    assert budget.spend(CAR_HOST)
+    assert not budget.spend(CAR_HOST)
+    assert budget.spend(PLACES_HOST)
+
+
+def test_per_host_limit(monkeypatch):
+    monkeypatch.setitem(call_scheduler.TURN_HOST_CALLS, TRANSIT_HOST, 2)
+    budget = TurnBudget(max_calls=1_000, max_cost=1_000)
+
+    assert budget.spend(TRANSIT_HOST) and budget.spend(TRANSIT_HOST)
+    assert not budget.spend(TRANSIT_HOST)
+    assert not budget.affords(Counter({TRANSIT_HOST: 1}))
+    assert budget.spend(CAR_HOST)
+
+
+def test_refund_returns_a_call():
+    budget = TurnBudget(max_calls=RESERVED + 1, max_cost=1_000)
+    assert budget.spend(CAR_HOST)
+    assert not budget.spend(CAR_HOST)
+
+    budget.refund(CAR_HOST)
+    assert budget.spent_calls == 0
+    assert budget.spend(CAR_HOST)
+
+
+def test_permit_refunds_budget_when_rate_limited(monkeypatch, tmp_path):
+    host = "budget.test"
+    monkeypatch.setitem(
+        rate_limiter.RATE_LIMITS,
+        host,
+        rate_limiter.RateLimit(qps=0.001, burst=1, daily_quota=100),
+    )
+    monkeypatch.setattr(
+        rate_limiter, "quota_counter", rate_limiter.QuotaCounter(str(tmp_path / "q"))
+    )
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+    monkeypatch.setattr(rate_limiter, "MAX_WAIT_SECONDS", 0.0)
+
+    with turn_budget() as budget:
+        assert acquire_permit(host)
+        assert not acquire_permit(host)  # 토큰이 없다 -> 예산을 되돌린다
+        assert budget.calls[host] == 1
+
+
+def test_skips_are_counted_by_reason():
+    budget = TurnBudget()
+    budget.skip("target", 3)
+    budget.skip("budget", 0)
+    budget.skip("target", 2)
+
+    assert budget.skipped == Counter({"target": 5})
+    assert "target=5" in budget.summary()
+
+
+@pytest.mark.parametrize("host", [CAR_HOST, PLACES_HOST])
+def test_over_budget_call_is_not_sent(host):
+    with turn_budget() as budget:
+        budget.max_calls = 0
+        assert not acquire_permit(host)
+        assert budget.spent_calls == 0
@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+import pytest
+
+from domain.enums import Transportation
+from services import isochrone_service
+from services.isochrone_service import Isochrone, TravelTimeProfile
+from utils import rate_limiter
+from utils.distance_helper import from_local_km
+
+ORIGIN = (37.5, 127.0)
+BEARINGS = np.array([0.0, 90.0, 180.0, 270.0])
+
+
+def _profile(hours) -> TravelTimeProfile:
+    return TravelTimeProfile(
+        origin_lat=ORIGIN[0],
+        origin_lon=ORIGIN[1],
+        bearings_deg=BEARINGS,
+        distances_km=np.array([10.0, 20.0, 40.0]),
+        hours=np.array(hours, dtype=np.float64),
+    )
+
+
+def test_reach_interpolates_between_samples():
+    profile = _profile([[1.0, 2.0, 4.0]] * 4)
+
+    assert profile.reach_km(1.5) == pytest.approx([15.0] * 4)
+    assert profile.reach_km(5.0) == pytest.approx([40.0] * 4)
+    assert profile.reach_km(0.5) == pytest.approx([5.0] * 4)
+
+
+def test_no_route_samples_are_unreachable():
+    nan = math.nan
+    profile = _profile(
+        [
+            [1.0, nan, 3.0],  # 중간이 바다: 더 먼 샘플이 닿으면 그쪽
+            [1.0, nan, nan],  # 10km 너머로는 경로 없음: 보간하지 않는다
+            [nan, nan, nan],
+            [1.0, 2.0, 4.0],
+        ]
+    )
+
+    assert profile.reach_km(3.0) == pytest.approx([40.0, 10.0, 0.0, 30.0])
+
+
+def _isochrone(reach_km) -> Isochrone:
+    return Isochrone(
+        origin_lat=ORIGIN[0],
+        origin_lon=ORIGIN[1],
+        bearings_deg=BEARINGS,
+        reach_km=np.array(reach_km, dtype=np.float64),
+    )
+
+
+def _points(xy):
+    x, y = np.array(xy, dtype=np.float64).T
+    return from_local_km(x, y, *ORIGIN)
+
+
+def test_contains_uses_edges_between_vertices():
+    # 꼭짓점이 (0, 10), (10, 0), (0, -10), (-10, 0)인 마름모
+    isochrone = _isochrone([10.0] * 4)
+
+    inside = [(0, 0), (0, 9.9), (4.9, 4.9), (-4.9, -4.9), (9.9, 0)]
+    outside = [(0, 10.1), (5.1, 5.1), (-5.1, 5.1), (20, 0)]
+    assert isochrone.contains(*_points(inside)).all()
+    assert not isochrone.contains(*_points(outside)).any()
+
+
+def test_contains_with_zero_reach_vertex():
+    # 남쪽 꼭짓점이 원점: 남쪽 두 구간은 원점과 잇는 변
+    isochrone = _isochrone([10.0, 10.0, 0.0, 10.0])
+
+    assert isochrone.contains(*_points([(0, 5), (4.9, 4.9)])).all()
+    assert not isochrone.contains(*_points([(0, -1), (3, -3)])).any()
+
+
+def test_failed_build_backs_off(monkeypatch):
+    builds = []
+
+    def failing_build(*args):
+        builds.append(args)
+        return None
+
+    monkeypatch.setattr(isochrone_service, "build_profile", failing_build)
+    monkeypatch.setattr(
+        isochrone_service, "_profiles", isochrone_service.TTLCache("test", 60)
+    )
+    monkeypatch.setattr(
+        isochrone_service,
+        "_failures",
+        isochrone_service.TTLCache("test_failures", 3600),
+    )
+    args = (*ORIGIN, Transportation.PUBLIC, "2025-11-15T09:00:00", 2.0)
+
+    assert isochrone_service.get_isochrone(*args) is None
+    isochrone_service._builder.submit(lambda: None).result()
+    assert len(builds) == 1
+
+    assert isochrone_service.get_isochrone(*args) is None
+    isochrone_service._builder.submit(lambda: None).result()
+    assert len(builds) == 1
+
+    key = isochrone_service._profile_key(*args[:4])
+    failures, _ = isochrone_service._failures.get(key)
+    isochrone_service._failures.put(key, (failures, 0.0))
+    isochrone_service.get_isochrone(*args)
+    isochrone_service._builder.submit(lambda: None).result()
+    assert len(builds) == 2
+    assert isochrone_service._failures.get(key)[0] == 2
+
+
+def test_background_build_keeps_caller_priority(monkeypatch):
+    priorities = []
+
+    def build(*args):
+        priorities.append(rate_limiter.is_low_priority())
+        return None
+
+    monkeypatch.setattr(isochrone_service, "build_profile", build)
+    monkeypatch.setattr(
+        isochrone_service, "_profiles", isochrone_service.TTLCache("test", 60)
+    )
+    monkeypatch.setattr(
+        isochrone_service, "_failures", isochrone_service.TTLCache("test_f", 60)
+    )
+    departure = "2025-11-15T09:00:00"
+
+    with rate_limiter.low_priority():
+        isochrone_service.get_isochrone(*ORIGIN, Transportation.CAR, departure, 2.0)
+    isochrone_service.get_isochrone(*ORIGIN, Transportation.PUBLIC, departure, 2.0)
+    isochrone_service._builder.submit(lambda: None).result()
+
+    assert priorities == [True, False]
+
+
+def test_isochrone_is_anchored_at_the_origin(monkeypatch):
+    monkeypatch.setattr(
+        isochrone_service, "_profiles", isochrone_service.TTLCache("test", 60)
+    )
+    departure = "2025-11-15T09:00:00"
+    # 타일 중심에서 동쪽으로 2km 떨어진 출발지
+    center = (37.5, 127.0)
+    origin = from_local_km(np.array(2.0), np.array(0.0), *center)
+    origin = (float(origin[0]), float(origin[1]))
+    profile = TravelTimeProfile(
+        origin_lat=center[0],
+        origin_lon=center[1],
+        bearings_deg=BEARINGS,
+        distances_km=np.array([10.0]),
+        hours=np.array([[1.0]] * 4),
+    )
+    key = isochrone_service._profile_key(*origin, Transportation.PUBLIC, departure)
+    isochrone_service._profiles.put(key, profile)
+
+    isochrone = isochrone_service.get_isochrone(
+        *origin, Transportation.PUBLIC, departure, 1.0
+    )
+
+    assert (isochrone.origin_lat, isochrone.origin_lon) == origin
+    margin = isochrone_service.ISOCHRONE_MARGIN
+    assert isochrone.reach_km == pytest.approx([10.0 * margin + 2.0] * 4)
+    # 출발지에서 동쪽으로 타일 중심 기준 도달 거리만큼 간 후보도 들어간다
+    east = from_local_km(np.array(10.0 * margin + 1.9), np.array(0.0), *origin)
+    assert isochrone.contains(*east).all()
@@ -0,0 +1,64 @@
+import httpx
+import numpy as np
+from openai import APITimeoutError
+
+from apis import openai_filter
+from apis.openai_filter import filter_candidates_by_user_preferences
+from domain.batch import CandidateBatch
+from domain.enums import PlaceCategory, Transportation
+from domain.models import ParsedUserInfo
+
+
+def _batch(names, addresses=None) -> CandidateBatch:
+    n = len(names)
+    return CandidateBatch.from_columns(
+        [str(i) for i in range(n)],
+        list(names),
+        list(addresses or [""] * n),
+        np.full(n, 37.5),
+        np.full(n, 127.0),
+    )
+
+
+def _info(**changes) -> ParsedUserInfo:
+    values = dict(
+        origin="방배동",
+        departure_datetime="2026-10-24T09:00:00",
+        max_travel_hours=4.0,
+        destination_categories=[PlaceCategory.TOURIST_SPOT],
+        transportation=Transportation.CAR,
+    )
+    values.update(changes)
+    return ParsedUserInfo(**values)
+
+
+def _timeout(*args, **kwargs):
+    raise APITimeoutError(
+        request=httpx.Request("POST", "https://api.openai.com/v1/responses")
+    )
+
+
+def test_timeout_still_drops_must_avoid(monkeypatch):
+    monkeypatch.setattr(openai_filter, "responses_parse", _timeout)
+    candidates = _batch(
+        ["롯데월드몰", "올림픽공원", "석촌호수", "코엑스"],
+        ["", "", "", "서울 강남구 영동대로 513 쇼핑몰"],
+    )
+
+    filtered = filter_candidates_by_user_preferences(
+        candidates, _info(must_avoid=["몰"]), 1
+    )
+
+    assert filtered.names == ["올림픽공원", "석촌호수"]
+
+
+def test_timeout_puts_dislikes_last_and_keeps_k_max(monkeypatch):
+    monkeypatch.setattr(openai_filter, "responses_parse", _timeout)
+    names = ["놀이공원", "미술관", "박물관"] * 3
+
+    filtered = filter_candidates_by_user_preferences(
+        _batch(names), _info(dislikes=["놀이", " "]), 1
+    )
+
+    assert len(filtered) == openai_filter.MULTIPLIER
+    assert filtered.names[:6] == ["미술관", "박물관"] * 3
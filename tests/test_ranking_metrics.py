@@ -0,0 +1,43 @@
+import math
+
+import pytest
+
+from benchmarks.evaluate import ranking_metrics
+
+GOLD = ["광교 카페거리", "수원화성", "행궁동"]
+
+
+def test_perfect_ranking():
+    metrics = ranking_metrics(["광교카페거리", "수원 화성", "행궁동"], GOLD, k=3)
+    assert metrics == {"hit@3": 1.0, "ndcg@3": pytest.approx(1.0), "mrr": 1.0}
+
+
+def test_no_hit():
+    assert ranking_metrics(["a", "b"], GOLD, k=2) == {
+        "hit@2": 0.0,
+        "ndcg@2": 0.0,
+        "mrr": 0.0,
+    }
+
+
+def test_first_hit_at_second_rank():
+    metrics = ranking_metrics(["a", "수원화성", "b"], GOLD, k=3)
+    ideal = 3 + 2 / math.log2(3) + 1 / math.log2(4)
+    assert metrics["hit@3"] == 1.0
+    assert metrics["mrr"] == 0.5
+    assert metrics["ndcg@3"] == pytest.approx((2 / math.log2(3)) / ideal)
+
+
+def test_hits_outside_top_k_are_ignored():
+    metrics = ranking_metrics(["a", "b", "광교카페거리"], GOLD, k=2)
+    assert metrics == {"hit@2": 0.0, "ndcg@2": 0.0, "mrr": 0.0}
+
+
+def test_same_gold_place_counts_once():
+    once = ranking_metrics(["행궁동"], GOLD, k=2)
+    twice = ranking_metrics(["행궁동", "행궁동"], GOLD, k=2)
+    assert twice == once
+
+
+def test_empty_gold():
+    assert ranking_metrics(["a"], [], k=1) == {"hit@1": 0.0, "ndcg@1": 0.0, "mrr": 0.0}
@@ -0,0 +1,85 @@
+import json
+import multiprocessing
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import QUOTA_LEASE, QuotaCounter, RateLimit, acquire_permit
+
+
+def _consume(path: str, calls: int, quota: int, results) -> None:
+    counter = QuotaCounter(path)
+    results.put(sum(counter.consume("h", quota) for _ in range(calls)))
+    counter.flush()
+
+
+def test_quota_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "quota.json")
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_consume, args=(path, 80, 100, results))
+        for _ in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert sum(results.get() for _ in workers) == 100
+    (counts,) = json.load(open(path)).values()
+    assert counts == {"h": 100}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "quota.json",
+        "quota.json.lock",
+    ]
+
+
+def test_unused_lease_is_returned_on_flush(tmp_path):
+    path = str(tmp_path / "quota.json")
+    counter = QuotaCounter(path)
+    assert counter.consume("h", None)
+    assert counter.consume("h", None)
+    counter.release("h")
+    (counts,) = json.load(open(path)).values()
+    assert counts == {"h": QUOTA_LEASE}
+
+    counter.flush()
+    (counts,) = json.load(open(path)).values()
+    assert counts == {"h": 1}
+    assert QuotaCounter(path).usage() == {"h": 1}
+
+
+def test_exhausted_quota_does_not_take_tokens(tmp_path, monkeypatch):
+    host = "quota.test"
+    monkeypatch.setitem(
+        rate_limiter.RATE_LIMITS, host, RateLimit(qps=1, burst=3, daily_quota=1)
+    )
+    monkeypatch.setattr(
+        rate_limiter, "quota_counter", QuotaCounter(str(tmp_path / "quota.json"))
+    )
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+
+    assert acquire_permit(host)
+    tokens = rate_limiter._buckets[host]._tokens
+    assert not acquire_permit(host)
+    assert not acquire_permit(host)
+    assert rate_limiter._buckets[host]._tokens == pytest.approx(tokens, abs=0.1)
+
+
+def test_quota_units_count_against_quota(tmp_path, monkeypatch):
+    host = "quota.test"
+    monkeypatch.setitem(
+        rate_limiter.RATE_LIMITS, host, RateLimit(qps=100, burst=100, daily_quota=5)
+    )
+    counter = QuotaCounter(str(tmp_path / "quota.json"))
+    monkeypatch.setattr(rate_limiter, "quota_counter", counter)
+    monkeypatch.setattr(rate_limiter, "_buckets", {})
+
+    with rate_limiter.quota_units(3):
+        assert acquire_permit(host)
+        assert not acquire_permit(host)
+    assert acquire_permit(host)
+    assert acquire_permit(host)
+    assert not acquire_permit(host)
+    counter.flush()
+    assert counter.usage() == {host: 5}
@@ -0,0 +1,175 @@
+import numpy as np
+import pytest
+
+from domain.batch import CandidateBatch
+from domain.enums import PlaceCategory, Transportation, WeatherCode
+from domain.models import ChatSessionState, DailyWeather, ParsedUserInfo
+from services import travel_input_service
+from services.travel_input_service import generate_travel_candidates
+
+ORIGIN = (37.5, 127.0)
+KM_PER_DEG_LON = 111.32 * np.cos(np.radians(ORIGIN[0]))
+
+# 출발지 동쪽으로 1.5km부터 3km 간격 (자동차 1시간 반경 12km 안에 4곳, 2시간 24km 안에 8곳)
+PLACES_KM = np.arange(1.5, 60.0, 3.0)
+ALL = CandidateBatch.from_columns(
+    [f"p{i}" for i in range(len(PLACES_KM))],
+    [f"place {i}" for i in range(len(PLACES_KM))],
+    [""] * len(PLACES_KM),
+    np.full(len(PLACES_KM), ORIGIN[0]),
+    ORIGIN[1] + PLACES_KM / KM_PER_DEG_LON,
+)
+
+MORNING = "2026-10-24T09:00:00"
+AFTERNOON = "2026-10-24T15:00:00"
+NEXT_DAY = "2026-10-25T09:00:00"
+
+
+class Upstream:
+    """
+    generate_travel_candidates가 부르는 업스트림을 흉내내고 호출을 기록한다.
+    자동차 경로는 출발 시각(오전/오후), 날씨는 출발 날짜에 따라 값이 다르다.
+    """
+
+    def __init__(self):
+        self.info = None
+        self.streams = []  # (radius_m, inner_radius_m, 내준 id)
+        self.filtered = []  # 필터링에 넘어온 id
+        self.routes = []  # (교통수단, 후보 id)
+        self.weather = []  # 날씨를 조회한 후보 id
+
+    def reset_calls(self):
+        self.streams, self.filtered, self.routes, self.weather = [], [], [], []
+
+    def _id(self, lat, lon):
+        return ALL.ids[int(np.argmin(np.abs(ALL.lon - lon) + np.abs(ALL.lat - lat)))]
+
+    def parse_user_info(self, user_input, deadline=None, previous=None):
+        return self.info
+
+    def stream(self, origin_lat, origin_lon, radius_m, categories, **kwargs):
+        distances_m = ALL.distances_km(origin_lat, origin_lon) * 1000
+        mask = (distances_m > kwargs["inner_radius_m"]) & (distances_m <= radius_m)
+        mask &= ~ALL.id_mask(kwargs["exclude_ids"])
+        chunk = ALL.take(mask)
+        self.streams.append((radius_m, kwargs["inner_radius_m"], chunk.ids))
+        return iter([chunk])
+
+    def filter(self, candidates, info, k, deadline=None):
+        self.filtered.extend(candidates.ids)
+        return candidates
+
+    def route(self, transportation, departure_datetime, dest_lat, dest_lon, **kwargs):
+        transports = [transportation] if transportation else list(Transportation)
+        self.routes += [(t, self._id(dest_lat, dest_lon)) for t in transports]
+        car = 0.1 if departure_datetime == MORNING else 0.2
+        return {Transportation.CAR: car, Transportation.PUBLIC: 0.3}
+
+    def weather_batch(self, coords, departure_datetime, deadline=None):
+        self.weather += [self._id(lat, lon) for lat, lon in coords]
+        code = (
+            WeatherCode.CLEAR
+            if departure_datetime < NEXT_DAY
+            else WeatherCode.RAIN_MODERATE
+        )
+        return [DailyWeather(code, 20.0, 10.0, 0.0) for _ in coords]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = Upstream()
+    for name, value in {
+        "parse_user_info": fake.parse_user_info,
+        "get_coords": lambda query, deadline=None: ORIGIN,
+        "get_isochrone": lambda *args: None,
+        "CandidateStream": fake.stream,
+        "filter_candidates_by_user_preferences": fake.filter,
+        "get_round_trip_hours": fake.route,
+        "get_weather_batch": fake.weather_batch,
+        "recommend_top_k_candidates": lambda candidates, *args: candidates[: args[2]],
+        "get_result": lambda *args: None,
+        "put_result": lambda *args: None,
+    }.items():
+        monkeypatch.setattr(travel_input_service, name, value)
+    return fake
+
+
+def _info(**changes) -> ParsedUserInfo:
+    values = dict(
+        origin="방배동",
+        departure_datetime=MORNING,
+        max_travel_hours=1.0,
+        destination_categories=[PlaceCategory.TOURIST_SPOT],
+        transportation=Transportation.CAR,
+    )
+    values.update(changes)
+    return ParsedUserInfo(**values)
+
+
+def _replan(upstream, first: ParsedUserInfo, second: ParsedUserInfo):
+    state = ChatSessionState()
+    upstream.info = first
+    generate_travel_candidates("", 3, state)
+    upstream.reset_calls()
+    upstream.info = second
+    generate_travel_candidates("", 3, state)
+    return state
+
+
+def test_transport_change_routes_only_the_new_transport(upstream):
+    state = _replan(upstream, _info(), _info(transportation=None))
+
+    assert upstream.streams == []
+    assert upstream.filtered == []
+    assert upstream.weather == []
+    assert {t for t, _ in upstream.routes} == {Transportation.PUBLIC}
+    assert state.plan.pool.ids == ALL.ids[:4]
+    assert np.all(state.plan.pool.car_hours == 0.1)
+    assert np.all(state.plan.pool.public_hours == 0.3)
+
+
+def test_radius_growth_searches_only_the_outer_ring(upstream):
+    state = _replan(upstream, _info(), _info(max_travel_hours=2.0))
+
+    [(radius_m, inner_radius_m, ids)] = upstream.streams
+    assert (radius_m, inner_radius_m) == (24000.0, 12000.0)
+    assert ids == ALL.ids[4:8]
+    assert upstream.filtered == ALL.ids[4:8]
+    assert {i for _, i in upstream.routes} == set(ALL.ids[4:8])
+    assert set(upstream.weather) == set(ALL.ids[4:8])
+    assert state.plan.searched.ids == ALL.ids[:8]
+    assert state.plan.pool.ids == ALL.ids[:8]
+
+
+def test_radius_shrink_filters_the_pool_without_calls(upstream):
+    state = _replan(upstream, _info(max_travel_hours=2.0), _info())
+
+    assert upstream.streams == []
+    assert upstream.filtered == []
+    assert upstream.routes == []
+    assert upstream.weather == []
+    assert state.plan.pool.ids == ALL.ids[:4]
+    assert [c.place_info.id for c in state.candidates] == ALL.ids[:3]
+
+
+def test_departure_time_change_refetches_car_routes_only(upstream):
+    state = _replan(upstream, _info(), _info(departure_datetime=AFTERNOON))
+
+    assert upstream.streams == []
+    assert upstream.filtered == []
+    assert upstream.weather == []
+    assert sorted(upstream.routes) == [(Transportation.CAR, i) for i in ALL.ids[:4]]
+    assert np.all(state.plan.pool.car_hours == 0.2)
+
+
+def test_departure_date_change_refetches_routes_and_weather(upstream):
+    state = _replan(upstream, _info(), _info(departure_datetime=NEXT_DAY))
+
+    assert upstream.streams == []
+    assert sorted(upstream.routes) == [(Transportation.CAR, i) for i in ALL.ids[:4]]
+    assert sorted(upstream.weather) == ALL.ids[:4]
+    assert np.all(state.plan.pool.weather_code == WeatherCode.RAIN_MODERATE)
+    assert all(
+        c.daily_weather.weather_code == WeatherCode.RAIN_MODERATE
+        for c in state.candidates
+    )
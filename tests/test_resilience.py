@@ -0,0 +1,167 @@
+import json
+
+import pytest
+
+from utils import http, resilience
+from utils.deadline import Deadline
+from utils.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RetryPolicy
+from utils.transport import TransportError, TransportResponse
+
+HOST = "retry.test"
+URL = f"https://{HOST}/v1"
+POLICY = RetryPolicy(max_attempts=3, base_delay=0.2, max_delay=2.0)
+
+
+def _response(status: int, body=None, headers=None) -> TransportResponse:
+    return TransportResponse(status, json.dumps(body or {}).encode(), headers or {})
+
+
+class FakeTransport:
+    """
+    미리 넣어 둔 응답(또는 TransportError)을 순서대로 돌려준다
+    """
+
+    name = "fake"
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.methods = []
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.methods.append(method)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    재시도 대기를 실제로 기다리지 않고 기록한다.
+    jitter는 상한을 그대로 쓰게 해서 백오프 상한을 확인한다.
+    """
+    recorded = []
+    monkeypatch.setattr(http.time, "sleep", recorded.append)
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setitem(resilience.RETRY_POLICIES, HOST, POLICY)
+    return recorded
+
+
+def _install(monkeypatch, *responses) -> FakeTransport:
+    transport = FakeTransport(*responses)
+    monkeypatch.setattr(http, "get_transport", lambda host: transport)
+    return transport
+
+
+def test_backoff_is_capped_exponential_with_full_jitter(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(
+        resilience.random, "uniform", lambda low, high: bounds.append((low, high))
+    )
+    for attempt in range(6):
+        POLICY.backoff(attempt)
+    assert bounds == [(0.0, c) for c in (0.2, 0.4, 0.8, 1.6, 2.0, 2.0)]
+
+
+def test_get_is_retried_until_max_attempts(monkeypatch, sleeps):
+    transport = _install(
+        monkeypatch, _response(503), TransportError("reset"), _response(503)
+    )
+
+    assert http._request("GET", URL) is None
+    assert len(transport.methods) == POLICY.max_attempts
+    assert sleeps == [0.2, 0.4]
+
+
+def test_retry_returns_the_first_success(monkeypatch, sleeps):
+    _install(monkeypatch, _response(502), _response(200, {"ok": True}))
+
+    assert http._request("GET", URL) == {"ok": True}
+    assert sleeps == [0.2]
+
+
+def test_client_errors_are_not_retried(monkeypatch, sleeps):
+    transport = _install(monkeypatch, _response(404))
+
+    assert http._request("GET", URL) is None
+    assert len(transport.methods) == 1 and sleeps == []
+
+
+def test_post_is_not_retried(monkeypatch, sleeps):
+    transport = _install(monkeypatch, _response(503), _response(200))
+
+    assert http._request("POST", URL, json={"q": 1}) is None
+    assert transport.methods == ["POST"] and sleeps == []
+
+
+def test_retry_after_overrides_backoff(monkeypatch, sleeps):
+    _install(
+        monkeypatch,
+        _response(429, headers={"Retry-After": "1"}),
+        _response(200, {"ok": True}),
+    )
+
+    assert http._request("GET", URL, deadline=Deadline.start(5)) == {"ok": True}
+    assert sleeps == [1.0]
+
+
+@pytest.mark.parametrize(
+    "retry_after, budget",
+    [
+        ("3", 2.0),  # deadline 안에 다시 보낼 수 없다
+        ("10", 60.0),  # MAX_RETRY_AFTER_SECONDS보다 길다
+    ],
+)
+def test_long_retry_after_gives_up(monkeypatch, sleeps, retry_after, budget):
+    transport = _install(
+        monkeypatch,
+        _response(429, headers={"Retry-After": retry_after}),
+        _response(200),
+    )
+
+    assert http._request("GET", URL, deadline=Deadline.start(budget)) is None
+    assert len(transport.methods) == 1 and sleeps == []
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(resilience, "time", clock)
+    breaker = CircuitBreaker(HOST, failure_threshold=3, reset_timeout=30)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow_request()
+
+    clock.now += 30
+    assert breaker.allow_request()  # 시험 요청 하나만
+    assert breaker.state == HALF_OPEN and not breaker.allow_request()
+    breaker.record_failure()  # 시험 요청 실패 -> 다시 OPEN
+    assert breaker.state == OPEN and not breaker.allow_request()
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.allow_request()
+
+
+def test_open_breaker_fast_fails_without_sending(monkeypatch, sleeps):
+    transport = _install(monkeypatch, *[_response(503)] * 6)
+    breaker = resilience.get_circuit_breaker(HOST)
+    breaker.failure_threshold = 3
+
+    assert http._request("GET", URL) is None  # 3회 실패 -> OPEN
+    assert breaker.state == OPEN
+    assert http._request("GET", URL) is None
+    assert len(transport.methods) == 3
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from domain.batch import CandidateBatch
+from domain.enums import PlaceCategory, Transportation, WeatherCode
+from domain.models import DailyWeather, DestinationCandidate, ParsedUserInfo, PlaceInfo
+from domain.plan import TripPlan
+from services import result_cache
+
+CAR = (Transportation.CAR,)
+ORIGIN = (37.4813, 126.9975)
+
+
+@pytest.fixture(autouse=True)
+def results(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_ENABLED", True)
+    monkeypatch.setattr(result_cache, "_results", result_cache.TTLCache("test", 60))
+
+
+def _info(max_travel_hours: float = 6.0) -> ParsedUserInfo:
+    return ParsedUserInfo(
+        origin="방배동",
+        departure_datetime="2025-11-15T09:00:00",
+        max_travel_hours=max_travel_hours,
+        destination_categories=[PlaceCategory.TOURIST_SPOT],
+        transportation=Transportation.CAR,
+    )
+
+
+def _candidate(i: int, hours: float) -> DestinationCandidate:
+    return DestinationCandidate(
+        place_info=PlaceInfo(str(i), f"place {i}", "", 37.5, 127.0),
+        round_trip_hours={Transportation.CAR: hours, Transportation.PUBLIC: None},
+        daily_weather=DailyWeather(WeatherCode.CLEAR, 15.0, 5.0, 0.0),
+        outdoor_score=80,
+    )
+
+
+def _plan(info: ParsedUserInfo) -> TripPlan:
+    pool = CandidateBatch.from_columns(
+        ["0", "1"], ["place 0", "place 1"], ["", ""], np.full(2, 37.5), np.full(2, 127)
+    )
+    for i in range(2):
+        pool.set_round_trip_hours(i, {Transportation.CAR: 1.0}, CAR)
+    return TripPlan(
+        info=info,
+        origin_lat=ORIGIN[0],
+        origin_lon=ORIGIN[1],
+        radius_m=10_000.0,
+        searched=pool.take(slice(None)),
+        pool=pool,
+    )
+
+
+def test_fewer_than_k_candidates_is_a_miss():
+    info = _info(6.9)
+    result_cache.put_result(_plan(info), [_candidate(0, 1.0), _candidate(1, 3.2)])
+
+    assert len(result_cache.get_result(info, *ORIGIN, k=2).candidates) == 2
+    assert result_cache.get_result(info, *ORIGIN, k=3) is None
+    # 같은 여행 시간 구간이지만 한도(3시간)를 넘는 후보를 빼면 k개가 안 된다
+    assert len(result_cache.get_result(_info(6.0), *ORIGIN, k=1).candidates) == 1
+    assert result_cache.get_result(_info(6.0), *ORIGIN, k=2) is None
+
+
+def test_same_origin_keeps_routes():
+    info = _info()
+    result_cache.put_result(_plan(info), [_candidate(0, 1.0)])
+
+    plan = result_cache.get_result(info, *ORIGIN, k=1).plan
+
+    assert (plan.origin_lat, plan.origin_lon) == ORIGIN
+    assert plan.pool.car_routed.all()
+
+
+def test_other_origin_in_tile_resets_routes():
+    info = _info()
+    cached = _plan(info)
+    result_cache.put_result(cached, [_candidate(0, 1.0)])
+    origin = (ORIGIN[0] + 0.001, ORIGIN[1])
+
+    plan = result_cache.get_result(info, *origin, k=1).plan
+
+    assert (plan.origin_lat, plan.origin_lon) == origin
+    assert not plan.pool.car_routed.any()
+    assert not plan.searched.car_routed.any()
+    # 보관한 계획은 그대로
+    again = result_cache.get_result(info, *ORIGIN, k=1).plan
+    assert again.pool.car_routed.all()
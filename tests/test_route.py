@@ -0,0 +1,54 @@
+import math
+
+import pytest
+
+from apis import route
+from domain.enums import Transportation
+
+COORDS = (37.4813, 126.9975, 37.55, 127.05)
+
+
+@pytest.fixture
+def odsay(monkeypatch):
+    """
+    safe_get 대신 responses에서 응답을 하나씩 꺼내 준다
+    """
+    responses = []
+    monkeypatch.setattr(route, "safe_get", lambda url, **kwargs: responses.pop(0))
+    monkeypatch.setattr(route, "_routes", route.TTLCache("test", 60))
+    return responses
+
+
+def _public(**kwargs):
+    return route.get_round_trip_hours(
+        Transportation.PUBLIC, "2025-11-15T09:00:00", *COORDS, **kwargs
+    )[Transportation.PUBLIC]
+
+
+def test_measured_route_is_round_trip_hours(odsay):
+    odsay.append({"result": {"path": [{"info": {"totalTime": 45}}]}})
+    assert _public() == pytest.approx(1.5)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"error": [{"code": "500", "message": "server error"}]},
+        {"result": {"path": [{}]}},
+        {"result": {"path": [{"info": {}}]}},
+    ],
+)
+def test_error_response_is_not_a_route_and_is_not_kept(odsay, payload):
+    odsay.append(payload)
+    assert _public() is None
+    # 보관하지 않았으므로 다시 조회한다
+    odsay.append({"result": {"path": [{"info": {"totalTime": 30}}]}})
+    assert _public() == pytest.approx(1.0)
+
+
+def test_no_route_uses_callers_fallback(odsay):
+    odsay.append({"result": {"path": []}})
+    assert _public() == route.NO_ROUTE_FALLBACK_HOURS
+    # 경로 없음은 보관하고, 호출자마다 다르게 본다
+    assert math.isnan(_public(no_route_hours=math.nan))
+    assert not odsay
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from domain.batch import CandidateBatch
+from domain.enums import Transportation
+from services.travel_input_service import _derive_route, _promote_leaders
+
+CAR = (Transportation.CAR,)
+
+
+def _batch(n: int) -> CandidateBatch:
+    return CandidateBatch.from_columns(
+        [str(i) for i in range(n)],
+        [f"place {i}" for i in range(n)],
+        [""] * n,
+        np.full(n, 37.5),
+        np.full(n, 127.0),
+    )
+
+
+def test_member_uses_leader_speed():
+    candidates = _batch(2)
+    candidates.set_round_trip_hours(0, {Transportation.CAR: 1.0}, CAR)
+    distances_km = np.array([30.0, 31.5])
+
+    assert _derive_route(candidates, 1, 0, distances_km, CAR)
+    # 대표 평균 속도 60km/h로 왕복 3km 더
+    assert candidates.car_hours[1] == pytest.approx(1.05)
+    assert candidates.car_routed[1]
+
+
+def test_member_of_unrouted_leader_is_left_for_its_own_lookup():
+    candidates = _batch(2)
+    candidates.set_round_trip_hours(0, {Transportation.CAR: None}, CAR)
+
+    assert not _derive_route(candidates, 1, 0, np.array([30.0, 30.1]), CAR)
+    assert not candidates.car_routed[1]
+
+
+def test_first_routed_member_becomes_leader():
+    candidates = _batch(4)
+    candidates.set_round_trip_hours(0, {Transportation.CAR: None}, CAR)
+    candidates.set_round_trip_hours(1, {Transportation.CAR: None}, CAR)
+    candidates.set_round_trip_hours(2, {Transportation.CAR: 1.0}, CAR)
+    leaders = np.zeros(4, dtype=np.intp)
+
+    _promote_leaders(candidates, leaders, [1, 2], CAR)
+
+    assert leaders.tolist() == [0, 2, 2, 2]
@@ -0,0 +1,241 @@
+import math
+import multiprocessing
+import os
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from domain.batch import CandidateBatch
+from domain.enums import PlaceCategory, Transportation, WeatherCode
+from domain.models import (
+    ChatSessionState,
+    DailyWeather,
+    DestinationCandidate,
+    ParsedUserInfo,
+    PlaceInfo,
+)
+from domain.plan import TripPlan
+from services import session_store
+from services.session_store import (
+    FileSessionStore,
+    InMemorySessionStore,
+    SqliteSessionStore,
+    decode_session,
+    encode_session,
+)
+
+INFO = ParsedUserInfo(
+    origin="방배동",
+    departure_datetime="2025-11-15T09:00:00",
+    max_travel_hours=4.0,
+    destination_categories=[PlaceCategory.TOURIST_SPOT],
+    transportation=None,
+    likes=["자연"],
+)
+
+
+def _candidate(i: int, hours: dict) -> DestinationCandidate:
+    return DestinationCandidate(
+        place_info=PlaceInfo(f"id{i}", f"장소 {i}", f"서울 {i}길", 37.5 + i, 127.0 + i),
+        round_trip_hours=hours,
+        daily_weather=DailyWeather(WeatherCode.CLEAR, 20.5, 10.0, 0.0),
+        outdoor_score=90 - i,
+        reason=None if i else "가까운 공원",
+    )
+
+
+def _state(with_plan: bool) -> ChatSessionState:
+    candidates = [
+        _candidate(0, {Transportation.CAR: 1.5, Transportation.PUBLIC: 2.25}),
+        # 경로를 못 구한 교통수단(None)과 조회하지 않은 교통수단(키 없음)
+        _candidate(1, {Transportation.CAR: None}),
+        _candidate(2, {}),
+    ]
+    plan = None
+    if with_plan:
+        searched = CandidateBatch.from_columns(
+            ["a", "b", "c"],
+            ["공원", "미술관", "호수"],
+            ["주소 a", "주소 b", "주소 c"],
+            np.array([37.1, 37.2, 37.3]),
+            np.array([127.1, 127.2, 127.3]),
+        )
+        pool = searched.take(np.array([2, 0]))
+        pool.set_round_trip_hours(0, {Transportation.CAR: 1.25}, [Transportation.CAR])
+        pool.set_round_trip_hours(1, {Transportation.CAR: None}, [Transportation.CAR])
+        pool.set_weather(0, DailyWeather(WeatherCode.RAIN_LIGHT, 15.0, 8.0, 3.5))
+        plan = TripPlan(INFO, 37.48, 126.99, 36000.0, searched, pool)
+    return ChatSessionState(INFO, candidates, current_index=1, plan=plan)
+
+
+def _assert_batches_equal(a: CandidateBatch, b: CandidateBatch) -> None:
+    assert (a.ids, a.names, a.addresses) == (b.ids, b.names, b.addresses)
+    for column in (
+        "lat",
+        "lon",
+        "car_hours",
+        "public_hours",
+        "car_routed",
+        "public_routed",
+        "weather_code",
+        "t_max",
+        "t_min",
+        "precipitation",
+    ):
+        np.testing.assert_array_equal(getattr(a, column), getattr(b, column))
+
+
+def test_round_trip_without_plan():
+    state = _state(with_plan=False)
+    decoded = decode_session(encode_session(state))
+    assert decoded == state
+    assert decoded.candidates[1].round_trip_hours == {Transportation.CAR: None}
+    assert decoded.candidates[2].round_trip_hours == {}
+
+
+def test_round_trip_with_plan():
+    state = _state(with_plan=True)
+    decoded = decode_session(encode_session(state))
+
+    assert decoded.candidates == state.candidates
+    plan, expected = decoded.plan, state.plan
+    assert plan.info == expected.info
+    assert (plan.origin_lat, plan.origin_lon, plan.radius_m) == (37.48, 126.99, 36000.0)
+    _assert_batches_equal(plan.searched, expected.searched)
+    _assert_batches_equal(plan.pool, expected.pool)
+    assert math.isnan(plan.pool.car_hours[1]) and plan.pool.car_routed[1]
+    assert plan.pool.weather(0) == expected.pool.weather(0)
+
+
+def test_round_trip_empty_session():
+    state = ChatSessionState()
+    assert decode_session(encode_session(state)) == state
+
+
+def test_reads_v1_payload():
+    # v1 = v2에서 plan 유무 바이트가 없는 형식
+    state = _state(with_plan=False)
+    raw = zlib.decompress(encode_session(state))
+    v1 = struct.pack("<2sB", b"CS", 1) + raw[3:-1]
+    decoded = decode_session(zlib.compress(v1))
+    assert decoded == state and decoded.plan is None
+
+
+def test_rejects_unknown_version():
+    raw = zlib.decompress(encode_session(ChatSessionState()))
+    with pytest.raises(ValueError):
+        decode_session(zlib.compress(struct.pack("<2sB", b"CS", 99) + raw[3:]))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(session_store, "time", clock)
+    return clock
+
+
+def test_memory_store_ttl_and_lru(clock):
+    store = InMemorySessionStore(ttl_seconds=10, max_sessions=2)
+    store.put("a", _state(False))
+    store.put("b", ChatSessionState())
+    clock.now += 5
+    assert store.get("a") is not None  # a를 최근 사용으로 갱신
+    store.put("c", ChatSessionState())  # 가장 오래 안 쓴 b를 버린다
+    assert store.get("b") is None and len(store) == 2
+
+    clock.now += 8
+    assert store.get("c") is not None  # c만 갱신
+    clock.now += 5  # a: 13초 전 사용, c: 5초 전 사용
+    assert store.evict_expired() == 1
+    assert store.get("a") is None and store.get("c") is not None
+
+
+def test_sqlite_store_ttl(tmp_path, clock):
+    store = SqliteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=10)
+    state = _state(with_plan=True)
+    store.put("a", state)
+    store.put("b", ChatSessionState())
+    assert store.get("a").candidates == state.candidates
+
+    clock.now += 8
+    assert store.get("a") is not None  # 조회하면 마지막 사용 시각이 갱신된다
+    clock.now += 5
+    assert store.get("b") is None
+    assert len(store) == 1
+    assert store.evict_expired() == 1
+    store.delete("a")
+    assert len(store) == 0
+
+
+def test_file_store_ttl(tmp_path):
+    store = FileSessionStore(str(tmp_path), ttl_seconds=10)
+    store.put("a", _state(with_plan=False))
+    store.put("b", ChatSessionState())
+    old = os.path.getmtime(tmp_path / "b.bin") - 60
+    os.utime(tmp_path / "b.bin", (old, old))
+
+    assert store.get("a") == _state(with_plan=False)
+    assert len(store) == 1  # 만료된 b는 지우기 전에도 세지 않는다
+    assert store.evict_expired() == 1
+    assert len(store) == 1
+    assert store.get("b") is None
+    assert not any(p.suffix == ".tmp" for p in tmp_path.iterdir())
+
+
+def test_file_store_rejects_path_like_ids(tmp_path):
+    store = FileSessionStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.put("../escape", ChatSessionState())
+
+
+def _increment(spec: str, turns: int) -> None:
+    store = session_store.create_session_store(spec)
+    for _ in range(turns):
+        with store.lock("shared"):
+            state = store.get("shared") or ChatSessionState()
+            state.current_index += 1
+            store.put("shared", state)
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "file"])
+def test_turns_on_one_session_do_not_overlap_across_processes(tmp_path, kind):
+    spec = (
+        f"sqlite:{tmp_path / 'sessions.db'}" if kind == "sqlite" else f"file:{tmp_path}"
+    )
+    session_store.create_session_store(spec)  # 테이블/디렉터리를 먼저 만든다
+    workers = [
+        multiprocessing.Process(target=_increment, args=(spec, 25)) for _ in range(4)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    store = session_store.create_session_store(spec)
+    assert store.get("shared").current_index == 100
+
+
+def test_file_store_removes_only_unused_locks(tmp_path):
+    store = FileSessionStore(str(tmp_path))
+    with store.lock("a"):
+        store.put("a", ChatSessionState())
+    with store.lock("b"):
+        pass  # 세션을 만들지 않은 턴
+    with store.lock("c"):
+        store.evict_expired()
+        assert (tmp_path / "c.lock").exists()  # 쥐고 있는 lock은 남긴다
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.bin", "a.lock", "c.lock"]
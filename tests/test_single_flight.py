@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+
+from utils import http, rate_limiter
+from utils.deadline import Deadline
+from utils.single_flight import SingleFlight
+
+
+def test_async_follower_shares_thread_leader():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("thread")
+        started.set()
+        time.sleep(0.1)
+        return {"n": 1}
+
+    leader = threading.Thread(target=flight.do, args=("k", slow))
+    leader.start()
+    started.wait()
+
+    async def follow():
+        async def fn():
+            calls.append("async")
+            return {"n": 2}
+
+        return await flight.do_async("k", fn)
+
+    result, shared = asyncio.run(follow())
+    leader.join()
+    assert (result, shared) == ({"n": 1}, True)
+    assert calls == ["thread"]
+
+
+def test_thread_follower_shares_async_leader():
+    flight = SingleFlight()
+    started = threading.Event()
+    results = []
+
+    async def lead():
+        async def fn():
+            started.set()
+            await asyncio.sleep(0.1)
+            return [1]
+
+        return await flight.do_async("k", fn)
+
+    leader = threading.Thread(target=lambda: results.append(asyncio.run(lead())))
+    leader.start()
+    started.wait()
+    assert flight.do("k", lambda: [2]) == ([1], True)
+    leader.join()
+    assert results == [([1], False)]
+
+
+def test_follower_retries_when_leader_gave_up(monkeypatch):
+    started = threading.Event()
+    sent = []
+
+    def fake_request(method, url, timeout=None, deadline=None, **kwargs):
+        sent.append(deadline)
+        if len(sent) == 1:
+            started.set()
+            time.sleep(0.1)
+            return None  # leader의 deadline이 바닥나 포기
+        return {"ok": True}
+
+    monkeypatch.setattr(http, "_request", fake_request)
+    leader = threading.Thread(
+        target=http.safe_get,
+        args=("https://example.test/a",),
+        kwargs={"deadline": Deadline.start(0.1)},
+    )
+    leader.start()
+    started.wait()
+    assert http.safe_get("https://example.test/a", deadline=Deadline.start(5)) == {
+        "ok": True
+    }
+    leader.join()
+    assert len(sent) == 2
+
+
+def test_live_call_does_not_follow_low_priority_leader(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def fake_request(method, url, timeout=None, deadline=None, **kwargs):
+        low = rate_limiter.is_low_priority()
+        sent.append(low)
+        if low:
+            started.set()
+            release.wait(5)
+        return {"low": low}
+
+    def warm():
+        with rate_limiter.low_priority():
+            http.safe_get("https://example.test/b")
+
+    monkeypatch.setattr(http, "_request", fake_request)
+    leader = threading.Thread(target=warm)
+    leader.start()
+    started.wait()
+    assert http.safe_get("https://example.test/b") == {"low": False}
+    release.set()
+    leader.join()
+    assert sent == [True, False]
+
+
+def _lead_and_follow(monkeypatch, method: str, leader_deadline: float) -> list:
+    """
+    leader가 None으로 끝나는 동안 follower가 같은 요청을 보내고, 보낸 요청 목록을 돌려준다
+    """
+    started = threading.Event()
+    sent = []
+
+    def fake_request(method, url, timeout=None, deadline=None, **kwargs):
+        sent.append(method)
+        if len(sent) == 1:
+            started.set()
+            time.sleep(0.1)
+        return None
+
+    monkeypatch.setattr(http, "_request", fake_request)
+    send = http.safe_get if method == "GET" else http.safe_post
+    leader = threading.Thread(
+        target=send,
+        args=("https://example.test/c",),
+        kwargs={"deadline": Deadline.start(leader_deadline)},
+    )
+    leader.start()
+    started.wait()
+    assert send("https://example.test/c", deadline=Deadline.start(5)) is None
+    leader.join()
+    return sent
+
+
+def test_follower_does_not_repeat_a_failure_with_time_left(monkeypatch):
+    # 4xx, 회로 차단기, 쿼터 소진처럼 시간과 상관없는 실패
+    assert _lead_and_follow(monkeypatch, "GET", leader_deadline=5) == ["GET"]
+
+
+def test_post_is_never_resent_by_a_follower(monkeypatch):
+    assert _lead_and_follow(monkeypatch, "POST", leader_deadline=0.1) == ["POST"]
@@ -0,0 +1,32 @@
+import asyncio
+
+import httpx
+
+from utils.transport import AsyncHttpxTransport
+
+
+def _mock_transport():
+    return httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+
+
+def test_async_client_is_closed_when_loop_shuts_down(monkeypatch):
+    transport = AsyncHttpxTransport(http2=False)
+    original = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx,
+        "AsyncClient",
+        lambda **kwargs: original(transport=_mock_transport()),
+    )
+
+    async def fetch():
+        res = await transport.request("GET", "https://example.test/", (1.0, 1.0))
+        return res.status_code, await transport._client()
+
+    status, first = asyncio.run(fetch())
+    assert status == 200
+    assert first.is_closed
+
+    # 끝난 루프의 클라이언트를 다음 루프가 받지 않는다
+    assert len(transport._clients) == 0
+    _, second = asyncio.run(fetch())
+    assert second is not first and second.is_closed
@@ -0,0 +1,60 @@
+import pytest
+
+from apis import weather
+
+DEPARTURE = "2025-11-15T09:00:00"
+
+
+def _location(code: int) -> dict:
+    return {
+        "daily": {
+            "time": ["2025-11-15"],
+            "weathercode": [code],
+            "temperature_2m_max": [15.0],
+            "temperature_2m_min": [5.0],
+            "precipitation_sum": [0.0],
+        }
+    }
+
+
+@pytest.fixture
+def requests_sent(monkeypatch):
+    """
+    safe_get 대신 요청마다 지점 수를 기록하고, 위도가 음수인 지점이 있는 요청은 실패시킨다
+    """
+    sent = []
+
+    def fake_get(url, params=None, deadline=None, **kwargs):
+        lats = [float(v) for v in params["latitude"].split(",")]
+        sent.append(len(lats))
+        if any(lat < 0 for lat in lats):
+            return None
+        results = [_location(0) for _ in lats]
+        return results[0] if len(results) == 1 else results
+
+    monkeypatch.setattr(weather, "safe_get", fake_get)
+    monkeypatch.setattr(weather, "_forecasts", weather.TTLCache("test", 60))
+    return sent
+
+
+def test_same_grid_cell_is_fetched_once(requests_sent):
+    coords = [(37.5, 127.0), (37.5001, 127.0001), (35.1, 129.0)]
+
+    forecasts = weather.get_weather_batch(coords, DEPARTURE)
+
+    assert requests_sent == [2]
+    assert all(f is not None for f in forecasts)
+    assert forecasts[0] == forecasts[1]
+
+
+def test_failed_chunk_does_not_blank_others(requests_sent, monkeypatch):
+    monkeypatch.setattr(weather, "WEATHER_BATCH_MAX_LOCATIONS", 2)
+    coords = [(37.0 + i * 0.1, 127.0) for i in range(4)] + [(-33.9, 151.2)]
+
+    forecasts = weather.get_weather_batch(coords, DEPARTURE)
+
+    assert requests_sent == [2, 2, 1]
+    assert [f is not None for f in forecasts] == [True, True, True, True, False]
+    # 받은 예보만 보관한다
+    assert weather.get_weather_batch(coords[:4], DEPARTURE) == forecasts[:4]
+    assert requests_sent == [2, 2, 1]
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from domain.enums import WeatherCode
+from domain.models import DailyWeather
+from utils.weather_helper import (
+    calculate_outdoor_score,
+    calculate_outdoor_scores,
+    get_daily_index,
+)
+
+# 구간 경계값과 그 양옆을 모두 포함한다
+T_MAX = [-3.0, 0.0, 0.1, 5.0, 5.1, 20.0, 27.9, 28.0, 31.9, 32.0, 35.0]
+T_MIN = [-8.0, -5.0, -4.9, 0.0, 0.1, 15.0]
+PRECIPITATION = [0.0, 1.0, 1.1, 5.0, 5.1, 10.0, 10.1, 40.0]
+
+
+def test_batch_matches_scalar_on_all_boundaries():
+    rows = list(itertools.product(WeatherCode, T_MAX, T_MIN, PRECIPITATION))
+    codes, t_max, t_min, precipitation = (np.array(c) for c in zip(*rows))
+
+    scores = calculate_outdoor_scores(codes, t_max, t_min, precipitation)
+
+    expected = [
+        calculate_outdoor_score(DailyWeather(code, hi, lo, rain))
+        for code, hi, lo, rain in rows
+    ]
+    np.testing.assert_array_equal(scores, expected)
+
+
+def test_scores_are_clipped():
+    worst = calculate_outdoor_scores(
+        [WeatherCode.THUNDERSTORM], [35.0], [-10.0], [50.0]
+    )
+    best = calculate_outdoor_scores([WeatherCode.CLEAR], [20.0], [10.0], [0.0])
+    assert worst.tolist() == [0] and best.tolist() == [100]
+
+
+def test_empty_batch():
+    assert calculate_outdoor_scores([], [], [], []).shape == (0,)
+
+
+def test_get_daily_index():
+    days = ["2025-11-15", "2025-11-16", "2025-11-17"]
+    assert get_daily_index("2025-11-17", days) == 2
+    with pytest.raises(ValueError):
+        get_daily_index("2025-11-18", days)
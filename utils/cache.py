@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from utils.metrics import CACHE_REQUESTS
+
+
+class TTLCache:
+    """
+    스레드 안전한 TTL + LRU 캐시 (프로세스 안에서 공유).
+    - 항목은 넣은 시점부터 ttl_seconds 동안 유효 (monotonic 기준)
+    - max_entries를 넘으면 가장 오래 안 쓴 항목부터 버린다
+    - 조회마다 CACHE_REQUESTS{cache=name}에 hit/miss를 기록한다
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if entry is None else "hit")
+        return None if entry is None else entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], Any]) -> Any | None:
+        """
+        없으면 load()로 가져와서 넣는다. load()가 None이면(조회 실패) 넣지 않는다.
+        """
+        value = self.get(key)
+        if value is None:
+            value = load()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        지표를 남기지 않는 유효 항목 확인
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,56 @@
+import os
+import time
+from dataclasses import dataclass
+
+# 한 턴(유저 입력 1회)에 허용하는 최대 응답 시간(초)
+TURN_SLO_SECONDS = float(os.getenv("TURN_SLO_SECONDS", "8"))
+
+# 남은 예산이 이보다 작으면 새 업스트림 호출을 시작하지 않는다.
+MIN_CALL_SECONDS = 0.3
+
+
+@dataclass
+class Deadline:
+    """
+    턴 단위 지연 예산(latency budget).
+
+    main.run_chatbot에서 턴마다 하나 만들고,
+    파이프라인 → apis/* → safe_get/safe_post 까지 그대로 넘겨준다.
+    각 호출은 남은 시간만큼만 timeout을 잡고,
+    예산이 바닥나면 호출 자체를 건너뛴다.
+    """
+
+    expires_at: float  # time.monotonic() 기준 만료 시각
+
+    @classmethod
+    def start(cls, budget_seconds: float = TURN_SLO_SECONDS) -> "Deadline":
+        return cls(expires_at=time.monotonic() + budget_seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() < MIN_CALL_SECONDS
+
+    def timeout(self, cap: float | None = None) -> float:
+        """
+        남은 예산을 호출 timeout(초)으로 돌려준다. cap이 있으면 그보다 크지 않게.
+        """
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """
+        뒤 단계(LLM 랭킹, 최종 출력 등)를 위해 seconds만큼 남겨둔 하위 deadline.
+        """
+        return Deadline(expires_at=self.expires_at - seconds)
+
+
+def openai_request_options(deadline: Deadline | None) -> dict:
+    """
+    OpenAI client.with_options()에 넘길 옵션.
+    deadline이 있으면 남은 시간으로 timeout을 잡고, 재시도로 예산을 넘기지 않도록 retry를 끈다.
+    """
+    if deadline is None:
+        return {}
+    return {"timeout": deadline.timeout(), "max_retries": 0}
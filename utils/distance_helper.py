@@ -1,9 +1,47 @@
 import math
 from typing import List, Optional, Tuple
 
+import numpy as np
+
 from domain.enums import Transportation
 
 MAX_KAKAO_RADIUS_M = 20_000.0
+EARTH_RADIUS_M = 6_371_008.8
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON = 111.320
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    두 좌표 사이의 직선(대원) 거리(m)
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def to_local_km(
+    lat: np.ndarray, lon: np.ndarray, origin_lat: float, origin_lon: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    기준점 주변의 평면 좌표(km): x는 동쪽, y는 북쪽 (make_ring_centers와 같은 근사)
+    """
+    x = (lon - origin_lon) * KM_PER_DEG_LON * math.cos(math.radians(origin_lat))
+    y = (lat - origin_lat) * KM_PER_DEG_LAT
+    return x, y
+
+
+def from_local_km(
+    x: np.ndarray, y: np.ndarray, origin_lat: float, origin_lon: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    lat = origin_lat + y / KM_PER_DEG_LAT
+    lon = origin_lon + x / (KM_PER_DEG_LON * math.cos(math.radians(origin_lat)))
+    return lat, lon
 
 
 def max_travel_hours_to_radius_m(
@@ -77,9 +115,9 @@ def make_ring_centers(
 
     for deg in range(0, 360, 60):
         rad = math.radians(deg)
-        delta_lat = (center_distance_km * math.cos(rad)) / 110.574
+        delta_lat = (center_distance_km * math.cos(rad)) / KM_PER_DEG_LAT
         delta_lon = (center_distance_km * math.sin(rad)) / (
-            111.320 * math.cos(math.radians(origin_lat))
+            KM_PER_DEG_LON * math.cos(math.radians(origin_lat))
         )
         lat = origin_lat + delta_lat
         lon = origin_lon + delta_lon
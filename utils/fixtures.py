@@ -0,0 +1,453 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from utils.transport import TransportResponse, set_transport_wrapper
+
+# 업스트림 응답 기록/재생 설정
+# - FIXTURE_MODE: "record"(실제 호출 + 저장) | "replay"(저장된 응답만 사용) | ""(끔)
+# - FIXTURE_DIR: fixture 저장 위치 (요청 내용 해시로 파일 이름을 정한다)
+# - FIXTURE_LATENCY: 재생 시 주입할 호스트별 지연. 쉼표로 구분한 "host=spec" 목록
+#     spec: "recorded"(기록된 소요 시간) | "120"(고정 ms) | "120~0.4"(중앙값 ms ~ 로그정규 sigma)
+#     host "*"는 기본값, LLM 호출은 "api.openai.com"
+#     예: FIXTURE_LATENCY="api.openai.com=900~0.3,dapi.kakao.com=60,*=recorded"
+# - FIXTURE_SEED: 지연 샘플링 시드
+# - FIXTURE_NOW: 현재 시각 고정 (ISO 8601). 프롬프트에 현재 시각이 들어가므로
+#     기록과 재생에서 같은 값을 써야 LLM fixture 키가 일치한다.
+FIXTURE_MODE = os.getenv("FIXTURE_MODE", "")
+FIXTURE_DIR = os.getenv("FIXTURE_DIR", "fixtures")
+FIXTURE_LATENCY = os.getenv("FIXTURE_LATENCY", "")
+FIXTURE_SEED = int(os.getenv("FIXTURE_SEED", "0"))
+FIXTURE_NOW = os.getenv("FIXTURE_NOW", "")
+
+LLM_HOST = "api.openai.com"
+
+# 키 계산과 저장에서 제외할 인증 정보 (소문자)
+SECRET_HEADERS = {"authorization", "x-goog-api-key"}
+SECRET_PARAMS = {"apikey", "key"}
+
+# 재생 시 돌려줄 응답 헤더 (재시도 로직이 보는 것만)
+KEPT_HEADERS = ("content-type", "retry-after")
+
+
+MISS_RESPONSE = TransportResponse(status_code=404, content=b"fixture miss")
+
+
+class FixtureMissError(LookupError):
+    """
+    replay 모드에서 요청에 해당하는 fixture가 없는 경우.
+    """
+
+
+# -----------------------------
+# 주입 지연
+# -----------------------------
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    kind: str  # "recorded" | "fixed" | "lognormal"
+    median: float = 0.0  # 초
+    sigma: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        spec = spec.strip()
+        if spec == "recorded":
+            return cls("recorded")
+        if "~" in spec:
+            median_ms, sigma = spec.split("~", 1)
+            return cls("lognormal", float(median_ms) / 1000, float(sigma))
+        return cls("fixed", float(spec) / 1000)
+
+    def sample(self, rng: random.Random, recorded: float) -> float:
+        if self.kind == "recorded":
+            return recorded
+        if self.kind == "lognormal":
+            return self.median * rng.lognormvariate(0.0, self.sigma)
+        return self.median
+
+
+def parse_latency_spec(spec: str) -> dict[str, LatencyModel]:
+    models: dict[str, LatencyModel] = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        host, _, model = item.partition("=")
+        models[host.strip()] = LatencyModel.parse(model)
+    return models
+
+
+class LatencyInjector:
+    def __init__(self, models: dict[str, LatencyModel], seed: int = FIXTURE_SEED):
+        self.models = models
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self, host: str, recorded: float) -> float:
+        model = self.models.get(host) or self.models.get("*")
+        if model is None:
+            return 0.0
+        with self._lock:
+            return max(0.0, model.sample(self._rng, recorded))
+
+
+# -----------------------------
+# 저장소
+# -----------------------------
+
+
+def _canonical(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def fixture_key(kind: str, request: dict) -> str:
+    return hashlib.sha256(f"{kind}:{_canonical(request)}".encode()).hexdigest()
+
+
+class FixtureStore:
+    """
+    요청 내용 해시(content-addressed)로 응답을 저장하는 디렉터리.
+    경로: {root}/{kind}/{key[:2]}/{key}.json
+    """
+
+    def __init__(self, root: str = FIXTURE_DIR):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, key[:2], f"{key}.json")
+
+    def load(self, kind: str, key: str) -> dict | None:
+        try:
+            with open(self._path(kind, key), encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            record = None
+        with self._lock:
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return record
+
+    def load_meta(self) -> dict:
+        try:
+            with open(os.path.join(self.root, "meta.json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_meta(self, meta: dict) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=1)
+
+    def save(self, kind: str, key: str, record: dict) -> None:
+        path = self._path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+
+# -----------------------------
+# HTTP 기록/재생 (transport 래퍼)
+# -----------------------------
+
+
+def _http_request(method: str, url: str, headers, params, json_body, data) -> dict:
+    headers = {
+        k: v for k, v in (headers or {}).items() if k.lower() not in SECRET_HEADERS
+    }
+    params = sorted(
+        (str(k), str(v))
+        for k, v in (params or {}).items()
+        if k.lower() not in SECRET_PARAMS
+    )
+    return {
+        "method": method.upper(),
+        "url": url,
+        "params": params,
+        "headers": headers,
+        "json": json_body,
+        "data": data,
+    }
+
+
+def _encode_response(res: TransportResponse, elapsed: float) -> dict:
+    try:
+        body, encoding = res.content.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError:
+        body, encoding = base64.b64encode(res.content).decode("ascii"), "base64"
+
+    lowered = {k.lower(): v for k, v in res.headers.items()}
+    return {
+        "status_code": res.status_code,
+        "headers": {k: lowered[k] for k in KEPT_HEADERS if k in lowered},
+        "http_version": res.http_version,
+        "body": body,
+        "encoding": encoding,
+        "elapsed": round(elapsed, 4),
+    }
+
+
+def _decode_response(response: dict) -> TransportResponse:
+    if response["encoding"] == "base64":
+        content = base64.b64decode(response["body"])
+    else:
+        content = response["body"].encode("utf-8")
+    return TransportResponse(
+        status_code=response["status_code"],
+        content=content,
+        headers=response["headers"],
+        http_version=response.get("http_version", "HTTP/1.1"),
+    )
+
+
+class _FixtureTransport:
+    def __init__(self, store: FixtureStore, inner=None, latency=None):
+        self.store = store
+        self.inner = inner
+        self.latency = latency or LatencyInjector({})
+        self.name = f"{inner.name}+record" if inner is not None else "replay"
+
+    def _replay(self, key: str, request: dict) -> tuple[TransportResponse, float]:
+        record = self.store.load("http", key)
+        if record is None:
+            # 재시도/회로 차단 대상이 아닌 404로 응답 (safe_get은 None)
+            print(f"[fixtures] miss {request['method']} {request['url']}")
+            return MISS_RESPONSE, 0.0
+        response = record["response"]
+        host = urlsplit(request["url"]).hostname or ""
+        return _decode_response(response), self.latency.delay(
+            host, response.get("elapsed", 0.0)
+        )
+
+    def _record(self, key, request, res: TransportResponse, elapsed) -> None:
+        self.store.save(
+            "http",
+            key,
+            {
+                "key": key,
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "request": request,
+                "response": _encode_response(res, elapsed),
+            },
+        )
+
+
+class RecordReplayTransport(_FixtureTransport):
+    """
+    동기 전송 래퍼. inner가 있으면 실제 요청 후 기록(record), 없으면 재생(replay).
+    """
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers=None,
+        params=None,
+        json=None,
+        data=None,
+    ) -> TransportResponse:
+        request = _http_request(method, url, headers, params, json, data)
+        key = fixture_key("http", request)
+
+        if self.inner is None:
+            res, delay = self._replay(key, request)
+            time.sleep(delay)
+            return res
+
+        start = time.perf_counter()
+        res = self.inner.request(
+            method,
+            url,
+            timeout=timeout,
+            headers=headers,
+            params=params,
+            json=json,
+            data=data,
+        )
+        self._record(key, request, res, time.perf_counter() - start)
+        return res
+
+
+class AsyncRecordReplayTransport(_FixtureTransport):
+    """
+    RecordReplayTransport의 asyncio 버전.
+    """
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout,
+        headers=None,
+        params=None,
+        json=None,
+        data=None,
+    ) -> TransportResponse:
+        request = _http_request(method, url, headers, params, json, data)
+        key = fixture_key("http", request)
+
+        if self.inner is None:
+            res, delay = self._replay(key, request)
+            await asyncio.sleep(delay)
+            return res
+
+        start = time.perf_counter()
+        res = await self.inner.request(
+            method,
+            url,
+            timeout=timeout,
+            headers=headers,
+            params=params,
+            json=json,
+            data=data,
+        )
+        await asyncio.to_thread(
+            self._record, key, request, res, time.perf_counter() - start
+        )
+        return res
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+# -----------------------------
+# LLM 기록/재생 (utils.llm에서 사용)
+# -----------------------------
+
+
+def _llm_request(method: str, name: str, kwargs: dict) -> dict:
+    request = {"method": method, "name": name}
+    for k, v in kwargs.items():
+        # text_format은 pydantic 클래스이므로 이름만 키에 넣는다
+        request[k] = v.__name__ if isinstance(v, type) else v
+    return json.loads(_canonical(request))
+
+
+def replay_llm(method: str, name: str, kwargs: dict) -> tuple[dict, float]:
+    """
+    저장된 LLM 응답(model_dump)과 주입할 지연을 반환한다. 없으면 FixtureMissError.
+    """
+    request = _llm_request(method, name, kwargs)
+    key = fixture_key("llm", request)
+    record = _state.store.load("llm", key)
+    if record is None:
+        print(f"[fixtures] miss llm {name}")
+        raise FixtureMissError(f"llm fixture miss: {name} {key[:12]}")
+    return record["response"], _state.latency.delay(LLM_HOST, record["elapsed"])
+
+
+def record_llm(method: str, name: str, kwargs: dict, response, elapsed: float):
+    request = _llm_request(method, name, kwargs)
+    key = fixture_key("llm", request)
+    _state.store.save(
+        "llm",
+        key,
+        {
+            "key": key,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "request": request,
+            "response": response.model_dump(mode="json"),
+            "elapsed": round(elapsed, 4),
+        },
+    )
+
+
+# -----------------------------
+# 설정
+# -----------------------------
+
+
+class _FixtureState:
+    def __init__(self):
+        self.mode = ""
+        self.store: FixtureStore | None = None
+        self.latency = LatencyInjector({})
+        self.now: datetime | None = None
+
+
+_state = _FixtureState()
+
+
+def fixture_mode() -> str:
+    return _state.mode
+
+
+def fixture_store() -> FixtureStore | None:
+    return _state.store
+
+
+def fixture_now() -> datetime:
+    """
+    현재 시각. FIXTURE_NOW(또는 install_fixtures의 now)가 설정되어 있으면 그 값.
+    """
+    return _state.now or datetime.now()
+
+
+def install_fixtures(
+    mode: str,
+    root: str = FIXTURE_DIR,
+    latency: str = FIXTURE_LATENCY,
+    seed: int = FIXTURE_SEED,
+    now: str = FIXTURE_NOW,
+) -> None:
+    """
+    record/replay 모드를 켠다 (mode=""이면 끈다).
+    - record: 실제 업스트림/LLM 호출 결과를 root에 저장
+    - replay: 네트워크 없이 저장된 응답만 사용 (latency에 따라 지연 주입)
+    - 두 모드 모두 현재 시각을 고정한다 (now, 없으면 meta.json에 기록된 값)
+    """
+    if mode not in ("", "record", "replay"):
+        raise ValueError(f"알 수 없는 FIXTURE_MODE: {mode}")
+
+    _state.mode = mode
+    _state.store = FixtureStore(root) if mode else None
+    _state.latency = LatencyInjector(parse_latency_spec(latency), seed)
+    _state.now = datetime.fromisoformat(now) if now else None
+
+    if not mode:
+        set_transport_wrapper(None)
+        return
+
+    # 기록 당시 고정한 시각을 meta.json에 남겨 재생 때 그대로 쓴다
+    meta = _state.store.load_meta()
+    if _state.now is None and meta.get("now"):
+        _state.now = datetime.fromisoformat(meta["now"])
+    if mode == "record":
+        if _state.now is None:
+            _state.now = datetime.now().replace(second=0, microsecond=0)
+        _state.store.save_meta({**meta, "now": _state.now.isoformat()})
+
+    def wrap(transport):
+        inner = transport if mode == "record" else None
+        cls = (
+            AsyncRecordReplayTransport
+            if asyncio.iscoroutinefunction(transport.request)
+            else RecordReplayTransport
+        )
+        return cls(_state.store, inner, _state.latency)
+
+    set_transport_wrapper(wrap)
+    print(f"[fixtures] {mode} mode ({root})")
+
+
+def install_fixtures_from_env() -> None:
+    if FIXTURE_MODE:
+        install_fixtures(FIXTURE_MODE)
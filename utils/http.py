@@ -1,90 +1,552 @@
-import requests
-from requests.exceptions import HTTPError, RequestException
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from utils.deadline import Deadline
+from utils.metrics import UPSTREAM_BYTES, UPSTREAM_REQUESTS, UPSTREAM_SECONDS
+from utils.rate_limiter import acquire_permit, is_low_priority
+from utils.resilience import (
+    MAX_RETRY_AFTER_SECONDS,
+    RetryPolicy,
+    get_circuit_breaker,
+    get_retry_policy,
+    parse_retry_after,
+    record_event,
+)
+from utils.single_flight import SingleFlight
+from utils.tracing import Span, span
+from utils.transport import (
+    TransportError,
+    TransportResponse,
+    get_async_transport,
+    get_transport,
+    get_transport_name,
+)
 
 DEFAULT_CONNECT_TIMEOUT = 10
 DEFAULT_READ_TIMEOUT = 15
 
+# 회로 차단기에서 '업스트림 장애'로 간주하는 상태 코드 (그 외 4xx는 요청 쪽 문제)
+FAILURE_STATUSES = (429, 500, 502, 503, 504)
+
+# 프로세스 전체에서 동시에 진행 중인 업스트림 요청 수 상한 (0이면 제한 없음).
+# 호스트별 속도 제한(rate_limiter)과 별개로, 배치 평가처럼 많은 턴을 동시에 돌릴 때
+# 열린 연결/스레드 수를 묶어 두는 용도.
+MAX_UPSTREAM_CONCURRENCY = int(os.getenv("MAX_UPSTREAM_CONCURRENCY", "0"))
+
+_upstream_slots: threading.BoundedSemaphore | None = (
+    threading.BoundedSemaphore(MAX_UPSTREAM_CONCURRENCY)
+    if MAX_UPSTREAM_CONCURRENCY > 0
+    else None
+)
+
 
-def safe_get(url, headers=None, params=None, timeout: int | tuple = None):
+def set_upstream_concurrency(limit: int) -> None:
     """
-    안전하게 GET 요청을 보내고 JSON 응답을 반환합니다.
-    - timeout: int 또는 (connect_timeout, read_timeout) 튜플
-      기본값은 (5초 연결, 15초 읽기)
+    업스트림 동시 요청 상한을 바꾼다 (0이면 제한 없음).
+    """
+    global _upstream_slots
+    _upstream_slots = threading.BoundedSemaphore(limit) if limit > 0 else None
+
+
+@contextmanager
+def _upstream_slot() -> Iterator[None]:
+    slots = _upstream_slots
+    if slots is None:
+        yield
+        return
+    slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def _resolve_timeout(
+    timeout: int | tuple | None, deadline: Deadline | None
+) -> tuple[float, float]:
+    """
+    timeout 인자를 (connect_timeout, read_timeout) 튜플로 정규화하고,
+    deadline이 있으면 남은 예산을 넘지 않도록 양쪽 모두 자른다.
+    """
+    if timeout is None:
+        timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    elif isinstance(timeout, (int, float)):
+        timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, timeout)
+    else:
+        timeout_tuple = timeout  # (conn, read)
+
+    if deadline is not None:
+        remaining = deadline.remaining()
+        timeout_tuple = (
+            min(timeout_tuple[0], remaining),
+            min(timeout_tuple[1], remaining),
+        )
+
+    return timeout_tuple
+
+
+def _admit(url: str, host: str, deadline: Deadline | None, breaker) -> bool:
+    """
+    요청을 보내기 전 검사: deadline 만료, 회로 차단기 상태.
+    """
+    if deadline is not None and deadline.expired():
+        print(f"[API deadline exceeded] {url} -> skipped")
+        return False
+
+    if not breaker.allow_request():
+        record_event("fast_fail", host)
+        print(f"[API circuit open] {url} -> fast-fail")
+        return False
+
+    return True
+
+
+def _evaluate(
+    url: str, res: TransportResponse, breaker, policy: RetryPolicy, attempt: int
+):
+    """
+    한 번의 시도 결과를 해석한다.
+    반환: (JSON 결과 또는 None, 재시도 대기 시간 또는 None)
+    대기 시간이 None이면 더 시도하지 않는다.
     """
+    if res.status_code < 400:
+        try:
+            data = res.json()
+        except ValueError as e:
+            print(f"[API request error] {url} -> invalid JSON: {e}")
+            breaker.record_failure()
+            return None, policy.backoff(attempt)
+        breaker.record_success()
+        return data, None
+
+    status = res.status_code
+    print(f"[API HTTP error] {url} -> {status}")
     try:
-        # timeout 설정 처리
-        if timeout is None:
-            timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
-        elif isinstance(timeout, int):
-            timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, timeout)
+        print("[API error body]:", res.text)
+    except Exception:
+        pass
+
+    if status in FAILURE_STATUSES:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+    if status not in policy.retry_statuses:
+        return None, None
+
+    retry_after = parse_retry_after(res.headers.get("Retry-After"))
+    if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+        return None, None
+    return None, retry_after if retry_after is not None else policy.backoff(attempt)
+
+
+def _should_retry(
+    url: str,
+    host: str,
+    attempt: int,
+    delay: float,
+    policy: RetryPolicy,
+    breaker,
+    deadline: Deadline | None,
+) -> bool:
+    # 마지막 시도였거나, 기다리면 예산을 넘기는 경우 포기
+    if attempt + 1 >= policy.max_attempts:
+        return False
+    if deadline is not None and delay >= deadline.remaining():
+        return False
+    if not breaker.allow_request():
+        record_event("fast_fail", host)
+        print(f"[API circuit open] {url} -> fast-fail")
+        return False
+
+    record_event("retry", host)
+    return True
+
+
+def _request(
+    method: str,
+    url: str,
+    timeout: int | tuple | None = None,
+    deadline: Deadline | None = None,
+    **kwargs,
+):
+    """
+    safe_get / safe_post 공통 로직.
+    - 호스트별 회로 차단기가 열려 있으면 요청 없이 바로 None (fast-fail)
+    - GET은 호스트별 RetryPolicy에 따라 지수 백오프 + jitter로 재시도
+      (429/503의 Retry-After 헤더가 있으면 그 값을 우선)
+    - 재시도 대기가 deadline을 넘기면 더 시도하지 않는다
+    - 매 시도 전에 호스트별 토큰 버킷/일일 쿼터를 확인하고,
+      잠깐 기다려도 허용되지 않으면 429를 맞는 대신 None으로 degrade
+    - 실제 전송은 호스트별로 설정된 백엔드(requests / httpx)가 담당
+    """
+    host = urlsplit(url).hostname or ""
+    start = time.perf_counter()
+    with span(f"http {method} {host}", path=urlsplit(url).path) as s:
+        result = _send(method, url, host, timeout, deadline, s, **kwargs)
+        s.attributes.setdefault("outcome", "ok" if result is not None else "failed")
+    _record_metrics(method, host, s, time.perf_counter() - start)
+    return result
+
+
+def _record_metrics(method: str, host: str, s: Span, elapsed: float) -> None:
+    outcome = s.attributes["outcome"]
+    UPSTREAM_REQUESTS.inc(host=host, method=method, outcome=outcome)
+    if outcome != "skipped" and outcome != "rate_limited":
+        UPSTREAM_SECONDS.observe(elapsed, host=host, method=method)
+    if "bytes" in s.attributes:
+        UPSTREAM_BYTES.inc(s.attributes["bytes"], host=host)
+
+
+def _record_attempt(s: Span, attempt: int, res: TransportResponse) -> None:
+    s.set(attempts=attempt + 1, **{"http.status": res.status_code})
+    s.add("bytes", len(res.content))
+
+
+def _send(
+    method: str,
+    url: str,
+    host: str,
+    timeout: int | tuple | None,
+    deadline: Deadline | None,
+    s: Span,
+    **kwargs,
+):
+    breaker = get_circuit_breaker(host)
+    if not _admit(url, host, deadline, breaker):
+        s.set(outcome="skipped")
+        return None
+
+    policy = get_retry_policy(host, method)
+    transport = get_transport(host)
+
+    for attempt in range(policy.max_attempts):
+        if not acquire_permit(host, deadline):
+            print(f"[API rate limited] {url} -> skipped")
+            s.set(outcome="rate_limited")
+            return None
+
+        try:
+            with _upstream_slot():
+                res = transport.request(
+                    method, url, timeout=_resolve_timeout(timeout, deadline), **kwargs
+                )
+        except TransportError as e:
+            print(f"[API request error] {url} -> {e}")
+            breaker.record_failure()
+            s.set(attempts=attempt + 1)
+            result, delay = None, policy.backoff(attempt)
         else:
-            timeout_tuple = timeout  # (conn, read)
+            _record_attempt(s, attempt, res)
+            result, delay = _evaluate(url, res, breaker, policy, attempt)
+
+        if delay is None:
+            return result
+        if not _should_retry(url, host, attempt, delay, policy, breaker, deadline):
+            return None
+        time.sleep(delay)
+
+    return None
+
 
-        res = requests.get(
-            url,
-            headers=headers,
-            params=params,
-            timeout=timeout_tuple,
+async def _async_request(
+    method: str,
+    url: str,
+    timeout: int | tuple | None = None,
+    deadline: Deadline | None = None,
+    **kwargs,
+):
+    """
+    _request의 asyncio 버전. httpx 백엔드 호스트는 AsyncClient로 직접 보내고,
+    requests 백엔드 호스트는 스레드에서 _request를 실행한다.
+    """
+    host = urlsplit(url).hostname or ""
+    if get_transport_name(host) != "httpx":
+        return await asyncio.to_thread(
+            _request, method, url, timeout, deadline, **kwargs
         )
-        res.raise_for_status()
-        return res.json()
 
-    except HTTPError as e:
-        status = e.response.status_code if e.response is not None else "N/A"
-        print(f"[API HTTP error] {url} -> {status} {e}")
+    start = time.perf_counter()
+    with span(f"http {method} {host}", path=urlsplit(url).path) as s:
+        result = await _async_send(method, url, host, timeout, deadline, s, **kwargs)
+        s.attributes.setdefault("outcome", "ok" if result is not None else "failed")
+    _record_metrics(method, host, s, time.perf_counter() - start)
+    return result
 
-        if e.response is not None:
-            try:
-                print("[API error body]:", e.response.text)
-            except Exception:
-                pass
 
+async def _async_send(
+    method: str,
+    url: str,
+    host: str,
+    timeout: int | tuple | None,
+    deadline: Deadline | None,
+    s: Span,
+    **kwargs,
+):
+    breaker = get_circuit_breaker(host)
+    if not _admit(url, host, deadline, breaker):
+        s.set(outcome="skipped")
         return None
 
-    except RequestException as e:
-        print(f"[API request error] {url} -> {e}")
+    policy = get_retry_policy(host, method)
+    transport = get_async_transport()
+
+    for attempt in range(policy.max_attempts):
+        # 토큰 대기는 블로킹이므로 스레드에서
+        if not await asyncio.to_thread(acquire_permit, host, deadline):
+            print(f"[API rate limited] {url} -> skipped")
+            s.set(outcome="rate_limited")
+            return None
+
+        slots = _upstream_slots
+        if slots is not None:
+            await asyncio.to_thread(slots.acquire)
+        try:
+            res = await transport.request(
+                method, url, timeout=_resolve_timeout(timeout, deadline), **kwargs
+            )
+        except TransportError as e:
+            print(f"[API request error] {url} -> {e}")
+            breaker.record_failure()
+            s.set(attempts=attempt + 1)
+            result, delay = None, policy.backoff(attempt)
+        else:
+            _record_attempt(s, attempt, res)
+            result, delay = _evaluate(url, res, breaker, policy, attempt)
+        finally:
+            if slots is not None:
+                slots.release()
+
+        if delay is None:
+            return result
+        if not _should_retry(url, host, attempt, delay, policy, breaker, deadline):
+            return None
+        await asyncio.sleep(delay)
+
+    return None
+
+
+# 동일한 요청이 동시에 진행 중이면 하나만 보내고 결과를 공유한다.
+# (스레드 호출자와 asyncio 호출자가 같은 진행 중 호출을 나눠 쓴다)
+_in_flight = SingleFlight()
+
+
+def _digest(value) -> str | None:
+    if value is None:
         return None
+    if isinstance(value, (bytes, str)):
+        raw = value.encode() if isinstance(value, str) else value
+    else:
+        raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+        raw = raw.encode()
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _request_key(
+    method: str, url: str, headers=None, params=None, json=None, data=None
+) -> tuple:
+    """
+    single-flight 키: (method, URL, 정규화된 params, body 해시, header 해시, 저우선순위).
+    Google Places는 같은 URL이라도 X-Goog-FieldMask 헤더로 응답이 달라지므로
+    헤더도 키에 포함한다.
+    저우선순위 호출(캐시 워밍)은 토큰이 남을 때까지 오래 기다리므로 라이브 호출과 합치지
+    않는다 (라이브 호출이 워밍 호출을 따라 기다리지 않도록).
+    """
+    normalized_params = tuple(
+        sorted((str(k), str(v)) for k, v in (params or {}).items())
+    )
+    body = json if json is not None else data
+    return (
+        method.upper(),
+        url,
+        normalized_params,
+        _digest(body),
+        _digest(headers),
+        is_low_priority(),
+    )
+
+
+def _coalesced_request(
+    method: str,
+    url: str,
+    timeout: int | tuple | None = None,
+    deadline: Deadline | None = None,
+    **kwargs,
+):
+    key = _request_key(method, url, **kwargs)
+    wait = deadline.remaining() if deadline is not None else None
+
+    def send():
+        return _request(method, url, timeout=timeout, deadline=deadline, **kwargs)
+
+    def lead():
+        result = send()
+        return result, _gave_up_on_deadline(result, deadline)
+
+    outcome, shared = _in_flight.do(key, lead, timeout=wait)
+    result, leader_out_of_time = _unpack(outcome)
+    if shared:
+        record_event("coalesced", urlsplit(url).hostname or "")
+        if _retry_as_leader(method, result, leader_out_of_time, deadline):
+            result = send()
+    return result
+
+
+def _gave_up_on_deadline(result, deadline: Deadline | None) -> bool:
+    """
+    leader가 결과 없이 끝난 이유가 자기 deadline이 바닥난 것인지
+    (4xx, 회로 차단기, 쿼터/예산 소진은 follower가 다시 보내도 같은 결과다)
+    """
+    return result is None and deadline is not None and deadline.expired()
+
+
+def _unpack(outcome) -> tuple:
+    """
+    single-flight 결과 -> (응답, leader가 시간이 없어 포기했는지).
+    follower가 기다리다 timeout이거나 leader가 취소되면 outcome은 None이다
+    (leader가 끝까지 보내지 못했으므로 시간 부족으로 본다).
+    """
+    return outcome if outcome is not None else (None, True)
+
+
+def _retry_as_leader(
+    method: str, result, leader_out_of_time: bool, deadline: Deadline | None
+) -> bool:
+    """
+    나눠 받은 결과가 None이면 직접 다시 보낼지.
+    leader는 자기 deadline으로 보내므로, 남은 시간이 더 많은 follower는 leader가
+    시간 부족으로 포기한 요청만 직접 보낸다. 멱등하지 않은 요청(POST)은 다시 보내지 않는다.
+    """
+    return (
+        result is None
+        and leader_out_of_time
+        and method.upper() == "GET"
+        and (deadline is None or not deadline.expired())
+    )
+
+
+async def _async_coalesced_request(
+    method: str,
+    url: str,
+    timeout: int | tuple | None = None,
+    deadline: Deadline | None = None,
+    **kwargs,
+):
+    key = _request_key(method, url, **kwargs)
+    wait = deadline.remaining() if deadline is not None else None
+
+    def send():
+        return _async_request(method, url, timeout=timeout, deadline=deadline, **kwargs)
+
+    async def lead():
+        result = await send()
+        return result, _gave_up_on_deadline(result, deadline)
+
+    outcome, shared = await _in_flight.do_async(key, lead, timeout=wait)
+    result, leader_out_of_time = _unpack(outcome)
+    if shared:
+        record_event("coalesced", urlsplit(url).hostname or "")
+        if _retry_as_leader(method, result, leader_out_of_time, deadline):
+            result = await send()
+    return result
+
+
+def safe_get(
+    url,
+    headers=None,
+    params=None,
+    timeout: int | tuple = None,
+    deadline: Deadline | None = None,
+):
+    """
+    안전하게 GET 요청을 보내고 JSON 응답을 반환합니다.
+    - timeout: int 또는 (connect_timeout, read_timeout) 튜플
+      기본값은 (10초 연결, 15초 읽기)
+    - deadline: 턴 단위 지연 예산. 남은 시간만큼만 기다리고,
+      이미 만료됐다면 요청하지 않고 None을 반환합니다.
+    - 일시적 오류(5xx, 429, 네트워크 오류)는 호스트별 정책에 따라 재시도합니다.
+    - 동일한 요청이 이미 진행 중이면 새로 보내지 않고 그 결과를 공유합니다.
+      (먼저 보낸 요청이 자기 deadline이 바닥나 포기했고 이쪽 deadline이 남았으면
+      직접 다시 보냅니다)
+    """
+    return _coalesced_request(
+        "GET",
+        url,
+        timeout=timeout,
+        deadline=deadline,
+        headers=headers,
+        params=params,
+    )
 
 
 def safe_post(
-    url, headers=None, json_body=None, data=None, timeout: int | tuple = None
+    url,
+    headers=None,
+    json_body=None,
+    data=None,
+    timeout: int | tuple = None,
+    deadline: Deadline | None = None,
 ):
     """
     안전하게 POST 요청을 보내고 JSON 응답을 반환합니다.
     - timeout: int 또는 (connect_timeout, read_timeout)
-      기본값은 (5초 연결, 15초 읽기)
+      기본값은 (10초 연결, 15초 읽기)
+    - deadline: 턴 단위 지연 예산 (safe_get과 동일)
+    - POST는 멱등하지 않을 수 있으므로 재시도하지 않습니다.
     """
-    try:
-        # timeout 설정 처리
-        if timeout is None:
-            timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
-        elif isinstance(timeout, int):
-            timeout_tuple = (DEFAULT_CONNECT_TIMEOUT, timeout)
-        else:
-            timeout_tuple = timeout  # (conn, read)
-
-        res = requests.post(
-            url,
-            headers=headers,
-            json=json_body,
-            data=data,
-            timeout=timeout_tuple,
-        )
-        res.raise_for_status()
-        return res.json()
+    return _coalesced_request(
+        "POST",
+        url,
+        timeout=timeout,
+        deadline=deadline,
+        headers=headers,
+        json=json_body,
+        data=data,
+    )
 
-    except HTTPError as e:
-        status = e.response.status_code if e.response is not None else "N/A"
-        print(f"[API HTTP error] {url} -> {status} {e}")
 
-        if e.response is not None:
-            try:
-                print("[API error body]:", e.response.text)
-            except Exception:
-                pass
+async def async_safe_get(
+    url,
+    headers=None,
+    params=None,
+    timeout: int | tuple = None,
+    deadline: Deadline | None = None,
+):
+    """
+    asyncio 호출자용 safe_get.
+    동일 요청은 스레드 호출자, 다른 이벤트 루프의 호출자와도 하나로 합친다.
+    httpx 백엔드 호스트는 AsyncClient(HTTP/2)로 직접 보내고,
+    그 외 호스트는 스레드에서 보낸다.
+    """
+    return await _async_coalesced_request(
+        "GET", url, timeout=timeout, deadline=deadline, headers=headers, params=params
+    )
 
-        return None
 
-    except RequestException as e:
-        print(f"[API request error] {url} -> {e}")
-        return None
+async def async_safe_post(
+    url,
+    headers=None,
+    json_body=None,
+    data=None,
+    timeout: int | tuple = None,
+    deadline: Deadline | None = None,
+):
+    """
+    asyncio 호출자용 safe_post (async_safe_get과 동일한 방식).
+    """
+    return await _async_coalesced_request(
+        "POST",
+        url,
+        timeout=timeout,
+        deadline=deadline,
+        headers=headers,
+        json=json_body,
+        data=data,
+    )
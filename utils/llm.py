@@ -0,0 +1,96 @@
+import time
+from typing import Callable
+
+from openai import OpenAI
+from openai.types.responses import ParsedResponse, Response
+
+from utils.deadline import Deadline, openai_request_options
+from utils.fixtures import fixture_mode, record_llm, replay_llm
+from utils.metrics import LLM_REQUESTS, LLM_SECONDS, LLM_TOKENS
+from utils.tracing import Span, span
+
+# 실제 OpenAI 호출 대신 응답을 만드는 함수 (부하 테스트용 stub 등, benchmarks.stubs 참고)
+# 시그니처: (method: "parse" | "create", name, kwargs, deadline) -> 응답 객체
+_llm_override: Callable | None = None
+
+
+def set_llm_override(override: Callable | None) -> None:
+    global _llm_override
+    _llm_override = override
+
+
+def _record_usage(s: Span, name: str, response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    s.set(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        tokens=usage.total_tokens,
+    )
+    LLM_TOKENS.inc(usage.input_tokens, name=name, kind="input")
+    LLM_TOKENS.inc(usage.output_tokens, name=name, kind="output")
+
+
+def _replay(method: str, name: str, kwargs: dict):
+    """
+    fixture에 저장된 응답을 원래 타입(Response / ParsedResponse[text_format])으로 복원.
+    """
+    data, delay = replay_llm(method, name, kwargs)
+    time.sleep(delay)
+    if method == "parse":
+        return ParsedResponse[kwargs["text_format"]].model_validate(data)
+    return Response.model_validate(data)
+
+
+def _call(
+    client: OpenAI,
+    method: str,
+    name: str,
+    deadline: Deadline | None,
+    **kwargs,
+):
+    start = time.perf_counter()
+    outcome = "error"
+    mode = fixture_mode()
+    try:
+        with span(f"llm {name}", model=kwargs.get("model")) as s:
+            if _llm_override is not None:
+                response = _llm_override(method, name, kwargs, deadline)
+            elif mode == "replay":
+                response = _replay(method, name, kwargs)
+            else:
+                llm = client.with_options(**openai_request_options(deadline))
+                response = getattr(llm.responses, method)(**kwargs)
+                if mode == "record":
+                    record_llm(
+                        method, name, kwargs, response, time.perf_counter() - start
+                    )
+            _record_usage(s, name, response)
+        outcome = "ok"
+        return response
+    finally:
+        LLM_SECONDS.observe(time.perf_counter() - start, name=name)
+        LLM_REQUESTS.inc(name=name, outcome=outcome)
+
+
+def responses_parse(
+    client: OpenAI, name: str, deadline: Deadline | None = None, **kwargs
+):
+    """
+    client.responses.parse 공통 래퍼.
+    - deadline이 있으면 남은 예산으로 timeout 적용 (재시도 없음)
+    - "llm {name}" span으로 소요 시간과 토큰 수를 기록
+    - 호출 수/소요 시간/토큰 사용량 지표 기록
+    - FIXTURE_MODE에 따라 응답을 기록하거나 저장된 응답을 재생 (utils.fixtures)
+    """
+    return _call(client, "parse", name, deadline, **kwargs)
+
+
+def responses_create(
+    client: OpenAI, name: str, deadline: Deadline | None = None, **kwargs
+):
+    """
+    client.responses.create 공통 래퍼 (responses_parse와 동일).
+    """
+    return _call(client, "create", name, deadline, **kwargs)
@@ -0,0 +1,385 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+# 지표 노출 설정
+# - METRICS_PORT: 설정하면 해당 포트에서 GET /metrics (Prometheus 텍스트 형식) 제공
+# - METRICS_DUMP_FILE: 설정하면 METRICS_DUMP_INTERVAL초마다 같은 내용을 파일로 기록
+METRICS_PORT = os.getenv("METRICS_PORT")
+METRICS_DUMP_FILE = os.getenv("METRICS_DUMP_FILE")
+METRICS_DUMP_INTERVAL = float(os.getenv("METRICS_DUMP_INTERVAL", "15"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+COUNT_BUCKETS = (0, 1, 5, 10, 20, 30, 50, 100, 200, 500)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict) -> tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], key: tuple[str, ...], **extra) -> str:
+    pairs = list(zip(labelnames, key)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def items(self) -> list[tuple[dict[str, str], float]]:
+        with self._lock:
+            snapshot = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), value) for key, value in snapshot]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+                )
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    고정 버킷 히스토그램. observe는 bisect 한 번 + 락 한 번이라 hot path에서도 가볍다.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [버킷별 개수..., +Inf 개수], 합계, 개수
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+                self._counts[key] = counts
+                self._sums[key] = 0.0
+            counts[index] += 1
+            self._sums[key] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            return sum(self._counts.get(_label_key(self.labelnames, labels), []))
+
+    def quantile(self, q: float, **labels) -> float | None:
+        """
+        버킷 안에서 선형 보간한 분위수 추정 (Prometheus histogram_quantile과 같은 방식).
+        """
+        with self._lock:
+            counts = list(self._counts.get(_label_key(self.labelnames, labels), []))
+        total = sum(counts)
+        if total == 0:
+            return None
+
+        rank = q * total
+        cumulative = 0
+        for i, c in enumerate(counts):
+            if cumulative + c >= rank and c > 0:
+                if i == len(self.buckets):
+                    return float(self.buckets[-1])
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i]
+                return lower + (upper - lower) * (rank - cumulative) / c
+            cumulative += c
+        return float(self.buckets[-1])
+
+    def label_sets(self) -> list[dict[str, str]]:
+        with self._lock:
+            keys = list(self._counts)
+        return [dict(zip(self.labelnames, key)) for key in keys]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            snapshot = [
+                (key, list(counts), self._sums[key])
+                for key, counts in sorted(self._counts.items())
+            ]
+        for key, counts, total_sum in snapshot:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                labels = _format_labels(self.labelnames, key, le=f"{bound:g}")
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            labels = _format_labels(self.labelnames, key, le="+Inf")
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            plain = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{plain} {total_sum:g}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help, tuple(labelnames), **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Prometheus 텍스트 exposition 형식 (version 0.0.4)
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# -----------------------------
+# 공용 지표
+# -----------------------------
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "upstream_request_seconds",
+    "safe_get/safe_post 호출 소요 시간 (재시도 포함)",
+    ("host", "method"),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "upstream_requests_total",
+    "업스트림 호출 수 (outcome: ok | failed | skipped | rate_limited)",
+    ("host", "method", "outcome"),
+)
+UPSTREAM_BYTES = REGISTRY.counter(
+    "upstream_response_bytes_total", "업스트림 응답 바이트 수", ("host",)
+)
+UPSTREAM_EVENTS = REGISTRY.counter(
+    "upstream_events_total",
+    "재시도/회로 차단/fast-fail/rate limit/예산 초과/coalesced 이벤트 수",
+    ("event", "host"),
+)
+
+LLM_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "OpenAI 호출 소요 시간", ("name",)
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "llm_requests_total", "OpenAI 호출 수 (outcome: ok | error)", ("name", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "OpenAI 토큰 사용량", ("name", "kind")
+)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "pipeline_stage_seconds", "추천 파이프라인 단계별 소요 시간", ("stage",)
+)
+STAGE_CANDIDATES = REGISTRY.histogram(
+    "pipeline_stage_candidates",
+    "각 단계 이후 남은 후보 수",
+    ("stage",),
+    buckets=COUNT_BUCKETS,
+)
+
+ENRICH_AVOIDED_CALLS = REGISTRY.counter(
+    "enrich_avoided_calls_total",
+    "6단계 조기 종료로 하지 않은 경로/날씨 조회 수 (kind: route | weather, 후보 기준)",
+    ("kind",),
+)
+SPECULATIVE_ROWS = REGISTRY.counter(
+    "enrich_speculative_rows_total",
+    "5단계 필터링 중에 미리 경로/날씨를 조회한 후보 수 (outcome: used | discarded)",
+    ("outcome",),
+)
+
+ROUTE_CLUSTER_SAVED = REGISTRY.counter(
+    "route_cluster_saved_total",
+    "클러스터 대표의 경로로 추정해 하지 않은 경로 조회 수 (후보 기준)",
+)
+ROUTE_CLUSTER_ERROR = REGISTRY.histogram(
+    "route_cluster_error_minutes",
+    "검증 샘플에서 클러스터로 추정한 왕복 시간의 절대 오차(분)",
+    ("transport",),
+    buckets=(1, 2, 5, 10, 15, 30, 60),
+)
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "캐시 조회 수 (result: hit | miss)", ("cache", "result")
+)
+
+TURN_SECONDS = REGISTRY.histogram(
+    "turn_seconds", "턴(유저 입력 1회) 전체 소요 시간", ("intent",)
+)
+TURN_LLM_TOKENS = REGISTRY.histogram(
+    "turn_llm_tokens", "턴당 LLM 토큰 사용량", (), buckets=TOKEN_BUCKETS
+)
+TURN_UPSTREAM_CALLS = REGISTRY.histogram(
+    "turn_upstream_calls",
+    "턴당 실제로 보낸 업스트림 호출 수",
+    (),
+    buckets=(5, 10, 20, 40, 80, 150, 300),
+)
+TURN_UPSTREAM_COST = REGISTRY.histogram(
+    "turn_upstream_cost_krw",
+    "턴당 업스트림 호출 비용(원)",
+    (),
+    buckets=(0, 10, 50, 100, 200, 400, 800),
+)
+BUDGET_SKIPPED = REGISTRY.counter(
+    "budget_skipped_candidates_total",
+    "경로를 조회하지 않고 건너뛴 후보 수 (reason: target | budget | deadline)",
+    ("reason",),
+)
+
+
+def cache_hit_ratio(cache: str) -> float | None:
+    hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+    misses = CACHE_REQUESTS.value(cache=cache, result="miss")
+    total = hits + misses
+    return hits / total if total else None
+
+
+# -----------------------------
+# 노출: /metrics 엔드포인트, 주기적 덤프 파일
+# -----------------------------
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 접근 로그는 출력하지 않음
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    백그라운드 스레드에서 GET /metrics 를 제공하는 HTTP 서버를 띄운다.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"[metrics] http://{host}:{port}/metrics")
+    return server
+
+
+def dump_metrics(path: str) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp_path, path)
+
+
+def start_metrics_dump(path: str, interval: float = METRICS_DUMP_INTERVAL) -> None:
+    """
+    interval초마다 지표를 파일로 덮어쓴다 (데몬 스레드).
+    """
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                dump_metrics(path)
+            except OSError as e:
+                print(f"[metrics] 덤프 실패: {e}")
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+def start_metrics_exporters() -> None:
+    """
+    환경 변수(METRICS_PORT, METRICS_DUMP_FILE)에 따라 노출 방식을 켠다.
+    """
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+    if METRICS_DUMP_FILE:
+        start_metrics_dump(METRICS_DUMP_FILE)
@@ -0,0 +1,392 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import date
+from typing import Protocol
+
+from utils.deadline import Deadline
+from utils.resilience import record_event
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    업스트림(호스트) 하나에 대한 클라이언트 측 제한.
+    각 업스트림은 API 키 하나로만 호출하므로 호스트 단위 = API 키 단위.
+    - qps: 초당 토큰 충전량
+    - burst: 버킷 크기 (순간적으로 허용하는 최대 요청 수)
+    - daily_quota: 하루 최대 호출 수 (None이면 제한 없음)
+    """
+
+    qps: float
+    burst: int
+    daily_quota: int | None = None
+
+
+RATE_LIMITS: dict[str, RateLimit] = {
+    "dapi.kakao.com": RateLimit(qps=10, burst=10, daily_quota=100_000),
+    "apis-navi.kakaomobility.com": RateLimit(qps=5, burst=5, daily_quota=10_000),
+    "api.odsay.com": RateLimit(qps=2, burst=3, daily_quota=1_000),
+    "places.googleapis.com": RateLimit(qps=10, burst=10),
+    "api.open-meteo.com": RateLimit(qps=5, burst=10, daily_quota=10_000),
+}
+
+# 토큰을 기다리는 최대 시간(초). 이보다 오래 걸리면 호출하지 않고 degrade.
+MAX_WAIT_SECONDS = 1.0
+
+QUOTA_FILE = os.getenv("API_QUOTA_FILE", ".api_quota.json")
+
+# 저우선순위 호출(캐시 워밍 등 백그라운드 작업)은 라이브 트래픽 몫을 남겨두고만 보낸다.
+# - 버킷 크기의 LOW_PRIORITY_RESERVE 비율만큼 토큰이 남아 있을 때만 토큰을 쓴다
+#   (라이브 요청처럼 토큰을 미리 예약하지 않으므로 라이브 요청을 기다리게 하지 않는다)
+# - 일일 쿼터는 LOW_PRIORITY_QUOTA_SHARE 비율을 다 쓰기 전까지만 쓴다
+# - deadline이 없으므로 토큰을 LOW_PRIORITY_MAX_WAIT_SECONDS까지 기다린다
+LOW_PRIORITY_RESERVE = 0.5
+LOW_PRIORITY_QUOTA_SHARE = float(os.getenv("LOW_PRIORITY_QUOTA_SHARE", "0.3"))
+LOW_PRIORITY_MAX_WAIT_SECONDS = 30.0
+
+_low_priority: ContextVar[bool] = ContextVar("low_priority", default=False)
+# 요청 1회가 차지하는 일일 쿼터 단위 (open-meteo는 다중 지점 요청을 지점 수만큼 센다)
+_quota_units: ContextVar[int] = ContextVar("quota_units", default=1)
+
+
+class CallBudget(Protocol):
+    """
+    턴 단위 호출 예산 (services.call_scheduler.TurnBudget).
+    실제로 보내는 호출만 차감한다 (캐시 적중, coalesced 호출은 여기까지 오지 않음).
+    """
+
+    def spend(self, host: str) -> bool:
+        """
+        예산이 남아 있으면 호출 1회를 차감하고 True (확인과 차감을 한 번에)
+        """
+        ...
+
+    def refund(self, host: str) -> None:
+        """
+        spend한 호출을 보내지 못했을 때 되돌린다
+        """
+        ...
+
+
+_budget: ContextVar[CallBudget | None] = ContextVar("call_budget", default=None)
+
+# 프로세스마다 쿼터를 이 횟수만큼씩 미리 가져온다 (이 횟수마다 쿼터 파일을 쓴다)
+QUOTA_LEASE = 20
+
+
+class TokenBucket:
+    """
+    스레드 안전한 토큰 버킷.
+    대기 시간은 락 밖에서 sleep 하고, 토큰은 미리 예약해서
+    여러 스레드가 같은 토큰을 두 번 쓰지 않도록 한다.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated_at = now
+
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if wait > max_wait:
+                return False
+
+            # 토큰 예약 (음수가 되면 그만큼 뒤 요청이 기다린다)
+            self._tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def acquire_spare(self, max_wait: float, reserve: float) -> bool:
+        """
+        토큰이 reserve개보다 많이 남아 있을 때만 하나 쓴다 (남을 때까지 기다렸다가 다시 확인).
+        """
+        give_up_at = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated_at
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1 + reserve:
+                    self._tokens -= 1
+                    return True
+                wait = (1 + reserve - self._tokens) / self.rate
+
+            if now + wait > give_up_at:
+                return False
+            time.sleep(wait)
+
+
+class QuotaCounter:
+    """
+    호스트별 일일 호출 수. 프로세스 재시작 후에도 이어지고, 여러 프로세스(워커)가
+    같은 쿼터를 나눠 쓰도록 JSON 파일에 저장한다.
+    파일 형식: {"2025-11-15": {"dapi.kakao.com": 120, ...}}
+
+    호출마다 파일을 쓰지 않도록 프로세스마다 QUOTA_LEASE회씩 미리 가져와서(lease)
+    파일 값에 더해 두고 그 안에서 쓴다. 파일은 잠금(<path>.lock) 안에서 읽고 더해 쓰므로
+    (read-merge-write) 여러 프로세스가 합쳐도 쿼터를 넘지 않는다.
+    남은 lease는 종료할 때(flush) 돌려준다 (비정상 종료하면 그만큼 쓴 것으로 남는다).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._day = date.today().isoformat()
+        self._leases: dict[str, int] = {}  # 가져와 두고 아직 안 쓴 호출 수
+        # 파일은 os.replace로만 바뀌므로 읽을 때는 잠그지 않는다
+        self._synced: dict[str, int] = self._load().get(self._day, {})
+
+    def _load(self) -> dict[str, dict[str, int]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        # 잠금은 파일을 닫을 때 풀린다. fcntl이 없으면(Windows) 프로세스 안에서만 보호
+        with open(f"{self.path}.lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _write(self, today: dict[str, int]) -> None:
+        """
+        오늘 카운터를 파일에 쓴다 (지난 날짜는 버린다). 파일 잠금 안에서 부른다.
+        """
+        # 임시 파일 이름은 프로세스마다 달라야 서로의 임시 파일을 덮어쓰지 않는다
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(self.path)),
+            prefix=os.path.basename(self.path) + ".",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({self._day: today}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._synced = today
+
+    def _rollover_locked(self) -> None:
+        today = date.today().isoformat()
+        if today != self._day:
+            # 지난 날짜의 lease는 버린다
+            self._day = today
+            self._leases, self._synced = {}, {}
+
+    def _lease_locked(self, host: str, quota: int | None, need: int) -> bool:
+        """
+        최소 need만큼 (보통 QUOTA_LEASE만큼) 더 가져온다
+        """
+        try:
+            with self._file_lock():
+                today = self._load().get(self._day, {})
+                used = today.get(host, 0)
+                n = max(QUOTA_LEASE, need)
+                if quota is not None:
+                    n = min(n, quota - used)
+                if n < need:
+                    self._synced = today
+                    return False
+                today[host] = used + n
+                self._write(today)
+        except OSError as e:
+            # 파일을 못 쓰면 이 프로세스 안에서만 센다
+            print(f"[quota] 카운터 저장 실패: {e}")
+            n = max(QUOTA_LEASE, need)
+            if quota is not None:
+                n = min(n, quota - self._synced.get(host, 0))
+                if n < need:
+                    return False
+            self._synced[host] = self._synced.get(host, 0) + n
+        self._leases[host] = self._leases.get(host, 0) + n
+        return True
+
+    def consume(self, host: str, quota: int | None, units: int = 1) -> bool:
+        """
+        호출 1회(쿼터 units만큼)를 기록한다. 쿼터가 모자라면 기록하지 않고 False.
+        """
+        with self._lock:
+            self._rollover_locked()
+            have = self._leases.get(host, 0)
+            if have < units and not self._lease_locked(host, quota, units - have):
+                return False
+            self._leases[host] -= units
+            return True
+
+    def release(self, host: str, units: int = 1) -> None:
+        """
+        consume한 호출을 보내지 못했을 때 되돌린다
+        """
+        with self._lock:
+            if host in self._leases:
+                self._leases[host] += units
+
+    def usage(self) -> dict[str, int]:
+        """
+        마지막으로 파일과 맞춘 시점의 호스트별 사용량 (이 프로세스가 안 쓴 lease 제외)
+        """
+        with self._lock:
+            self._rollover_locked()
+            return {h: n - self._leases.get(h, 0) for h, n in self._synced.items()}
+
+    def flush(self) -> None:
+        """
+        안 쓴 lease를 파일에 돌려준다
+        """
+        with self._lock:
+            unused = {h: -n for h, n in self._leases.items() if n}
+            if not unused:
+                return
+            try:
+                with self._file_lock():
+                    today = self._load().get(self._day, {})
+                    for host, n in unused.items():
+                        today[host] = max(0, today.get(host, 0) + n)
+                    self._write(today)
+                self._leases = {}
+            except OSError as e:
+                print(f"[quota] 카운터 저장 실패: {e}")
+
+
+_buckets: dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+quota_counter = QuotaCounter(QUOTA_FILE)
+atexit.register(quota_counter.flush)
+
+
+def _get_bucket(host: str, limit: RateLimit) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(limit.qps, limit.burst)
+            _buckets[host] = bucket
+        return bucket
+
+
+@contextmanager
+def low_priority():
+    """
+    이 컨텍스트(와 bind_context로 넘긴 작업)의 업스트림 호출을 저우선순위로 보낸다.
+    """
+    token = _low_priority.set(True)
+    try:
+        yield
+    finally:
+        _low_priority.reset(token)
+
+
+def is_low_priority() -> bool:
+    """
+    지금 컨텍스트가 low_priority 안인지 (다른 스레드로 우선순위를 넘길 때 쓴다)
+    """
+    return _low_priority.get()
+
+
+@contextmanager
+def quota_units(units: int):
+    """
+    이 컨텍스트의 업스트림 요청 1회를 일일 쿼터에서 units만큼으로 센다.
+    """
+    token = _quota_units.set(max(1, units))
+    try:
+        yield
+    finally:
+        _quota_units.reset(token)
+
+
+@contextmanager
+def spending(budget: CallBudget):
+    """
+    이 컨텍스트(와 bind_context로 넘긴 작업)의 업스트림 호출을 budget에서 차감한다.
+    """
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def current_call_budget() -> CallBudget | None:
+    """
+    지금 컨텍스트의 턴 예산 (spending 밖이면 None)
+    """
+    return _budget.get()
+
+
+def acquire_permit(host: str, deadline: Deadline | None = None) -> bool:
+    """
+    host로 요청 1회를 보내도 되는지 확인한다.
+    (저우선순위 컨텍스트에서는 라이브 트래픽 몫의 토큰/쿼터를 남겨둔다)
+    - 턴 예산(spending)을 넘으면 False (over_budget)
+    - 일일 쿼터를 다 썼으면 False (quota_exhausted). quota_units 컨텍스트에서는
+      요청 1회를 그 단위만큼 센다
+    - 토큰이 MAX_WAIT_SECONDS(또는 deadline 잔여 시간) 안에 안 생기면 False (rate_limited)
+    - 그 외에는 필요한 만큼 잠깐 기다렸다가 True
+    """
+    budget = _budget.get()
+    if budget is not None and not budget.spend(host):
+        record_event("over_budget", host)
+        return False
+
+    limit = RATE_LIMITS.get(host)
+    if limit is None:
+        return True
+
+    low = _low_priority.get()
+    quota = limit.daily_quota
+    if low and quota is not None:
+        quota = int(quota * LOW_PRIORITY_QUOTA_SHARE)
+    units = _quota_units.get()
+    # 쿼터를 먼저 확인한다 (쿼터를 다 쓴 뒤에는 토큰을 쓰거나 기다리지 않는다)
+    if not quota_counter.consume(host, quota, units):
+        record_event("quota_exhausted", host)
+        if budget is not None:
+            budget.refund(host)
+        return False
+
+    max_wait = LOW_PRIORITY_MAX_WAIT_SECONDS if low else MAX_WAIT_SECONDS
+    if deadline is not None:
+        max_wait = min(max_wait, deadline.remaining())
+
+    bucket = _get_bucket(host, limit)
+    if low:
+        acquired = bucket.acquire_spare(max_wait, limit.burst * LOW_PRIORITY_RESERVE)
+    else:
+        acquired = bucket.acquire(max_wait)
+    if not acquired:
+        record_event("rate_limited", host)
+        quota_counter.release(host, units)
+        if budget is not None:
+            budget.refund(host)
+        return False
+
+    return True
@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from utils.metrics import UPSTREAM_EVENTS
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    호스트별 재시도 정책.
+    - max_attempts: 첫 시도를 포함한 최대 시도 횟수
+    - base_delay / max_delay: 지수 백오프(초). 실제 대기는 full jitter로 [0, 상한] 균등 분포
+    - retry_statuses: 재시도할 HTTP 상태 코드
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+    retry_statuses: tuple[int, ...] = (429, 500, 502, 503, 504)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        attempt번째(0부터) 실패 후 기다릴 시간. 지수 백오프 + full jitter.
+        """
+        cap = min(self.max_delay, self.base_delay * (2**attempt))
+        return random.uniform(0.0, cap)
+
+
+# 재시도하지 않는 정책 (POST 등 멱등하지 않은 요청)
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# 업스트림별 재시도 정책 (GET에만 적용)
+RETRY_POLICIES: dict[str, RetryPolicy] = {
+    "dapi.kakao.com": RetryPolicy(max_attempts=3, base_delay=0.2),
+    "apis-navi.kakaomobility.com": RetryPolicy(max_attempts=2, base_delay=0.3),
+    "api.odsay.com": RetryPolicy(max_attempts=2, base_delay=0.5),
+    "api.open-meteo.com": RetryPolicy(max_attempts=3, base_delay=0.1),
+    "places.googleapis.com": RetryPolicy(max_attempts=2, base_delay=0.3),
+}
+
+# Retry-After 헤더가 이보다 길게 기다리라고 하면 재시도하지 않는다.
+MAX_RETRY_AFTER_SECONDS = 5.0
+
+
+def get_retry_policy(host: str, method: str) -> RetryPolicy:
+    if method.upper() != "GET":
+        return NO_RETRY
+    return RETRY_POLICIES.get(host, DEFAULT_RETRY_POLICY)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Retry-After 헤더(초 단위 숫자 또는 HTTP-date)를 대기 시간(초)으로 변환한다.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# -----------------------------
+# 회로 차단기 (circuit breaker)
+# -----------------------------
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    업스트림 하나에 대한 회로 차단기.
+
+    - CLOSED: 정상. 연속 실패가 failure_threshold에 도달하면 OPEN으로 전환(trip)
+    - OPEN: reset_timeout 동안 요청을 보내지 않고 바로 실패(fast-fail)
+    - HALF_OPEN: reset_timeout이 지나면 시험 요청 1개만 허용.
+      성공하면 CLOSED, 실패하면 다시 OPEN
+    """
+
+    def __init__(
+        self, host: str, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+
+            # HALF_OPEN: 시험 요청은 한 번에 하나만
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    record_event("breaker_trip", self.host)
+                    print(
+                        f"[API circuit open] {self.host} -> {self._failures} failures"
+                    )
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(host)
+            _breakers[host] = breaker
+        return breaker
+
+
+# -----------------------------
+# 지표 (재시도 / 차단 / fast-fail 횟수)
+# -----------------------------
+
+
+def record_event(event: str, host: str) -> None:
+    """
+    event: "retry" | "breaker_trip" | "fast_fail" | "rate_limited"
+           | "quota_exhausted" | "over_budget" | "coalesced"
+    """
+    UPSTREAM_EVENTS.inc(event=event, host=host)
+
+
+def get_resilience_stats() -> dict[str, dict[str, int]]:
+    """
+    {"retry": {"dapi.kakao.com": 3, ...}, "breaker_trip": {...}, "fast_fail": {...}}
+    """
+    result: dict[str, dict[str, int]] = {}
+    for labels, count in UPSTREAM_EVENTS.items():
+        result.setdefault(labels["event"], {})[labels["host"]] = int(count)
+    return result
@@ -0,0 +1,123 @@
+import asyncio
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        # 완료되면 부를 콜백 (asyncio follower 깨우기). SingleFlight의 락 안에서만 다룬다
+        self.callbacks: list[Callable[[], None]] = []
+
+
+class SingleFlight:
+    """
+    single-flight. 스레드 호출자(do)와 asyncio 호출자(do_async)가 진행 중인 호출을
+    함께 나눠 쓴다 (어느 쪽이 leader여도, 이벤트 루프가 달라도).
+    같은 key로 동시에 들어온 호출은 첫 번째(leader)만 실제로 fn을 실행하고,
+    나머지(follower)는 leader의 결과를 나눠 받는다.
+    완료된 결과는 저장하지 않는다 (캐시가 아님).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[_Call, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        with self._lock:
+            del self._calls[key]
+            call.done.set()
+            callbacks, call.callbacks = call.callbacks, []
+        for callback in callbacks:
+            callback()
+
+    @staticmethod
+    def _shared(call: _Call) -> tuple[Any, bool]:
+        if call.error is not None:
+            raise call.error
+        # 응답 dict를 호출자끼리 공유하지 않도록 복사
+        return copy.deepcopy(call.result), True
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: float | None = None,
+    ) -> tuple[Any, bool]:
+        """
+        반환: (결과, shared)
+        - shared=True 이면 다른 호출의 결과를 받아온 것
+        - follower가 timeout 안에 결과를 못 받으면 (None, True)
+        """
+        call, leader = self._join(key)
+        if not leader:
+            if not call.done.wait(timeout):
+                return None, True
+            return self._shared(call)
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+
+    async def do_async(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: float | None = None,
+    ) -> tuple[Any, bool]:
+        """
+        asyncio 호출자용 do. follower는 스레드를 막지 않고 leader의 완료를 기다린다.
+        leader가 취소되면 follower는 (None, True)를 받는다.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+
+            def wake():
+                try:
+                    loop.call_soon_threadsafe(
+                        lambda: waiter.done() or waiter.set_result(None)
+                    )
+                except RuntimeError:
+                    pass  # 이벤트 루프가 이미 닫힘
+
+            with self._lock:
+                if call.done.is_set():
+                    waiter.set_result(None)
+                else:
+                    call.callbacks.append(wake)
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                return None, True
+            return self._shared(call)
+
+        try:
+            call.result = await fn()
+            return call.result, False
+        except asyncio.CancelledError:
+            # 취소는 follower에게 전하지 않는다 (결과 없음으로 받는다)
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
@@ -0,0 +1,272 @@
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Iterator
+
+# 트레이스 내보내기 설정
+# - TRACE_EXPORT: "jsonl"(span 한 줄씩) | "otlp"(OTLP/JSON, 트레이스 한 줄씩) | ""(끔)
+# - TRACE_FILE: 내보낼 파일 경로
+# - TRACE_WATERFALL: "1"이면 턴마다 CLI에 지연 워터폴 출력
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_WATERFALL = os.getenv("TRACE_WATERFALL", "0") == "1"
+
+SERVICE_NAME = "cai-hw2"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int  # epoch 기준 ns (time.time_ns)
+    end_ns: int = 0
+    status: str = "ok"  # "ok" | "error"
+    attributes: dict = field(default_factory=dict)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: int | float) -> None:
+        """
+        누적 속성 (예: bytes, tokens)
+        """
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+
+@dataclass
+class Trace:
+    """
+    한 턴 동안 기록된 span 모음. 여러 스레드에서 동시에 span을 추가할 수 있다.
+    """
+
+    trace_id: str
+    spans: list[Span] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def root(self) -> Span | None:
+        return next((s for s in self.spans if s.parent_id is None), None)
+
+    def total(self, key: str) -> int | float:
+        """
+        모든 span의 숫자 속성 합계 (예: 턴 전체 tokens)
+        """
+        with self._lock:
+            return sum(s.attributes.get(key, 0) for s in self.spans)
+
+
+_current_trace: contextvars.ContextVar[Trace | None] = contextvars.ContextVar(
+    "current_trace", default=None
+)
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    현재 span의 자식 span을 연다.
+    진행 중인 트레이스가 없으면 기록하지 않는 span을 돌려준다 (호출자는 그대로 set 가능).
+    """
+    trace = _current_trace.get()
+    parent = _current_span.get()
+
+    s = Span(
+        name=name,
+        trace_id=trace.trace_id if trace else "",
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        start_ns=time.time_ns(),
+        attributes=dict(attributes),
+    )
+
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.status = "error"
+        s.attributes.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current_span.reset(token)
+        if trace is not None:
+            trace.add(s)
+
+
+@contextmanager
+def start_trace(name: str, **attributes) -> Iterator[Trace]:
+    """
+    새 트레이스(턴)를 시작하고 루트 span을 연다.
+    """
+    trace = Trace(trace_id=secrets.token_hex(16))
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        with span(name, **attributes):
+            yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+def bind_context(fn: Callable) -> Callable:
+    """
+    현재 트레이스 컨텍스트를 유지한 채 다른 스레드에서 fn을 실행하도록 감싼다.
+    ThreadPoolExecutor.submit(bind_context(fn), ...) 형태로 사용.
+    """
+    ctx = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+
+    return wrapper
+
+
+# -----------------------------
+# 내보내기
+# -----------------------------
+
+
+def export_jsonl(trace: Trace, path: str) -> None:
+    """
+    span 하나를 JSON 한 줄로 append.
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        for s in sorted(trace.spans, key=lambda s: s.start_ns):
+            record = asdict(s)
+            record["duration_ms"] = round(s.duration_ms, 3)
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> dict:
+    """
+    OTLP/JSON (ExportTraceServiceRequest) 형식으로 변환.
+    """
+    spans = []
+    for s in trace.spans:
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()
+            ],
+            "status": {"code": 2 if s.status == "error" else 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                    ]
+                },
+                "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def export_otlp(trace: Trace, path: str) -> None:
+    """
+    OTLP 파일 exporter 형식: 트레이스 하나를 JSON 한 줄로 append.
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(to_otlp(trace), ensure_ascii=False) + "\n")
+
+
+def format_waterfall(trace: Trace, width: int = 40) -> str:
+    """
+    턴의 지연 워터폴을 텍스트로 그린다.
+
+    예:
+        turn                           |████████████████████| 6120ms
+          1.parse_user_info            |███                 |  980ms
+            llm info_parser            |███                 |  975ms tokens=812
+    """
+    root = trace.root
+    if root is None or not trace.spans:
+        return ""
+
+    total_ns = max(1, root.end_ns - root.start_ns)
+    children: dict[str | None, list[Span]] = {}
+    for s in trace.spans:
+        children.setdefault(s.parent_id, []).append(s)
+
+    lines: list[str] = []
+
+    def walk(s: Span, depth: int) -> None:
+        offset = int((s.start_ns - root.start_ns) / total_ns * width)
+        length = max(1, int((s.end_ns - s.start_ns) / total_ns * width))
+        offset = min(max(0, offset), width - 1)
+        length = min(length, width - offset)
+        bar = " " * offset + "█" * length + " " * (width - offset - length)
+
+        label = ("  " * depth + s.name)[:36]
+        extras = [
+            f"{k}={s.attributes[k]}"
+            for k in ("http.status", "bytes", "tokens", "count")
+            if k in s.attributes
+        ]
+        if s.status == "error":
+            extras.append("ERROR")
+        lines.append(
+            f"{label:<36} |{bar}| {s.duration_ms:7.0f}ms {' '.join(extras)}".rstrip()
+        )
+
+        for child in sorted(children.get(s.span_id, []), key=lambda c: c.start_ns):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+def finish_trace(trace: Trace) -> None:
+    """
+    턴이 끝났을 때 호출: 설정에 따라 파일로 내보내고 워터폴을 출력한다.
+    """
+    if TRACE_EXPORT == "jsonl":
+        export_jsonl(trace, TRACE_FILE)
+    elif TRACE_EXPORT == "otlp":
+        export_otlp(trace, TRACE_FILE)
+
+    if TRACE_WATERFALL:
+        print(format_waterfall(trace))
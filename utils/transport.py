@@ -0,0 +1,284 @@
+import asyncio
+import importlib.util
+import json
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Callable, Mapping
+
+import httpx
+import requests
+
+# h2 패키지가 있어야 httpx에서 HTTP/2를 쓸 수 있다 (없으면 HTTP/1.1로 동작)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 호스트별 전송 백엔드 ("requests" | "httpx").
+# HTTP/2 멀티플렉싱을 지원하는 Google Places, Open-Meteo는 httpx로 보낸다.
+DEFAULT_TRANSPORT = os.getenv("HTTP_TRANSPORT", "requests")
+TRANSPORT_BY_HOST: dict[str, str] = {
+    "places.googleapis.com": "httpx",
+    "api.open-meteo.com": "httpx",
+}
+
+
+class TransportError(Exception):
+    """
+    연결 실패, 타임아웃 등 HTTP 응답을 받지 못한 경우.
+    """
+
+
+@dataclass
+class TransportResponse:
+    status_code: int
+    content: bytes
+    headers: Mapping[str, str] = field(default_factory=dict)
+    http_version: str = "HTTP/1.1"
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class RequestsTransport:
+    """
+    requests 기반 HTTP/1.1 전송. 스레드마다 Session을 두어 keep-alive 연결을 재사용한다.
+    """
+
+    name = "requests"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: tuple[float, float],
+        headers=None,
+        params=None,
+        json=None,
+        data=None,
+    ) -> TransportResponse:
+        try:
+            res = self._session().request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                json=json,
+                data=data,
+                timeout=timeout,
+            )
+        except requests.RequestException as e:
+            raise TransportError(str(e)) from e
+
+        return TransportResponse(
+            status_code=res.status_code,
+            content=res.content,
+            headers=res.headers,
+        )
+
+
+def _httpx_timeout(timeout: tuple[float, float]) -> httpx.Timeout:
+    connect, read = timeout
+    return httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+
+
+def _to_response(res: httpx.Response) -> TransportResponse:
+    return TransportResponse(
+        status_code=res.status_code,
+        content=res.content,
+        headers=res.headers,
+        http_version=res.http_version,
+    )
+
+
+class HttpxTransport:
+    """
+    httpx 동기 클라이언트 기반 전송. HTTP/2를 켜면 같은 호스트로 가는
+    동시 요청들이 연결 하나를 멀티플렉싱해서 쓴다. (httpx.Client는 스레드 안전)
+    """
+
+    name = "httpx"
+
+    def __init__(self, http2: bool = True):
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._client = httpx.Client(http2=self.http2)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: tuple[float, float],
+        headers=None,
+        params=None,
+        json=None,
+        data=None,
+    ) -> TransportResponse:
+        try:
+            res = self._client.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                json=json,
+                data=data,
+                timeout=_httpx_timeout(timeout),
+            )
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+        return _to_response(res)
+
+
+class AsyncHttpxTransport:
+    """
+    httpx 비동기 클라이언트 기반 전송.
+    AsyncClient는 이벤트 루프에 묶이므로 루프마다 클라이언트를 따로 만든다.
+    - 클라이언트는 루프 객체를 약한 참조 키로 보관한다 (끝난 루프의 id를 새 루프가
+      다시 써도 닫힌 루프의 클라이언트를 받지 않는다)
+    - 루프가 끝날 때(asyncio.run의 shutdown_asyncgens) 클라이언트를 닫는다
+    """
+
+    name = "httpx-async"
+
+    def __init__(self, http2: bool = True):
+        self.http2 = http2 and HTTP2_AVAILABLE
+        # 루프 -> (클라이언트, 루프 종료 시 클라이언트를 닫는 async generator)
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, tuple[httpx.AsyncClient, AsyncGenerator]
+        ] = weakref.WeakKeyDictionary()
+
+    async def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            client = httpx.AsyncClient(http2=self.http2)
+            closer = self._close_on_shutdown(loop, client)
+            # 처음 돌리는 순간 루프가 async generator로 등록해 두었다가 종료 시 닫는다
+            await closer.__anext__()
+            entry = self._clients[loop] = (client, closer)
+        return entry[0]
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: tuple[float, float],
+        headers=None,
+        params=None,
+        json=None,
+        data=None,
+    ) -> TransportResponse:
+        try:
+            client = await self._client()
+            res = await client.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                json=json,
+                data=data,
+                timeout=_httpx_timeout(timeout),
+            )
+        except httpx.HTTPError as e:
+            raise TransportError(str(e) or type(e).__name__) from e
+
+        return _to_response(res)
+
+    async def aclose(self) -> None:
+        entry = self._clients.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            # 클라이언트 내부(연결 풀의 락 등)가 루프를 참조하므로 약한 참조만으로는
+            # 항목이 사라지지 않는다. 닫을 때 직접 뺀다
+            entry = self._clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._clients[loop]
+            await client.aclose()
+
+
+_transports: dict[str, object] = {}
+_async_transport: AsyncHttpxTransport | None = None
+_transports_lock = threading.Lock()
+
+# 생성된 전송 백엔드를 감싸는 함수 (record/replay 등, utils.fixtures 참고)
+_transport_wrapper: Callable | None = None
+
+
+def _create_transport(name: str):
+    if name == "httpx":
+        if not HTTP2_AVAILABLE:
+            print("[transport] h2 패키지가 없어 httpx를 HTTP/1.1로 사용합니다.")
+        return HttpxTransport(http2=True)
+    if name == "requests":
+        return RequestsTransport()
+    raise ValueError(f"알 수 없는 transport: {name}")
+
+
+def get_transport_name(host: str) -> str:
+    return TRANSPORT_BY_HOST.get(host, DEFAULT_TRANSPORT)
+
+
+def get_transport(host: str):
+    """
+    host에 설정된 동기 전송 백엔드(RequestsTransport | HttpxTransport)를 반환한다.
+    """
+    name = get_transport_name(host)
+    with _transports_lock:
+        transport = _transports.get(name)
+        if transport is None:
+            transport = _create_transport(name)
+            if _transport_wrapper is not None:
+                transport = _transport_wrapper(transport)
+            _transports[name] = transport
+        return transport
+
+
+def get_async_transport() -> AsyncHttpxTransport:
+    global _async_transport
+    with _transports_lock:
+        if _async_transport is None:
+            _async_transport = AsyncHttpxTransport(http2=True)
+            if _transport_wrapper is not None:
+                _async_transport = _transport_wrapper(_async_transport)
+        return _async_transport
+
+
+def set_transport(host: str, name: str) -> None:
+    """
+    호스트의 전송 백엔드를 바꾼다 (벤치마크, 설정용).
+    """
+    if name not in ("requests", "httpx"):
+        raise ValueError(f"알 수 없는 transport: {name}")
+    TRANSPORT_BY_HOST[host] = name
+
+
+def set_transport_wrapper(wrapper: Callable | None) -> None:
+    """
+    이후 생성되는 모든 전송 백엔드를 wrapper(transport)로 감싼다.
+    이미 만들어 둔 백엔드는 버리고 다음 요청 때 다시 만든다.
+    """
+    global _transport_wrapper, _async_transport
+    with _transports_lock:
+        _transport_wrapper = wrapper
+        _transports.clear()
+        _async_transport = None
@@ -1,9 +1,21 @@
 from datetime import date
+from functools import lru_cache
+
+import numpy as np
 
 from domain.enums import WeatherCode
 from domain.models import DailyWeather
 
 
+@lru_cache(maxsize=64)
+def _daily_index_map(daily_times: tuple[str, ...]) -> dict[date, int]:
+    """
+    daily["time"] -> {날짜: 인덱스}. 같은 예보 기간은 응답마다 같은 목록이라
+    한 번만 파싱하고 재사용한다.
+    """
+    return {date.fromisoformat(iso_str): idx for idx, iso_str in enumerate(daily_times)}
+
+
 def get_daily_index(target_iso_date: str, daily_times: list[str]) -> int:
     """
     주어진 ISO 날짜 문자열(target_iso_date)이 daily["time"] 리스트에서
@@ -21,13 +33,13 @@ def get_daily_index(target_iso_date: str, daily_times: list[str]) -> int:
     # iso 문자열을 date 객체로 변환
     target_date = date.fromisoformat(target_iso_date)
 
-    # daily_times 배열을 순회하며 찾음
-    for idx, iso_str in enumerate(daily_times):
-        if date.fromisoformat(iso_str) == target_date:
-            return idx
+    # 미리 만들어 둔 날짜 -> 인덱스 맵에서 찾음
+    idx = _daily_index_map(tuple(daily_times)).get(target_date)
 
     # 없다면 에러
-    raise ValueError(f"해당 날짜({target_iso_date})는 daily 예보 범위에 없음.")
+    if idx is None:
+        raise ValueError(f"해당 날짜({target_iso_date})는 daily 예보 범위에 없음.")
+    return idx
 
 
 def calculate_outdoor_score(daily_weather: DailyWeather) -> int:
@@ -130,3 +142,67 @@ def calculate_outdoor_score(daily_weather: DailyWeather) -> int:
     # 점수 보정
     score = max(0, min(score, 100))
     return score
+
+
+# -----------------------------
+# 배치 점수 계산 (calculate_outdoor_score와 같은 규칙)
+# -----------------------------
+#
+# 날씨 유형 패널티는 weather_code(0~99)로 바로 찾는 표,
+# 강수량/기온 패널티는 구간 경계 + 구간별 패널티 표로 np.searchsorted 한 번에 찾는다.
+
+_WEATHER_PENALTY = np.zeros(100, dtype=np.int64)
+_WEATHER_PENALTY[
+    [
+        WeatherCode.RAIN_HEAVY,
+        WeatherCode.RAIN_SHOWER_HEAVY,
+        WeatherCode.SNOW_HEAVY,
+        WeatherCode.THUNDERSTORM,
+        WeatherCode.THUNDERSTORM_HAIL_LIGHT,
+        WeatherCode.THUNDERSTORM_HAIL_HEAVY,
+    ]
+] = 80
+_WEATHER_PENALTY[
+    [
+        WeatherCode.RAIN_LIGHT,
+        WeatherCode.RAIN_MODERATE,
+        WeatherCode.RAIN_SHOWER_LIGHT,
+        WeatherCode.RAIN_SHOWER_MODERATE,
+        WeatherCode.DRIZZLE_LIGHT,
+        WeatherCode.DRIZZLE_MODERATE,
+    ]
+] = 40
+_WEATHER_PENALTY[[WeatherCode.FOG, WeatherCode.DEPOSITING_RIME_FOG]] = 20
+
+# (경계, 구간별 패널티, searchsorted side)
+# side="left": 값이 경계와 같으면 아래 구간 (> 비교), "right": 위 구간 (>= 비교)
+_PRECIPITATION_PENALTY = (np.array([1.0, 5.0, 10.0]), np.array([0, 15, 30, 50]), "left")
+_HOT_PENALTY = (np.array([28.0, 32.0]), np.array([0, 20, 30]), "right")
+_COLD_PENALTY = (np.array([0.0, 5.0]), np.array([30, 20, 0]), "left")
+_NIGHT_COLD_PENALTY = (np.array([-5.0, 0.0]), np.array([20, 10, 0]), "left")
+
+
+def _lookup(table: tuple, values: np.ndarray) -> np.ndarray:
+    edges, penalties, side = table
+    return penalties[np.searchsorted(edges, values, side=side)]
+
+
+def calculate_outdoor_scores(
+    weather_codes: np.ndarray,
+    t_max: np.ndarray,
+    t_min: np.ndarray,
+    precipitation_sum: np.ndarray,
+) -> np.ndarray:
+    """
+    calculate_outdoor_score의 배치 버전.
+    후보 여러 곳 또는 여러 날의 예보를 같은 길이의 배열로 받아 점수(0~100) 배열을 반환한다.
+    """
+    t_max = np.asarray(t_max, dtype=np.float64)
+    score = 100 - _WEATHER_PENALTY[np.asarray(weather_codes, dtype=np.intp)]
+    score -= _lookup(_PRECIPITATION_PENALTY, np.asarray(precipitation_sum))
+    # 더위/추위 패널티는 둘 중 하나만 (t_max >= 28이면 더위 쪽)
+    score -= np.where(
+        t_max >= 28, _lookup(_HOT_PENALTY, t_max), _lookup(_COLD_PENALTY, t_max)
+    )
+    score -= _lookup(_NIGHT_COLD_PENALTY, np.asarray(t_min))
+    return np.clip(score, 0, 100)